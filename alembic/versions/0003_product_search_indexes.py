@@ -0,0 +1,31 @@
+"""Add full-text and trigram search indexes on products."""
+
+revision = "0003_product_search_indexes"
+down_revision = "0002_global_settings"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_products_search_tsv ON products USING gin (
+            to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(sku, '') || ' ' || coalesce(description, ''))
+        )
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_products_name_trgm ON products USING gin (name gin_trgm_ops)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_products_sku_trgm ON products USING gin (sku gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP INDEX IF EXISTS ix_products_sku_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_products_name_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_products_search_tsv")
@@ -0,0 +1,25 @@
+"""Add cache_versions table."""
+
+revision = "0004_cache_versions"
+down_revision = "0003_product_search_indexes"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cache_versions",
+        sa.Column("name", sa.String(length=64), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.TIMESTAMP(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.execute("INSERT INTO cache_versions (name, version) VALUES ('catalog', 0)")
+
+
+def downgrade() -> None:
+    op.drop_table("cache_versions")
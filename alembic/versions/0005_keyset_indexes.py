@@ -0,0 +1,18 @@
+"""Add composite indexes backing keyset pagination."""
+
+revision = "0005_keyset_indexes"
+down_revision = "0004_cache_versions"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+
+
+def upgrade() -> None:
+    op.create_index("ix_audit_created_at_id", "audit", ["created_at", "id"])
+    op.create_index("ix_orders_user_created_at", "orders", ["user_id", "created_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_orders_user_created_at", table_name="orders")
+    op.drop_index("ix_audit_created_at_id", table_name="audit")
@@ -0,0 +1,16 @@
+"""Index inventory.updated_at for the catalog cache validator."""
+
+revision = "0006_inventory_updated_at_index"
+down_revision = "0005_keyset_indexes"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+
+
+def upgrade() -> None:
+    op.create_index("ix_inventory_updated_at", "inventory", ["updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_inventory_updated_at", table_name="inventory")
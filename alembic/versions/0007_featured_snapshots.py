@@ -0,0 +1,24 @@
+"""Add featured_snapshots table."""
+
+revision = "0007_featured_snapshots"
+down_revision = "0006_inventory_updated_at_index"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade() -> None:
+    op.create_table(
+        "featured_snapshots",
+        sa.Column("branch_id", sa.Integer(), nullable=False, autoincrement=False),
+        sa.Column("catalog_version", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("items", sa.JSON(), nullable=False),
+        sa.Column("built_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("branch_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("featured_snapshots")
@@ -0,0 +1,33 @@
+"""Make (cart_id, product_id) unique on cart_items so adds can upsert."""
+
+revision = "0008_cart_item_unique_line"
+down_revision = "0007_featured_snapshots"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+
+
+def upgrade() -> None:
+    # Fold duplicate lines into the oldest one before adding the constraint.
+    op.execute(
+        """
+        UPDATE cart_items SET quantity = dup.total
+        FROM (
+            SELECT MIN(id) AS keep_id, SUM(quantity) AS total
+            FROM cart_items GROUP BY cart_id, product_id HAVING COUNT(*) > 1
+        ) AS dup
+        WHERE cart_items.id = dup.keep_id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM cart_items AS extra USING cart_items AS kept
+        WHERE extra.cart_id = kept.cart_id AND extra.product_id = kept.product_id AND extra.id > kept.id
+        """
+    )
+    op.create_unique_constraint("uq_cart_items_cart_product", "cart_items", ["cart_id", "product_id"])
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_cart_items_cart_product", "cart_items", type_="unique")
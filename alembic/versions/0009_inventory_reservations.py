@@ -0,0 +1,31 @@
+"""Add inventory_reservations table."""
+
+revision = "0009_inventory_reservations"
+down_revision = "0008_cart_item_unique_line"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade() -> None:
+    op.create_table(
+        "inventory_reservations",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("cart_id", sa.Integer(), sa.ForeignKey("carts.id"), nullable=False),
+        sa.Column("branch_id", sa.Integer(), sa.ForeignKey("branches.id"), nullable=False),
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("cart_id", "product_id", name="uq_inventory_reservations_cart_product"),
+    )
+    op.create_index("ix_inventory_reservations_expires_at", "inventory_reservations", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_inventory_reservations_expires_at", table_name="inventory_reservations")
+    op.drop_table("inventory_reservations")
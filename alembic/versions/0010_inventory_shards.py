@@ -0,0 +1,27 @@
+"""Add inventory_shards table and inventory.shard_count."""
+
+revision = "0010_inventory_shards"
+down_revision = "0009_inventory_reservations"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade() -> None:
+    op.add_column("inventory", sa.Column("shard_count", sa.Integer(), nullable=False, server_default="0"))
+    op.create_table(
+        "inventory_shards",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("inventory_id", sa.Integer(), sa.ForeignKey("inventory.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("shard_no", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("inventory_id", "shard_no", name="uq_inventory_shards_inventory_shard"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("inventory_shards")
+    op.drop_column("inventory", "shard_count")
@@ -0,0 +1,42 @@
+"""Add payment_outbox table and the PENDING_PAYMENT order status."""
+
+revision = "0011_payment_outbox"
+down_revision = "0010_inventory_shards"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE order_status ADD VALUE IF NOT EXISTS 'PENDING_PAYMENT'")
+    op.create_table(
+        "payment_outbox",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("order_id", sa.Integer(), sa.ForeignKey("orders.id"), nullable=False),
+        sa.Column("payment_token_id", sa.Integer(), nullable=False),
+        sa.Column("amount", sa.Numeric(12, 2), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("PENDING", "CAPTURED", "FAILED", name="payment_outbox_status"),
+            nullable=False,
+        ),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.String(length=256), nullable=True),
+        sa.Column("payment_reference", sa.String(length=128), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("order_id"),
+    )
+    op.create_index("ix_payment_outbox_status_id", "payment_outbox", ["status", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_payment_outbox_status_id", table_name="payment_outbox")
+    op.drop_table("payment_outbox")
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TYPE IF EXISTS payment_outbox_status")
@@ -0,0 +1,40 @@
+"""Add checkout_queue table."""
+
+revision = "0012_checkout_queue"
+down_revision = "0011_payment_outbox"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade() -> None:
+    op.create_table(
+        "checkout_queue",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("branch_id", sa.Integer(), sa.ForeignKey("branches.id"), nullable=False),
+        sa.Column("idempotency_key", sa.String(length=128), nullable=False),
+        sa.Column("request_hash", sa.String(length=256), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("QUEUED", "DONE", "FAILED", name="checkout_queue_status"),
+            nullable=False,
+        ),
+        sa.Column("status_code", sa.Integer(), nullable=True),
+        sa.Column("response_payload", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "idempotency_key", name="uq_checkout_queue_user_key"),
+    )
+    op.create_index("ix_checkout_queue_branch_status_id", "checkout_queue", ["branch_id", "status", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_checkout_queue_branch_status_id", table_name="checkout_queue")
+    op.drop_table("checkout_queue")
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TYPE IF EXISTS checkout_queue_status")
@@ -0,0 +1,20 @@
+"""Add the CHARGING payment outbox status and payment_outbox.charge_started_at."""
+
+revision = "0013_payment_outbox_charging"
+down_revision = "0012_checkout_queue"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE payment_outbox_status ADD VALUE IF NOT EXISTS 'CHARGING'")
+    op.add_column("payment_outbox", sa.Column("charge_started_at", sa.TIMESTAMP(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("payment_outbox", "charge_started_at")
@@ -0,0 +1,17 @@
+"""Add carts.version for cross-worker cart cache invalidation."""
+
+revision = "0014_cart_version"
+down_revision = "0013_payment_outbox_charging"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade() -> None:
+    op.add_column("carts", sa.Column("version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    op.drop_column("carts", "version")
@@ -0,0 +1,21 @@
+"""Seed the striped inventory cache version rows."""
+
+revision = "0015_inventory_version_stripes"
+down_revision = "0014_cart_version"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+STRIPES = 16
+
+
+def upgrade() -> None:
+    # Pre-created so concurrent first bumps update a row instead of racing to insert it.
+    cache_versions = sa.table("cache_versions", sa.column("name", sa.String), sa.column("version", sa.Integer))
+    op.bulk_insert(cache_versions, [{"name": f"inventory:{stripe}", "version": 0} for stripe in range(STRIPES)])
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM cache_versions WHERE name LIKE 'inventory:%'")
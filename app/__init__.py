@@ -3,6 +3,11 @@
 from flask import Flask
 
 from .services.branch import BranchCoreService
+from .services.catalog.autocomplete import CatalogAutocomplete
+from .services.catalog.featured import FeaturedSnapshotService
+from .services.checkout.payment_outbox import CheckoutPaymentOutbox
+from .services.checkout.reservations import CheckoutReservationManager
+from .services.checkout_queue import CheckoutQueueService
 from .config import AppConfig
 from .extensions import db, jwt, limiter
 from .middleware import register_middlewares
@@ -50,6 +55,12 @@ def create_app(config: AppConfig | None = None) -> Flask:
     _register_options_short_circuit(app)
     with app.app_context():
         BranchCoreService.ensure_delivery_source_branch_exists(app.config.get("DELIVERY_SOURCE_BRANCH_ID", ""))
+        CatalogAutocomplete.warm()
+    if app.config.get("APP_ENV", "production").lower() not in {"test", "testing"}:
+        FeaturedSnapshotService.start_refresher(app)
+        CheckoutReservationManager.start_sweeper(app)
+        CheckoutPaymentOutbox.start_worker(app)
+        CheckoutQueueService.start_worker(app)
 
     return app
 
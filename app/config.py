@@ -35,6 +35,32 @@ class AppConfig:
     SQLALCHEMY_TRACK_MODIFICATIONS: bool = False
     SQLALCHEMY_DATABASE_URI: str = field(init=False)
     RATE_LIMIT_DEFAULTS: str = field(default_factory=lambda: _env_or_default("RATE_LIMIT_DEFAULTS", "200 per day, 50 per hour"))
+    CATALOG_VERSION_CHECK_SECONDS: float = field(default_factory=lambda: float(_env_or_default("CATALOG_VERSION_CHECK_SECONDS", "5")))
+    CATALOG_CACHE_MAX_AGE: int = field(default_factory=lambda: int(_env_or_default("CATALOG_CACHE_MAX_AGE", "60")))
+    FEATURED_REFRESH_SECONDS: float = field(default_factory=lambda: float(_env_or_default("FEATURED_REFRESH_SECONDS", "60")))
+    FEATURED_SNAPSHOT_MAX_AGE_SECONDS: float = field(default_factory=lambda: float(_env_or_default("FEATURED_SNAPSHOT_MAX_AGE_SECONDS", "300")))
+    BRANCH_CACHE_CHECK_SECONDS: float = field(default_factory=lambda: float(_env_or_default("BRANCH_CACHE_CHECK_SECONDS", "30")))
+    SETTINGS_CACHE_CHECK_SECONDS: float = field(default_factory=lambda: float(_env_or_default("SETTINGS_CACHE_CHECK_SECONDS", "30")))
+    CART_CACHE_SECONDS: float = field(default_factory=lambda: float(_env_or_default("CART_CACHE_SECONDS", "5")))
+    STOCK_CACHE_SECONDS: float = field(default_factory=lambda: float(_env_or_default("STOCK_CACHE_SECONDS", "10")))
+    CHECKOUT_PREVIEW_CACHE_SECONDS: float = field(default_factory=lambda: float(_env_or_default("CHECKOUT_PREVIEW_CACHE_SECONDS", "15")))
+    CHECKOUT_RESERVATION_TTL_SECONDS: float = field(default_factory=lambda: float(_env_or_default("CHECKOUT_RESERVATION_TTL_SECONDS", "600")))
+    CHECKOUT_RESERVATION_SWEEP_SECONDS: float = field(default_factory=lambda: float(_env_or_default("CHECKOUT_RESERVATION_SWEEP_SECONDS", "30")))
+    CHECKOUT_RESERVATION_SWEEP_BATCH: int = field(default_factory=lambda: int(_env_or_default("CHECKOUT_RESERVATION_SWEEP_BATCH", "500")))
+    CHECKOUT_PAYMENT_DRAIN_SECONDS: float = field(default_factory=lambda: float(_env_or_default("CHECKOUT_PAYMENT_DRAIN_SECONDS", "2")))
+    CHECKOUT_PAYMENT_DRAIN_BATCH: int = field(default_factory=lambda: int(_env_or_default("CHECKOUT_PAYMENT_DRAIN_BATCH", "50")))
+    CHECKOUT_PAYMENT_MAX_ATTEMPTS: int = field(default_factory=lambda: int(_env_or_default("CHECKOUT_PAYMENT_MAX_ATTEMPTS", "5")))
+    CHECKOUT_PAYMENT_RECONCILE_SECONDS: float = field(default_factory=lambda: float(_env_or_default("CHECKOUT_PAYMENT_RECONCILE_SECONDS", "60")))
+    CHECKOUT_REPLAY_CACHE_SECONDS: float = field(default_factory=lambda: float(_env_or_default("CHECKOUT_REPLAY_CACHE_SECONDS", "300")))
+    IDEMPOTENCY_PURGE_BATCH: int = field(default_factory=lambda: int(_env_or_default("IDEMPOTENCY_PURGE_BATCH", "1000")))
+    CHECKOUT_QUEUE_ENABLED: bool = field(default_factory=lambda: _env_bool("CHECKOUT_QUEUE_ENABLED", "false"))
+    CHECKOUT_QUEUE_MAX_PENDING: int = field(default_factory=lambda: int(_env_or_default("CHECKOUT_QUEUE_MAX_PENDING", "500")))
+    CHECKOUT_QUEUE_BRANCH_LIMITS: str = field(default_factory=lambda: _env_or_default("CHECKOUT_QUEUE_BRANCH_LIMITS", ""))
+    CHECKOUT_QUEUE_BATCH: int = field(default_factory=lambda: int(_env_or_default("CHECKOUT_QUEUE_BATCH", "20")))
+    CHECKOUT_QUEUE_POLL_SECONDS: float = field(default_factory=lambda: float(_env_or_default("CHECKOUT_QUEUE_POLL_SECONDS", "0.1")))
+    CHECKOUT_QUEUE_MAX_WAIT_SECONDS: float = field(default_factory=lambda: float(_env_or_default("CHECKOUT_QUEUE_MAX_WAIT_SECONDS", "10")))
+    CHECKOUT_QUEUE_RETENTION_SECONDS: float = field(default_factory=lambda: float(_env_or_default("CHECKOUT_QUEUE_RETENTION_SECONDS", "3600")))
+    CATALOG_FACET_CACHE_SECONDS: float = field(default_factory=lambda: float(_env_or_default("CATALOG_FACET_CACHE_SECONDS", "30")))
 
     def __post_init__(self) -> None:
         self.SQLALCHEMY_DATABASE_URI = self.DATABASE_URL
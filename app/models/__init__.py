@@ -2,13 +2,19 @@ from .base import Base
 from .address import Address
 from .audit import Audit
 from .branch import Branch
+from .cache_version import CacheVersion
 from .cart import Cart, CartItem
 from .category import Category
+from .checkout_queue import CheckoutQueueEntry
 from .delivery_slot import DeliverySlot
+from .featured_snapshot import FeaturedSnapshot
 from .global_settings import GlobalSettings
 from .idempotency_key import IdempotencyKey
 from .inventory import Inventory
+from .inventory_reservation import InventoryReservation
+from .inventory_shard import InventoryShard
 from .order import Order, OrderDeliveryDetails, OrderItem, OrderPickupDetails
+from .payment_outbox import PaymentOutbox
 from .payment_token import PaymentToken
 from .product import Product
 from .registration_otp import RegistrationOTP
@@ -18,9 +24,11 @@ from .user import User
 from .wishlist_item import WishlistItem
 from .enums import (
     CartStatus,
+    CheckoutQueueStatus,
     FulfillmentType,
     IdempotencyStatus,
     OrderStatus,
+    PaymentOutboxStatus,
     PickedStatus,
     Role,
     StockRequestStatus,
@@ -32,17 +40,23 @@ __all__ = [
     "Address",
     "Audit",
     "Branch",
+    "CacheVersion",
     "Cart",
     "CartItem",
     "Category",
+    "CheckoutQueueEntry",
     "DeliverySlot",
+    "FeaturedSnapshot",
     "GlobalSettings",
     "IdempotencyKey",
     "Inventory",
+    "InventoryReservation",
+    "InventoryShard",
     "Order",
     "OrderDeliveryDetails",
     "OrderItem",
     "OrderPickupDetails",
+    "PaymentOutbox",
     "PaymentToken",
     "Product",
     "RegistrationOTP",
@@ -51,9 +65,11 @@ __all__ = [
     "User",
     "WishlistItem",
     "CartStatus",
+    "CheckoutQueueStatus",
     "FulfillmentType",
     "IdempotencyStatus",
     "OrderStatus",
+    "PaymentOutboxStatus",
     "PickedStatus",
     "Role",
     "StockRequestStatus",
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, JSON, String ,func
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, JSON, String ,func
 from sqlalchemy.orm import relationship
 
 from .base import Base
 
 class Audit(Base):
     __tablename__ = "audit"
+    __table_args__ = (Index("ix_audit_created_at_id", "created_at", "id"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     entity_type = Column(String(64), nullable=False, index=True)
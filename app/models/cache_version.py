@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, Integer, String
+
+from .base import Base, TimestampMixin
+
+class CacheVersion(Base, TimestampMixin):
+    """Monotonic counter per cached dataset, bumped by its write paths."""
+
+    __tablename__ = "cache_versions"
+
+    name = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, Enum as SQLEnum, ForeignKey, Integer, Numeric
+from sqlalchemy import Column, Enum as SQLEnum, ForeignKey, Integer, Numeric, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from .base import Base, TimestampMixin
@@ -12,12 +12,17 @@ class Cart(Base, TimestampMixin):
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     status = Column(SQLEnum(CartStatus, name="cart_status"),nullable=False,server_default=CartStatus.ACTIVE.value,)
+    # Bumped in the transaction of every cart edit; read caches in any worker key on it.
+    version = Column(Integer, nullable=False, default=0, server_default="0")
 
     user = relationship("User", back_populates="carts")
     items = relationship("CartItem", back_populates="cart", cascade="all, delete-orphan")
 
 class CartItem(Base, TimestampMixin):
     __tablename__ = "cart_items"
+    __table_args__ = (
+        UniqueConstraint("cart_id", "product_id", name="uq_cart_items_cart_product"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     cart_id = Column(Integer, ForeignKey("carts.id"), nullable=False)
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, Enum as SQLEnum, ForeignKey, Index, Integer, JSON, String, UniqueConstraint
+
+from .base import Base, TimestampMixin
+from .enums import CheckoutQueueStatus
+
+class CheckoutQueueEntry(Base, TimestampMixin):
+    """A confirm request admitted in queue mode, waiting for the branch's checkout writer.
+
+    ``payload`` is the validated CheckoutConfirmRequest; once processed, ``status_code`` and
+    ``response_payload`` hold what a direct confirm would have answered.
+    """
+
+    __tablename__ = "checkout_queue"
+    __table_args__ = (
+        UniqueConstraint("user_id", "idempotency_key", name="uq_checkout_queue_user_key"),
+        Index("ix_checkout_queue_branch_status_id", "branch_id", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    branch_id = Column(Integer, ForeignKey("branches.id"), nullable=False)
+    idempotency_key = Column(String(128), nullable=False)
+    request_hash = Column(String(256), nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(
+        SQLEnum(CheckoutQueueStatus, name="checkout_queue_status"),
+        nullable=False,
+        default=CheckoutQueueStatus.QUEUED,
+    )
+    status_code = Column(Integer, nullable=True)
+    response_payload = Column(JSON, nullable=True)
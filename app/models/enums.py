@@ -12,6 +12,7 @@ class MembershipTier(str, Enum):
     PREMIUM = "PREMIUM"
 
 class OrderStatus(str, Enum):
+    PENDING_PAYMENT = "PENDING_PAYMENT"
     CREATED = "CREATED"
     IN_PROGRESS = "IN_PROGRESS"
     READY = "READY"
@@ -48,3 +49,14 @@ class IdempotencyStatus(str, Enum):
     IN_PROGRESS = "IN_PROGRESS"
     SUCCEEDED = "SUCCEEDED"
     FAILED = "FAILED"
+
+class PaymentOutboxStatus(str, Enum):
+    PENDING = "PENDING"
+    CHARGING = "CHARGING"
+    CAPTURED = "CAPTURED"
+    FAILED = "FAILED"
+
+class CheckoutQueueStatus(str, Enum):
+    QUEUED = "QUEUED"
+    DONE = "DONE"
+    FAILED = "FAILED"
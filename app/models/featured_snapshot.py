@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from sqlalchemy import JSON, Column, DateTime, Integer
+
+from .base import Base
+
+class FeaturedSnapshot(Base):
+    """Pre-serialized featured product list per branch (branch_id 0 = no branch)."""
+
+    __tablename__ = "featured_snapshots"
+
+    branch_id = Column(Integer, primary_key=True, autoincrement=False)
+    catalog_version = Column(Integer, nullable=False, default=0)
+    items = Column(JSON, nullable=False)
+    built_at = Column(DateTime, nullable=False)
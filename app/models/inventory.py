@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy import Column, ForeignKey, Index, Integer, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from .base import Base, TimestampMixin
@@ -9,6 +9,7 @@ class Inventory(Base, TimestampMixin):
     __tablename__ = "inventory"
     __table_args__ = (
         UniqueConstraint("product_id", "branch_id", name="uq_inventory_product_branch"),
+        Index("ix_inventory_updated_at", "updated_at"),
     )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -18,6 +19,9 @@ class Inventory(Base, TimestampMixin):
     available_quantity = Column(Integer, nullable=False, default=0)
     reserved_quantity = Column(Integer, nullable=False, default=0)
     reorder_point = Column(Integer, nullable=False, default=0)
+    # >0 spreads available stock over that many inventory_shards rows; available_quantity then
+    # mirrors their sum and is refreshed by InventoryShardService.sync_mirrors.
+    shard_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     product = relationship("Product", back_populates="inventory")
     branch = relationship("Branch", back_populates="inventory")
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, UniqueConstraint
+
+from .base import Base, TimestampMixin
+
+class InventoryReservation(Base, TimestampMixin):
+    """Stock held for a cart between starting checkout and confirming it.
+
+    The held quantity has already moved from ``Inventory.available_quantity`` to
+    ``reserved_quantity``; the row records which cart owns it and until when.
+    """
+
+    __tablename__ = "inventory_reservations"
+    __table_args__ = (
+        UniqueConstraint("cart_id", "product_id", name="uq_inventory_reservations_cart_product"),
+        Index("ix_inventory_reservations_expires_at", "expires_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    cart_id = Column(Integer, ForeignKey("carts.id"), nullable=False)
+    branch_id = Column(Integer, ForeignKey("branches.id"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, ForeignKey, Integer, UniqueConstraint
+
+from .base import Base
+
+class InventoryShard(Base):
+    """One slice of a hot inventory row's available stock (see ``Inventory.shard_count``)."""
+
+    __tablename__ = "inventory_shards"
+    __table_args__ = (UniqueConstraint("inventory_id", "shard_no", name="uq_inventory_shards_inventory_shard"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    inventory_id = Column(Integer, ForeignKey("inventory.id", ondelete="CASCADE"), nullable=False)
+    shard_no = Column(Integer, nullable=False)
+    quantity = Column(Integer, nullable=False, default=0)
@@ -21,6 +21,7 @@ class Order(Base, TimestampMixin):
         Index("ix_orders_user_id", "user_id"),
         Index("ix_orders_status", "status"),
         Index("ix_orders_created_at", "created_at"),
+        Index("ix_orders_user_created_at", "user_id", "created_at", "id"),
     )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
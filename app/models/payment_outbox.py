@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from sqlalchemy import TIMESTAMP, Column, Enum as SQLEnum, ForeignKey, Index, Integer, Numeric, String
+
+from .base import Base, TimestampMixin
+from .enums import PaymentOutboxStatus
+
+class PaymentOutbox(Base, TimestampMixin):
+    """A charge still owed for an order that checkout committed as PENDING_PAYMENT.
+
+    Written in the same transaction as the order; the payment worker captures it afterwards,
+    outside any inventory lock, and either finalizes the order or compensates it. CHARGING is
+    committed before the provider is called, so an entry whose outcome is unknown is reconciled
+    with the provider rather than charged again.
+    """
+
+    __tablename__ = "payment_outbox"
+    __table_args__ = (Index("ix_payment_outbox_status_id", "status", "id"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, unique=True)
+    payment_token_id = Column(Integer, nullable=False)
+    amount = Column(Numeric(12, 2), nullable=False)
+    status = Column(
+        SQLEnum(PaymentOutboxStatus, name="payment_outbox_status"),
+        nullable=False,
+        default=PaymentOutboxStatus.PENDING,
+    )
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String(256), nullable=True)
+    payment_reference = Column(String(128), nullable=True)
+    charge_started_at = Column(TIMESTAMP, nullable=True)
+
+    @property
+    def charge_key(self) -> str:
+        """Idempotency key sent to the provider; every attempt for an order reuses it."""
+        return f"order-{self.order_id}"
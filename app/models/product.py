@@ -1,14 +1,31 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, ForeignKey, Index, Numeric, String, text, Integer, JSON, Boolean, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import DDL, Column, ForeignKey, Index, Numeric, String, event, text, Integer, JSON, Boolean, Text
+from sqlalchemy.orm import deferred, relationship
 from .base import Base, SoftDeleteMixin, TimestampMixin
 
+# Postgres-only search indexes; see app/services/catalog/search.py for the matching expressions.
+_SEARCH_TSV = text(
+    "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(sku, '') || ' ' || coalesce(description, ''))"
+)
+
+# Columns only the product detail view needs; list queries leave them unloaded.
+DETAIL_GROUP = "detail"
+
 class Product(Base, TimestampMixin, SoftDeleteMixin):
     __tablename__ = "products"
     __table_args__ = (
         Index("ix_products_name", "name"),
         Index("ix_products_category_id", "category_id"),
+        Index("ix_products_search_tsv", _SEARCH_TSV, postgresql_using="gin").ddl_if(dialect="postgresql"),
+        Index(
+            "ix_products_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_products_sku_trgm", "sku",
+            postgresql_using="gin", postgresql_ops={"sku": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
     )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -18,11 +35,18 @@ class Product(Base, TimestampMixin, SoftDeleteMixin):
     price = Column(Numeric(12, 2), nullable=False)
     old_price = Column(Numeric(12, 2), nullable=True)
     unit = Column(String(24), nullable=True)
-    nutritional_info = Column(JSON, nullable=True)
+    nutritional_info = deferred(Column(JSON, nullable=True), group=DETAIL_GROUP)
     is_organic = Column(Boolean, nullable=False, server_default=text('false'))
-    description = Column(Text, nullable=True)
-    bin_location = Column(String(64), nullable=True)
+    description = deferred(Column(Text, nullable=True), group=DETAIL_GROUP)
+    bin_location = deferred(Column(String(64), nullable=True), group=DETAIL_GROUP)
     image_url = Column(String(256), nullable=True)
 
     category = relationship("Category", back_populates="products")
     inventory = relationship("Inventory", back_populates="product", cascade="all, delete-orphan")
+
+
+event.listen(
+    Product.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
@@ -5,6 +5,7 @@ from flask_jwt_extended import jwt_required
 
 from app.middleware.error_handler import DomainError
 from app.services.inventory_service import InventoryService
+from app.services.inventory_shards import InventoryShardService
 from app.services.branch import BranchCoreService, DeliverySlotService
 from app.utils.request_params import optional_int, safe_int, toggle_flag
 from app.utils.responses import success_envelope 
@@ -16,6 +17,7 @@ from app.schemas.branches import (
     BranchAdminRequest,
     DeliverySlotAdminRequest,
     InventoryCreateRequest,
+    InventoryShardsRequest,
     InventoryUpdateRequest,
 )
 blueprint = Blueprint("admin_branches", __name__)
@@ -101,6 +103,9 @@ def list_inventory():
     offset = safe_int(request.args, "offset", 0)
     branch_id = optional_int(request.args, "branchId")
     product_id = optional_int(request.args, "productId")
+    if "cursor" in request.args:
+        payload = InventoryService.list_inventory_keyset(branch_id, product_id, limit, request.args["cursor"])
+        return jsonify(success_envelope(payload))
     payload = InventoryService.list_inventory(branch_id, product_id, limit, offset)
     return jsonify(success_envelope(payload))
 
@@ -124,6 +129,24 @@ def create_inventory():
     inventory = InventoryService.create_inventory(payload)
     return jsonify(success_envelope(inventory)), 201
 
+## UPDATE (Inventory Shards)
+@blueprint.put("/inventory/<int:inventory_id>/shards")
+@jwt_required()
+@require_role(Role.MANAGER, Role.ADMIN)
+def configure_inventory_shards(inventory_id: int):
+    payload = InventoryShardsRequest.model_validate(request.get_json())
+    shards = InventoryShardService.configure(inventory_id, payload.shard_count)
+    return jsonify(success_envelope(shards))
+
+
+## UPDATE (Inventory Shards Rebalance)
+@blueprint.post("/inventory/<int:inventory_id>/shards/rebalance")
+@jwt_required()
+@require_role(Role.MANAGER, Role.ADMIN)
+def rebalance_inventory_shards(inventory_id: int):
+    shards = InventoryShardService.rebalance(inventory_id)
+    return jsonify(success_envelope(shards))
+
 # Endpoint: GET /admin/delivery-slots
 ## READ (Delivery Slots)
 @blueprint.get("/delivery-slots")
@@ -11,7 +11,7 @@ from app.middleware.auth import require_role
 from app.middleware.error_handler import DomainError
 from app.models.enums import Role
 from app.services.audit_service import AuditQueryService
-from app.utils.responses import pagination_envelope, success_envelope
+from app.utils.responses import cursor_envelope, pagination_envelope, success_envelope
 
 blueprint = Blueprint("audit", __name__)
 
@@ -47,5 +47,8 @@ def _parse_filters() -> tuple[dict, int, int]:
 @require_role(Role.MANAGER, Role.ADMIN)
 def list_audit():
     filters, limit, offset = _parse_filters()
+    if "cursor" in request.args:
+        rows, next_cursor = AuditQueryService.list_logs_keyset(filters, limit, request.args["cursor"])
+        return jsonify(success_envelope(rows, pagination=cursor_envelope(limit, next_cursor)))
     rows, total = AuditQueryService.list_logs(filters, limit, offset)
     return jsonify(success_envelope(rows, pagination=pagination_envelope(total, limit, offset)))
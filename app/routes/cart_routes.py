@@ -5,7 +5,7 @@ from __future__ import annotations
 from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required
 
-from app.schemas.cart import CartItemUpsertRequest
+from app.schemas.cart import CartBatchRequest, CartItemUpsertRequest
 from app.services.cart_service import CartService
 from app.services.cart import helpers
 from app.utils.request_utils import current_user_id, parse_json_or_400
@@ -33,6 +33,16 @@ def add_item():
     return jsonify(success_envelope(cart)), 201
 
 
+## UPDATE (Cart Items, batch)
+@blueprint.put("/items")
+@jwt_required()
+def set_items():
+    user_id = current_user_id()
+    payload = CartBatchRequest.model_validate(parse_json_or_400())
+    result = CartService.set_items(user_id, payload.items)
+    return jsonify(success_envelope(result))
+
+
 ## UPDATE (Cart Item)
 @blueprint.put("/items/<int:item_id>")
 @jwt_required()
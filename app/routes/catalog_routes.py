@@ -5,17 +5,25 @@ from __future__ import annotations
 # PUBLIC: All endpoints in this file are intentionally unauthenticated for catalog browsing.
 from flask import Blueprint, jsonify, request
 
-from app.services.catalog import CatalogQueryService
+from app.middleware.error_handler import DomainError
+from app.middleware.http_cache import conditional_get
+from app.services.catalog import CatalogQueryService, FeaturedSnapshotService, parse_fields
 from app.utils.request_params import optional_int, safe_int
-from app.utils.responses import success_envelope 
+from app.utils.responses import cursor_envelope, success_envelope 
 from app.schemas.query_params import ProductSearchQuery
 
 
 blueprint = Blueprint("catalog", __name__)
+catalog_cache = conditional_get(CatalogQueryService.cache_validator, "CATALOG_CACHE_MAX_AGE")
+featured_cache = conditional_get(
+    lambda: FeaturedSnapshotService.cache_validator(optional_int(request.args, "branchId")),
+    "CATALOG_CACHE_MAX_AGE",
+)
 
 
 ## READ (List Categories)
 @blueprint.get("/categories")
+@catalog_cache
 def list_categories():
     limit = safe_int(request.args, "limit", 50)
     offset = safe_int(request.args, "offset", 0)
@@ -25,44 +33,95 @@ def list_categories():
 
 ## READ (Category Products)
 @blueprint.get("/categories/<int:category_id>/products")
+@catalog_cache
 def category_products(category_id):
     limit = safe_int(request.args, "limit", 50)
     offset = safe_int(request.args, "offset", 0)
     branch_id = optional_int(request.args, "branchId")
-    products, total = CatalogQueryService.get_category_products(category_id, branch_id, limit, offset)
+    fields = parse_fields(request.args.get("fields"))
+    products, total = CatalogQueryService.get_category_products(category_id, branch_id, limit, offset, fields)
     return jsonify(success_envelope(products, {"total": total, "limit": limit, "offset": offset}))
 
 
+## READ (Batch Products)
+@blueprint.get("/products")
+@catalog_cache
+def get_products():
+    raw = request.args.get("ids", "")
+    try:
+        ids = [int(part) for part in raw.split(",") if part.strip()]
+    except ValueError:
+        raise DomainError("BAD_REQUEST", "ids must be a comma-separated list of integers", status_code=400)
+    if not ids:
+        raise DomainError("BAD_REQUEST", "ids is required", status_code=400)
+    branch_id = optional_int(request.args, "branchId")
+    fields = parse_fields(request.args.get("fields"))
+    products, missing = CatalogQueryService.get_products(ids, branch_id, fields)
+    return jsonify(success_envelope(products, {"count": len(products), "missing": missing}))
+
+
 ## READ (Get Product)
 @blueprint.get("/products/<int:product_id>")
+@catalog_cache
 def get_product(product_id):
     branch_id = optional_int(request.args, "branchId")
-    product = CatalogQueryService.get_product(product_id, branch_id)
+    fields = parse_fields(request.args.get("fields"))
+    product = CatalogQueryService.get_product(product_id, branch_id, fields)
     return jsonify(success_envelope(product))
 
 
 ## READ (Search Products)
 @blueprint.get("/products/search")
+@catalog_cache
 def search_products():
     params = ProductSearchQuery(**request.args)
-    products, total = CatalogQueryService.search_products(
-        params.q, None, None, None, params.limit, params.offset, params.min_price, params.max_price, None, params.sort
-    )
+    fields = parse_fields(params.fields)
+    if params.cursor is not None:
+        products, next_cursor = CatalogQueryService.search_products_keyset(
+            params.q, None, None, None, params.limit, params.cursor, params.min_price, params.max_price, None, params.sort,
+            fields,
+        )
+        return jsonify(success_envelope(products, cursor_envelope(params.limit, next_cursor)))
+    if params.count != "exact" and not params.facets:
+        products, has_next, total = CatalogQueryService.search_products_uncounted(
+            params.q, None, None, None, params.limit, params.offset, params.count == "estimate",
+            params.min_price, params.max_price, None, params.sort, fields,
+        )
+        meta = {"limit": params.limit, "offset": params.offset, "has_next": has_next}
+        if total is not None:
+            meta.update(total=total, total_is_estimate=True)
+        return jsonify(success_envelope(products, meta))
+    facets = None
+    if params.facets:
+        products, total, facets = CatalogQueryService.faceted_search(
+            params.q, None, None, None, params.limit, params.offset, set(params.facets.split(",")),
+            params.min_price, params.max_price, None, params.sort, fields,
+        )
+    else:
+        products, total = CatalogQueryService.search_products(
+            params.q, None, None, None, params.limit, params.offset, params.min_price, params.max_price, None, params.sort,
+            fields,
+        )
     has_next = total > (params.offset + params.limit)
     meta = {"total": total, "limit": params.limit, "offset": params.offset, "has_next": has_next}
+    if facets is not None:
+        meta["facets"] = facets
     return jsonify(success_envelope(products, meta))
     
 ## READ (Featured Products)
 @blueprint.get("/products/featured")
+@featured_cache
 def featured_products():
     limit = safe_int(request.args, "limit", 10)
     branch_id = optional_int(request.args, "branchId")
-    products = CatalogQueryService.featured_products(limit, branch_id)
-    return jsonify(success_envelope(products))
+    fields = parse_fields(request.args.get("fields"))
+    products, age = FeaturedSnapshotService.get(limit, branch_id, fields)
+    return jsonify(success_envelope(products, {"snapshot_age_seconds": age}))
 
 
 ## READ (Autocomplete Products)
 @blueprint.get("/products/autocomplete")
+@catalog_cache
 def autocomplete():
     query = request.args.get("q")
     limit = safe_int(request.args, "limit", 10)
@@ -5,8 +5,10 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 
 from app.middleware.error_handler import DomainError
-from app.schemas.checkout import CheckoutConfirmRequest, CheckoutPreviewRequest
+from app.schemas.checkout import CheckoutConfirmRequest, CheckoutPreviewRequest, CheckoutReserveRequest
+from app.services.checkout_queue import CheckoutQueueService
 from app.services.checkout_service import CheckoutService
+from app.utils.request_utils import current_user_id
 from app.utils.responses import success_envelope
 
 blueprint = Blueprint("checkout", __name__)
@@ -24,6 +26,14 @@ def preview():
     result = CheckoutService.preview(payload)
     return jsonify(success_envelope(result))
 
+## CREATE (Checkout Reservation)
+@blueprint.post("/reserve")
+@jwt_required()
+def reserve():
+    payload = _parse(CheckoutReserveRequest, request.get_json())
+    result = CheckoutService.reserve(payload)
+    return jsonify(success_envelope(result))
+
 ## CREATE (Checkout Confirm)
 @blueprint.post("/confirm")
 @jwt_required()
@@ -34,6 +44,17 @@ def confirm():
         raise DomainError("MISSING_IDEMPOTENCY_KEY", "Idempotency-Key header is required", status_code=400)
 
     payload = _parse(CheckoutConfirmRequest, json_data)
+    if CheckoutQueueService.enabled():
+        wait = request.args.get("wait", default=0.0, type=float)
+        result, status_code = CheckoutQueueService.admit(payload, idempotency_key, wait)
+        return jsonify(success_envelope(result)), status_code
     result, is_new = CheckoutService.confirm(payload, idempotency_key)
     status_code = 201 if is_new else 200
     return jsonify(success_envelope(result)), status_code
+
+## READ (Queued Confirm Status)
+@blueprint.get("/confirm/<int:ticket_id>")
+@jwt_required()
+def confirm_status(ticket_id: int):
+    result = CheckoutQueueService.status(ticket_id, current_user_id())
+    return jsonify(success_envelope(result))
@@ -1,11 +1,11 @@
 """Customer order endpoints."""
 
 from __future__ import annotations
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 from app.services.order_service import OrderService
 from app.utils.request_utils import current_user_id, parse_pagination
-from app.utils.responses import pagination_envelope, success_envelope
+from app.utils.responses import cursor_envelope, pagination_envelope, success_envelope
 
 blueprint = Blueprint("orders", __name__)
 
@@ -15,6 +15,9 @@ blueprint = Blueprint("orders", __name__)
 def list_orders():
     user_id = current_user_id()
     limit, offset = parse_pagination()
+    if "cursor" in request.args:
+        orders, next_cursor = OrderService.list_orders_keyset(user_id, limit, request.args["cursor"])
+        return jsonify(success_envelope(orders, cursor_envelope(limit, next_cursor)))
     orders, total = OrderService.list_orders(user_id, limit, offset)
     return jsonify(success_envelope(orders, pagination_envelope(total, limit, offset)))
 
@@ -5,6 +5,7 @@ from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required
 
 from app.schemas.store import WishlistRequest
+from app.services.settings_service import SettingsService
 from app.services.store import WishlistService
 from app.utils.request_utils import current_user_id, parse_json_or_400
 from app.utils.responses import success_envelope 
@@ -42,8 +43,9 @@ def notifications():
 # PUBLIC ENDPOINT
 @blueprint.get("/shipping-info")
 def shipping_info():
-    """Return the available shipping policies."""
-    return jsonify(success_envelope({"policies": _SHIPPING_POLICIES}))
+    """Return the available shipping policies and the current delivery pricing."""
+    delivery = SettingsService.snapshot().to_public_dict()
+    return jsonify(success_envelope({"policies": _SHIPPING_POLICIES, "delivery": delivery}))
 
 ## READ (Wishlist)
 @blueprint.get("/wishlist")
@@ -2,7 +2,7 @@
 
 from .auth import AuthResponse, ChangePasswordRequest, LoginRequest, RegisterRequest, UserResponse
 from .audit import AuditQuery, AuditResponse
-from .cart import CartItemResponse, CartItemUpsertRequest, CartResponse
+from .cart import CartBatchRequest, CartBatchResponse, CartItemResponse, CartItemUpsertRequest, CartResponse
 from .branches import (
     BranchAdminRequest,
     BranchResponse,
@@ -10,6 +10,8 @@ from .branches import (
     DeliverySlotResponse,
     InventoryListResponse,
     InventoryResponse,
+    InventoryShardsRequest,
+    InventoryShardsResponse,
     InventoryUpdateRequest,
 )
 from .catalog import (
@@ -21,12 +23,17 @@ from .catalog import (
     ProductResponse,
     ProductSearchResponse,
     ProductUpdateRequest,
+    SearchFacets,
 )
 from .checkout import (
     CheckoutConfirmRequest,
     CheckoutConfirmResponse,
     CheckoutPreviewRequest,
     CheckoutPreviewResponse,
+    CheckoutQueueTicketResponse,
+    CheckoutReservationResponse,
+    CheckoutReserveRequest,
+    ReservedLine,
 )
 from .common import DefaultModel, ErrorResponse, PaginatedResponse, Pagination
 from .orders import CancelOrderResponse, OrderListResponse, OrderResponse
@@ -56,21 +63,30 @@ __all__ = [
     "DeliverySlotResponse",
     "InventoryListResponse",
     "InventoryResponse",
+    "InventoryShardsRequest",
+    "InventoryShardsResponse",
     "InventoryUpdateRequest",
     "ProductResponse",
     "ProductSearchResponse",
+    "SearchFacets",
     "ProductUpdateRequest",
     "AutocompleteItem",
     "AutocompleteResponse",
     "CategoryAdminRequest",
     "ProductAdminRequest",
     "CartItemUpsertRequest",
+    "CartBatchRequest",
+    "CartBatchResponse",
     "CartItemResponse",
     "CartResponse",
     "CheckoutPreviewRequest",
     "CheckoutPreviewResponse",
     "CheckoutConfirmRequest",
     "CheckoutConfirmResponse",
+    "CheckoutReserveRequest",
+    "CheckoutQueueTicketResponse",
+    "CheckoutReservationResponse",
+    "ReservedLine",
     "OrderItemResponse",
     "OrderResponse",
     "OrderListResponse",
@@ -3,7 +3,7 @@ from datetime import time
 
 from typing import Optional
 from pydantic import Field
-from .common import DefaultModel, Pagination
+from .common import CursorPagination, DefaultModel, Pagination
 
 class BranchResponse(DefaultModel):
     id: int = Field(gt=0)
@@ -33,7 +33,7 @@ class InventoryResponse(DefaultModel):
 
 class InventoryListResponse(DefaultModel):
     items: list[InventoryResponse]
-    pagination: Pagination
+    pagination: Pagination | CursorPagination
 
 class InventoryUpdateRequest(DefaultModel):
     available_quantity: int = Field(ge=0)
@@ -45,6 +45,15 @@ class InventoryCreateRequest(DefaultModel):
     available_quantity: int = Field(ge=0)
     reserved_quantity: int = Field(ge=0)
 
+class InventoryShardsRequest(DefaultModel):
+    shard_count: int = Field(ge=0, le=64)
+
+class InventoryShardsResponse(DefaultModel):
+    inventory_id: int
+    shard_count: int
+    available_quantity: int
+    shards: list[int]
+
 class BranchAdminRequest(DefaultModel):
     name: str
     address: str
@@ -21,3 +21,21 @@ class CartResponse(DefaultModel):
     user_id: int = Field(gt=0)
     total_amount: Decimal = Field(ge=0, le=100000)
     items: list[CartItemResponse]
+    delivery_fee: Decimal | None = None
+    amount_to_free_delivery: Decimal | None = None
+
+class CartBatchLine(DefaultModel):
+    product_id: int = Field(gt=0)
+    quantity: int = Field(ge=0, le=10000)
+
+class CartBatchRequest(DefaultModel):
+    items: list[CartBatchLine] = Field(min_length=1, max_length=200)
+
+class CartLineFailure(DefaultModel):
+    product_id: int
+    code: str
+    message: str
+
+class CartBatchResponse(DefaultModel):
+    cart: CartResponse
+    failed: list[CartLineFailure]
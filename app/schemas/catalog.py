@@ -37,6 +37,20 @@ class ProductSearchResponse(DefaultModel):
     items: list[ProductResponse]
     pagination: Pagination
 
+class CategoryFacet(DefaultModel):
+    category_id: int
+    count: int
+
+class PriceBucketFacet(DefaultModel):
+    min: int
+    max: int | None = None
+    count: int
+
+class SearchFacets(DefaultModel):
+    categories: list[CategoryFacet] | None = None
+    price: list[PriceBucketFacet] | None = None
+    organic: int | None = None
+
 class AutocompleteItem(DefaultModel):
     id: int
     name: str
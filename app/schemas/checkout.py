@@ -1,9 +1,10 @@
 from __future__ import annotations
 from enum import Enum
+from datetime import datetime
 from decimal import Decimal
 from pydantic import Field
 from .common import DefaultModel
-from ..models.enums import FulfillmentType
+from ..models.enums import CheckoutQueueStatus, FulfillmentType, OrderStatus
 
 class FulfillmentChoice(str, Enum):
     DELIVERY = "DELIVERY"
@@ -27,6 +28,20 @@ class CheckoutPreviewResponse(DefaultModel):
     missing_items: list[MissingItem]
     fulfillment_type: FulfillmentType
 
+class CheckoutReserveRequest(DefaultModel):
+    cart_id: int = Field(gt=0)
+    fulfillment_type: FulfillmentType
+    branch_id: int | None = Field(default=None, gt=0)
+
+class ReservedLine(DefaultModel):
+    product_id: int
+    quantity: int
+
+class CheckoutReservationResponse(DefaultModel):
+    expires_at: datetime | None
+    reserved: list[ReservedLine]
+    missing_items: list[MissingItem]
+
 class CheckoutConfirmRequest(DefaultModel):
     cart_id: int = Field(gt=0)
     payment_token_id: int = Field(gt=0)
@@ -41,3 +56,12 @@ class CheckoutConfirmResponse(DefaultModel):
     order_number: str
     total_paid: Decimal
     payment_reference: str | None = None
+    status: OrderStatus | None = None
+
+class CheckoutQueueTicketResponse(DefaultModel):
+    ticket_id: int
+    status: CheckoutQueueStatus
+    status_url: str
+    position: int | None = None
+    result: CheckoutConfirmResponse | None = None
+    error: dict | None = None
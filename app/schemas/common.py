@@ -42,6 +42,10 @@ class Pagination(DefaultModel):
     limit: int = Field(ge=0)
     offset: int = Field(ge=0)
 
+class CursorPagination(DefaultModel):
+    limit: int = Field(ge=0)
+    next_cursor: str | None = None
+
 class PaginatedResponse(DefaultModel, Generic[T]):
     data: list[T]
     pagination: Pagination
@@ -9,3 +9,7 @@ class ProductSearchQuery(DefaultModel):
     min_price: Optional[float] = Field(default=None, ge=0)
     max_price: Optional[float] = Field(default=None, ge=0)
     sort: Optional[str] = Field(default=None, pattern=r"^(price|name|date)$")
+    cursor: Optional[str] = None
+    fields: Optional[str] = None
+    count: str = Field(default="exact", pattern=r"^(exact|false|estimate)$")
+    facets: Optional[str] = Field(default=None, pattern=r"^(category|price|organic)(,(category|price|organic))*$")
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import select , func 
-from datetime import datetime
+from sqlalchemy import insert, select , func 
 from sqlalchemy.orm import selectinload
 from sqlalchemy.orm import Session
 
@@ -44,18 +43,70 @@ class AuditService:
             old_value=AuditService._serialize_for_json(old_value) if old_value else None,
             new_value=AuditService._serialize_for_json(new_value) if new_value else None,
             context=AuditService._serialize_for_json(context) if context else None,
-            created_at=datetime.utcnow(),
         )
         session.add(entry)
         session.flush()  # Flush but let caller commit
         return entry
 
+    @staticmethod
+    def log_events(events: list[dict[str, object]]) -> None:
+        """Write many audit rows with one multi-row INSERT; each dict takes log_event's keywords.
+
+        Like log_event, rows take created_at from the column's server default, so audit keyset
+        pages on (created_at, id) compare timestamps from a single clock.
+        """
+        if not events:
+            return
+        rows = []
+        for event in events:
+            entity_id = event.get("entity_id") or event.get("actor_user_id") or 0
+            rows.append(
+                {
+                    "entity_type": event["entity_type"],
+                    "action": event["action"],
+                    "actor_user_id": event.get("actor_user_id"),
+                    "entity_id": entity_id,
+                    **{
+                        key: AuditService._serialize_for_json(event[key]) if event.get(key) else None
+                        for key in ("old_value", "new_value", "context")
+                    },
+                }
+            )
+        db.session.execute(insert(Audit).values(rows))
+
 class AuditQueryService:
     @staticmethod
     def list_logs(filters: dict, limit: int, offset: int) -> tuple[list[dict], int]:
         from app.services.shared_queries import SharedOperations
         
-        stmt = select(Audit).options(selectinload(Audit.actor)).order_by(Audit.created_at.desc())
+        stmt = AuditQueryService._filtered(filters).order_by(Audit.created_at.desc())
+        
+        def transform(row):
+            return AuditQueryService._to_dict(row)
+        
+        rows, total = SharedOperations.paginate_query(
+            base_query=stmt,
+            model_class=Audit,
+            limit=limit,
+            offset=offset,
+            transform_fn=transform,
+        )
+        return rows, total
+
+    @staticmethod
+    def list_logs_keyset(filters: dict, limit: int, cursor: str | None) -> tuple[list[dict], str | None]:
+        return SharedOperations.paginate_keyset(
+            base_query=AuditQueryService._filtered(filters),
+            sort_column=Audit.created_at,
+            id_column=Audit.id,
+            limit=limit,
+            cursor=cursor,
+            transform_fn=AuditQueryService._to_dict,
+        )
+
+    @staticmethod
+    def _filtered(filters: dict):
+        stmt = select(Audit).options(selectinload(Audit.actor))
         
         # Build conditions for filtering
         conditions = {
@@ -81,19 +132,7 @@ class AuditQueryService:
             ),
         }
         
-        stmt = SharedOperations.build_filtered_query(stmt, conditions)
-        
-        def transform(row):
-            return AuditQueryService._to_dict(row)
-        
-        rows, total = SharedOperations.paginate_query(
-            base_query=stmt,
-            model_class=Audit,
-            limit=limit,
-            offset=offset,
-            transform_fn=transform,
-        )
-        return rows, total
+        return SharedOperations.build_filtered_query(stmt, conditions)
 
     @staticmethod
     def _to_dict(row: Audit) -> dict:
@@ -1,4 +1,4 @@
-from app.services.branch.core_service import BranchCoreService
+from app.services.branch.core_service import BranchCoreService, BranchSnapshot
 from app.services.branch.delivery_slot_service import DeliverySlotService
 
-__all__ = ["BranchCoreService", "DeliverySlotService"]
+__all__ = ["BranchCoreService", "BranchSnapshot", "DeliverySlotService"]
@@ -1,4 +1,7 @@
 from __future__ import annotations
+import time
+from dataclasses import dataclass
+from flask import current_app
 from sqlalchemy import func, select
 from app.extensions import db
 from app.middleware.error_handler import DomainError
@@ -6,12 +9,56 @@ from app.models import Branch
 from app.schemas.branches import BranchResponse
 from app.services.shared_queries import SharedOperations
 from app.services.audit_service import AuditService
+from app.services.cache_version_service import BRANCHES, CacheVersionService
+
+
+@dataclass(frozen=True)
+class BranchSnapshot:
+    """Detached, immutable view of a branch that is safe to share across requests."""
+
+    id: int
+    name: str
+    is_active: bool
+
+
+@dataclass(frozen=True)
+class _CachedSource:
+    config_value: str
+    version: int
+    branch: BranchSnapshot
+    checked_at: float
 
 
 class BranchCoreService:
+    _delivery_source: _CachedSource | None = None
+
+    @staticmethod
+    def ensure_delivery_source_branch_exists(branch_id: str) -> BranchSnapshot:
+        """Ensure configured DELIVERY_SOURCE_BRANCH_ID exists; raise if not.
+
+        The resolved branch is cached per worker. Branch writes in this worker drop it at once;
+        other workers notice the bumped ``branches`` version within BRANCH_CACHE_CHECK_SECONDS.
+        """
+        cached = BranchCoreService._delivery_source
+        if cached is not None and cached.config_value == branch_id:
+            interval = float(current_app.config.get("BRANCH_CACHE_CHECK_SECONDS", 30))
+            if time.monotonic() - cached.checked_at < interval:
+                return cached.branch
+            version = CacheVersionService.current(BRANCHES)
+            if version == cached.version:
+                BranchCoreService._delivery_source = _CachedSource(
+                    branch_id, version, cached.branch, time.monotonic()
+                )
+                return cached.branch
+        else:
+            version = CacheVersionService.current(BRANCHES)
+        branch = BranchCoreService._load_delivery_source(branch_id)
+        snapshot = BranchSnapshot(id=branch.id, name=branch.name, is_active=branch.is_active)
+        BranchCoreService._delivery_source = _CachedSource(branch_id, version, snapshot, time.monotonic())
+        return snapshot
+
     @staticmethod
-    def ensure_delivery_source_branch_exists(branch_id: str) -> Branch:
-        """Ensure configured DELIVERY_SOURCE_BRANCH_ID exists; raise if not."""
+    def _load_delivery_source(branch_id: str) -> Branch:
         if not branch_id:
             raise DomainError(
                 "CONFIG_ERROR",
@@ -73,7 +120,9 @@ class BranchCoreService:
         branch.address = address
 
         db.session.add(branch)
+        CacheVersionService.bump(BRANCHES)
         db.session.commit()
+        BranchCoreService._delivery_source = None
         AuditService.log_event(
             entity_type="branch",
             action="UPDATE",
@@ -90,7 +139,9 @@ class BranchCoreService:
             raise DomainError("NOT_FOUND", "Branch not found", status_code=404)
         branch.is_active = active
         db.session.add(branch)
+        CacheVersionService.bump(BRANCHES)
         db.session.commit()
+        BranchCoreService._delivery_source = None
         AuditService.log_event(
             entity_type="branch",
             action="DEACTIVATE" if not active else "ACTIVATE",
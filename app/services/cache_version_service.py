@@ -0,0 +1,53 @@
+"""Cross-worker version counters for per-process caches."""
+
+from __future__ import annotations
+
+import random
+
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models import CacheVersion
+
+CATALOG = "catalog"
+BRANCHES = "branches"
+SETTINGS = "settings"
+INVENTORY = "inventory"
+
+# Striped counters are spread over this many rows so concurrent writers rarely share one.
+STRIPES = 16
+
+
+class CacheVersionService:
+    @staticmethod
+    def current(name: str) -> int:
+        """Return the committed version of ``name`` (0 if never bumped)."""
+        row = db.session.get(CacheVersion, name, populate_existing=True)
+        return row.version if row else 0
+
+    @staticmethod
+    def bump(name: str) -> int:
+        """Increment ``name`` inside the caller's transaction and return the new version."""
+        row = db.session.get(CacheVersion, name, with_for_update=True)
+        if row is None:
+            row = CacheVersion(name=name, version=0)
+            db.session.add(row)
+        row.version = (row.version or 0) + 1
+        db.session.flush()
+        return row.version
+
+    @staticmethod
+    def current_striped(name: str) -> int:
+        """Return the committed total of ``name``'s stripes; any committed bump raises it."""
+        return db.session.scalar(
+            select(func.coalesce(func.sum(CacheVersion.version), 0)).where(CacheVersion.name.like(f"{name}:%"))
+        )
+
+    @staticmethod
+    def bump_striped(name: str) -> None:
+        """Increment one random stripe of ``name`` inside the caller's transaction.
+
+        For counters written by hot paths such as checkout: call it once per transaction, as
+        late as possible, since the stripe stays locked until commit.
+        """
+        CacheVersionService.bump(f"{name}:{random.randrange(STRIPES)}")
@@ -0,0 +1,46 @@
+"""Per-worker cart read cache keyed by the cart's committed version."""
+
+from __future__ import annotations
+
+from flask import current_app
+from sqlalchemy import select, update
+
+from ...extensions import db
+from ...models import Cart
+from ...schemas.cart import CartResponse
+from ...utils.ttl_cache import TTLCache
+
+
+class CartReadCache:
+    """Serves repeated GET /cart from one indexed version read instead of the joined view.
+
+    Every CartService mutation bumps ``carts.version`` in its own transaction, so a view cached
+    by any worker is only served while the cart is still at the version it was built from.
+    """
+
+    _views = TTLCache(maxsize=4096)
+
+    @staticmethod
+    def current(user_id: int) -> tuple[int, int] | None:
+        """Return the (cart_id, version) of the user's cart, or None if there is none yet."""
+        row = db.session.execute(
+            select(Cart.id, Cart.version).where(Cart.user_id == user_id).order_by(Cart.id).limit(1)
+        ).first()
+        return (row[0], row[1]) if row is not None else None
+
+    @staticmethod
+    def get(user_id: int, cart_id: int, version: int) -> CartResponse | None:
+        return CartReadCache._views.get((user_id, cart_id, version))
+
+    @staticmethod
+    def put(user_id: int, cart_id: int, version: int, view: CartResponse) -> None:
+        ttl = float(current_app.config.get("CART_CACHE_SECONDS", 5))
+        if ttl > 0:
+            CartReadCache._views.set((user_id, cart_id, version), view, ttl)
+
+    @staticmethod
+    def bump(cart_id: int) -> int:
+        """Increment the cart's version inside the caller's transaction and return it."""
+        return db.session.scalar(
+            update(Cart).where(Cart.id == cart_id).values(version=Cart.version + 1).returning(Cart.version)
+        )
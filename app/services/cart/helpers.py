@@ -2,12 +2,14 @@
 
 from __future__ import annotations
 from decimal import Decimal
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import selectinload
 
 from ...extensions import db
-from ...models import Cart
+from ...models import Cart, CartItem, Product
 from ...schemas.cart import CartItemResponse, CartResponse
+from ..settings_service import SettingsService
 
 def get_or_create_cart(user_id: int) -> Cart:
     """Get existing cart or create new one for user."""
@@ -23,11 +25,74 @@ def get_or_create_cart(user_id: int) -> Cart:
     return cart
 
 def reload_cart(cart_id: int) -> Cart:
-    """Reload cart with items from database."""
+    """Reload cart with items and their products in one eager load."""
     return db.session.execute(
-        select(Cart).where(Cart.id == cart_id).options(selectinload(Cart.items))
+        select(Cart)
+        .where(Cart.id == cart_id)
+        .options(
+            selectinload(Cart.items)
+            .joinedload(CartItem.product)
+            .load_only(Product.id, Product.name, Product.image_url)
+        )
+        .execution_options(populate_existing=True)
     ).scalar_one()
 
+def load_cart_view(cart_id: int | None = None, user_id: int | None = None) -> CartResponse | None:
+    """Build the cart response from one joined projection of cart, lines and product fields.
+
+    Looks the cart up by ``cart_id``, or by the user's first cart when only ``user_id`` is given.
+    """
+    if cart_id is None:
+        cart_id = select(Cart.id).where(Cart.user_id == user_id).order_by(Cart.id).limit(1).scalar_subquery()
+    rows = db.session.execute(
+        select(
+            Cart.id,
+            Cart.user_id,
+            CartItem.id,
+            CartItem.product_id,
+            CartItem.quantity,
+            CartItem.unit_price,
+            Product.name,
+            Product.image_url,
+        )
+        .select_from(Cart)
+        .outerjoin(CartItem, CartItem.cart_id == Cart.id)
+        .outerjoin(Product, Product.id == CartItem.product_id)
+        .where(Cart.id == cart_id)
+        .order_by(CartItem.id)
+    ).all()
+    if not rows:
+        return None
+    items = [
+        CartItemResponse(
+            id=item_id,
+            product_id=product_id,
+            quantity=quantity,
+            unit_price=Decimal(unit_price),
+            product_name=name,
+            product_image=image_url,
+        )
+        for _, _, item_id, product_id, quantity, unit_price, name, image_url in rows
+        if item_id is not None
+    ]
+    total = sum(item.unit_price * item.quantity for item in items)
+    return CartResponse(
+        id=rows[0][0],
+        user_id=rows[0][1],
+        total_amount=total,
+        items=items,
+        **delivery_totals(total),
+    )
+
+def delivery_totals(total) -> dict:
+    """Delivery fee for the cart total and what is left to reach free delivery, per current settings."""
+    settings = SettingsService.snapshot()
+    total = Decimal(total)
+    return {
+        "delivery_fee": settings.delivery_fee_for(total),
+        "amount_to_free_delivery": max(settings.free_delivery_from - total, Decimal("0")),
+    }
+
 def to_response(cart: Cart) -> CartResponse:
     """Convert cart model to response schema."""
     items = [
@@ -47,4 +112,28 @@ def to_response(cart: Cart) -> CartResponse:
         user_id=cart.user_id,
         total_amount=total,
         items=items,
+        **delivery_totals(total),
+    )
+
+def upsert_items(cart_id: int, lines: list[tuple[int, int, object]], accumulate: bool = True) -> None:
+    """Write (product_id, quantity, unit_price) lines with one INSERT ... ON CONFLICT.
+
+    With ``accumulate`` the quantity is added to an existing line, otherwise it replaces it.
+    """
+    if not lines:
+        return
+    dialect = db.session.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert(CartItem).values(
+        [
+            {"cart_id": cart_id, "product_id": product_id, "quantity": quantity, "unit_price": unit_price}
+            for product_id, quantity, unit_price in lines
+        ]
+    )
+    quantity = CartItem.quantity + stmt.excluded.quantity if accumulate else stmt.excluded.quantity
+    db.session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[CartItem.cart_id, CartItem.product_id],
+            set_={"quantity": quantity, "unit_price": stmt.excluded.unit_price, "updated_at": func.now()},
+        )
     )
@@ -2,12 +2,13 @@
 
 from __future__ import annotations
 from flask import current_app
-from sqlalchemy import select, func
+from sqlalchemy import case, func, select
 
 from ...extensions import db
 from ...middleware.error_handler import DomainError
-from ...models import Inventory, Product
+from ...models import Cart, CartItem, Inventory, Product
 from ...services.branch import BranchCoreService
+from ...services.inventory_shards import sellable_quantity
 
 
 def validate_product(product_id: int) -> Product:
@@ -21,7 +22,7 @@ def validate_product(product_id: int) -> Product:
 def assert_in_stock_anywhere(product: Product) -> None:
     """Assert product has stock in any branch."""
     total_available = db.session.scalar(
-        select(func.coalesce(func.sum(Inventory.available_quantity), 0))
+        select(func.coalesce(func.sum(sellable_quantity()), 0))
         .where(Inventory.product_id == product.id)
     )
     if total_available is None or total_available <= 0:
@@ -32,7 +33,7 @@ def assert_in_stock_delivery_branch(product: Product, required_quantity: int) ->
     """Assert product has sufficient stock in delivery branch."""
     branch_id = get_delivery_source_branch_id()
     branch_available = db.session.scalar(
-        select(func.coalesce(func.sum(Inventory.available_quantity), 0))
+        select(func.coalesce(func.sum(sellable_quantity()), 0))
         .where(Inventory.product_id == product.id, Inventory.branch_id == branch_id)
     )
     if branch_available is None or branch_available < required_quantity:
@@ -43,6 +44,84 @@ def assert_in_stock_delivery_branch(product: Product, required_quantity: int) ->
         )
 
 
+def load_line_context(user_id: int, product_id: int, branch_id: int):
+    """Product, both stock figures and the user's cart line in one statement.
+
+    Returns a row of (price, is_active, total_available, branch_available, cart_id,
+    existing_quantity), or None when the product does not exist.
+    """
+    quantity = sellable_quantity()
+    total_available = (
+        select(func.coalesce(func.sum(quantity), 0)).where(Inventory.product_id == product_id).scalar_subquery()
+    )
+    branch_available = (
+        select(func.coalesce(func.sum(quantity), 0))
+        .where(Inventory.product_id == product_id, Inventory.branch_id == branch_id)
+        .scalar_subquery()
+    )
+    cart_id = select(Cart.id).where(Cart.user_id == user_id).order_by(Cart.id).limit(1).scalar_subquery()
+    existing_quantity = (
+        select(CartItem.quantity)
+        .where(CartItem.cart_id == cart_id, CartItem.product_id == product_id)
+        .scalar_subquery()
+    )
+    return db.session.execute(
+        select(
+            Product.price,
+            Product.is_active,
+            total_available,
+            branch_available,
+            cart_id,
+            func.coalesce(existing_quantity, 0),
+        ).where(Product.id == product_id)
+    ).one_or_none()
+
+
+def line_error(is_active: bool | None, total_available, branch_available, required_quantity: int) -> DomainError | None:
+    """The error adding ``required_quantity`` of a product would raise, or None."""
+    if not is_active:
+        return DomainError("PRODUCT_INACTIVE", "Product is inactive or missing", status_code=404)
+    if total_available is None or total_available <= 0:
+        return DomainError("OUT_OF_STOCK_ANYWHERE", "Product is out of stock")
+    if branch_available is None or branch_available < required_quantity:
+        return DomainError(
+            "OUT_OF_STOCK_DELIVERY_BRANCH",
+            "Product is out of stock in the delivery warehouse",
+            status_code=409,
+        )
+    return None
+
+
+def assert_line_available(context, required_quantity: int) -> None:
+    """Apply the product/stock checks above to a ``load_line_context`` row."""
+    if context is None:
+        error = line_error(False, None, None, required_quantity)
+    else:
+        error = line_error(context[1], context[2], context[3], required_quantity)
+    if error:
+        raise error
+
+
+def load_products_stock(product_ids: list[int], branch_id: int) -> dict[int, tuple]:
+    """(price, is_active, total_available, branch_available) per product in one grouped query."""
+    if not product_ids:
+        return {}
+    quantity = func.coalesce(sellable_quantity(), 0)
+    rows = db.session.execute(
+        select(
+            Product.id,
+            Product.price,
+            Product.is_active,
+            func.sum(quantity),
+            func.sum(case((Inventory.branch_id == branch_id, quantity), else_=0)),
+        )
+        .outerjoin(Inventory, Inventory.product_id == Product.id)
+        .where(Product.id.in_(product_ids))
+        .group_by(Product.id, Product.price, Product.is_active)
+    ).all()
+    return {row[0]: tuple(row[1:]) for row in rows}
+
+
 def get_delivery_source_branch_id() -> int:
     """Get the delivery source branch ID from config."""
     source_id = current_app.config.get("DELIVERY_SOURCE_BRANCH_ID", "")
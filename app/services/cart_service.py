@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+from sqlalchemy import delete, select
+
 from ..extensions import db
 from ..middleware.error_handler import DomainError
 from ..models import Cart, CartItem
-from ..schemas.cart import CartResponse
+from ..schemas.cart import CartBatchLine, CartBatchResponse, CartLineFailure, CartResponse
 from ..services.audit_service import AuditService
 from .cart import helpers, validators
+from .cart.cache import CartReadCache
 
 
 class CartService:
@@ -19,11 +22,27 @@ class CartService:
             **kwargs,
         )
     
+    @staticmethod
+    def _fresh_view(user_id: int, cart_id: int, version: int) -> CartResponse:
+        """Load a just-committed cart and cache it under the version its edit committed."""
+        view = helpers.load_cart_view(cart_id=cart_id)
+        CartReadCache.put(user_id, cart_id, version, view)
+        return view
+
     @staticmethod
     def get_cart(user_id: int) -> CartResponse:
         """Get user's cart."""
-        cart = helpers.get_or_create_cart(user_id)
-        return helpers.to_response(cart)
+        state = CartReadCache.current(user_id)
+        if state is not None:
+            cached = CartReadCache.get(user_id, *state)
+            if cached is not None:
+                return cached
+        view = helpers.load_cart_view(user_id=user_id)
+        if view is None:
+            view = helpers.to_response(helpers.get_or_create_cart(user_id))
+            state = (view.id, 0)
+        CartReadCache.put(user_id, *state, view)
+        return view
 
     @staticmethod
     def add_item(user_id: int, product_id: int, quantity: int) -> CartResponse:
@@ -31,33 +50,72 @@ class CartService:
         if quantity <= 0:
             raise DomainError("INVALID_QUANTITY", "Quantity must be positive")
         
-        product = validators.validate_product(product_id)
-        validators.assert_in_stock_anywhere(product)
-        
-        cart = helpers.get_or_create_cart(user_id)
-        existing = next((i for i in cart.items if i.product_id == product_id), None)
-        requested_quantity = quantity + existing.quantity if existing else quantity
-        validators.assert_in_stock_delivery_branch(product, requested_quantity)
-        
-        if existing:
-            existing.quantity += quantity
-            existing.unit_price = product.price
-            db.session.add(existing)
-        else:
-            item = CartItem(
-                cart_id=cart.id,
-                product_id=product_id,
-                quantity=quantity,
-                unit_price=product.price,
-            )
-            db.session.add(item)
-        db.session.commit()
+        branch_id = validators.get_delivery_source_branch_id()
+        context = validators.load_line_context(user_id, product_id, branch_id)
+        existing_quantity = context[5] if context is not None else 0
+        validators.assert_line_available(context, quantity + existing_quantity)
+        price, cart_id = context[0], context[4]
+        if cart_id is None:
+            cart = Cart(user_id=user_id)
+            db.session.add(cart)
+            db.session.flush()
+            cart_id = cart.id
 
+        helpers.upsert_items(cart_id, [(product_id, quantity, price)])
         CartService._audit(
-            cart.id, "ADD_ITEM", user_id,
+            cart_id, "ADD_ITEM", user_id,
             new_value={"product_id": str(product_id), "quantity": quantity}
         )
-        return helpers.to_response(helpers.reload_cart(cart.id))
+        version = CartReadCache.bump(cart_id)
+        db.session.commit()
+        return CartService._fresh_view(user_id, cart_id, version)
+
+    @staticmethod
+    def set_items(user_id: int, lines: list[CartBatchLine]) -> CartBatchResponse:
+        """Set many line quantities in one transaction; quantity 0 removes the line.
+
+        Lines that fail validation are reported and skipped; the rest are applied.
+        """
+        wanted = {line.product_id: line.quantity for line in lines}
+        branch_id = validators.get_delivery_source_branch_id()
+        stock = validators.load_products_stock(list(wanted), branch_id)
+
+        failed: list[CartLineFailure] = []
+        upserts: list[tuple[int, int, object]] = []
+        removals: list[int] = []
+        for product_id, quantity in wanted.items():
+            if quantity == 0:
+                removals.append(product_id)
+                continue
+            price, is_active, total_available, branch_available = stock.get(product_id, (None, False, None, None))
+            error = validators.line_error(is_active, total_available, branch_available, quantity)
+            if error:
+                failed.append(CartLineFailure(product_id=product_id, code=error.code, message=error.message))
+            else:
+                upserts.append((product_id, quantity, price))
+
+        cart_id = db.session.scalar(select(Cart.id).where(Cart.user_id == user_id).order_by(Cart.id).limit(1))
+        if cart_id is None:
+            cart = Cart(user_id=user_id)
+            db.session.add(cart)
+            db.session.flush()
+            cart_id = cart.id
+        helpers.upsert_items(cart_id, upserts, accumulate=False)
+        if removals:
+            db.session.execute(
+                delete(CartItem).where(CartItem.cart_id == cart_id, CartItem.product_id.in_(removals))
+            )
+        CartService._audit(
+            cart_id, "BATCH_UPDATE", user_id,
+            new_value={
+                "set": {str(product_id): quantity for product_id, quantity, _ in upserts},
+                "removed": [str(product_id) for product_id in removals],
+                "failed": [str(failure.product_id) for failure in failed],
+            },
+        )
+        version = CartReadCache.bump(cart_id)
+        db.session.commit()
+        return CartBatchResponse(cart=CartService._fresh_view(user_id, cart_id, version), failed=failed)
 
     @staticmethod
     def update_item(user_id: int, cart_id: int, item_id: int, quantity: int) -> CartResponse:
@@ -78,6 +136,7 @@ class CartService:
         old_qty = item.quantity
         item.quantity = quantity
         db.session.add(item)
+        version = CartReadCache.bump(cart.id)
         db.session.commit()
 
         CartService._audit(
@@ -85,7 +144,7 @@ class CartService:
             old_value={"item_id": str(item_id), "quantity": old_qty},
             new_value={"item_id": str(item_id), "quantity": quantity},
         )
-        return helpers.to_response(helpers.reload_cart(cart.id))
+        return CartService._fresh_view(user_id, cart.id, version)
     
     @staticmethod
     def delete_item(user_id: int, cart_id: int, item_id: int) -> CartResponse:
@@ -96,8 +155,9 @@ class CartService:
             raise DomainError("NOT_FOUND", "Cart item not found", status_code=404)
         db.session.delete(item)
         CartService._audit(cart.id, "DELETE_ITEM", user_id, old_value={"item_id": str(item_id)})
+        version = CartReadCache.bump(cart.id)
         db.session.commit()
-        return helpers.to_response(helpers.reload_cart(cart.id))
+        return CartService._fresh_view(user_id, cart.id, version)
     
     @staticmethod
     def clear_cart(user_id: int, cart_id: int) -> CartResponse:
@@ -105,9 +165,10 @@ class CartService:
         cart = CartService._get_cart_for_user(cart_id, user_id)
         for item in list(cart.items):
             db.session.delete(item)
+        version = CartReadCache.bump(cart.id)
         db.session.commit()
         CartService._audit(cart.id, "CLEAR", user_id)
-        return helpers.to_response(helpers.reload_cart(cart.id))
+        return CartService._fresh_view(user_id, cart.id, version)
     
     @staticmethod
     def _get_cart_for_user(cart_id: int, user_id: int) -> Cart:
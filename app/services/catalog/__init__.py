@@ -1,8 +1,10 @@
 from app.services.catalog.admin import CatalogAdminService
+from app.services.catalog.featured import FeaturedSnapshotService
 from app.services.catalog.query import CatalogQueryService
 from app.services.catalog.mappers import (
     map_products,
     matches_stock,
+    parse_fields,
     to_category_response,
     to_product_response,
 )
@@ -10,8 +12,10 @@ from app.services.catalog.mappers import (
 __all__ = [
     "CatalogAdminService",
     "CatalogQueryService",
+    "FeaturedSnapshotService",
     "map_products",
     "matches_stock",
+    "parse_fields",
     "to_category_response",
     "to_product_response",
 ]
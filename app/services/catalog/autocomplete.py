@@ -0,0 +1,158 @@
+"""Per-worker prefix index backing /catalog/products/autocomplete."""
+
+from __future__ import annotations
+
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+
+from flask import current_app
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.extensions import db
+from app.models import OrderItem, Product
+from app.services.cache_version_service import CATALOG, CacheVersionService
+
+# Match ranks: whole name starts with the prefix, then a later word does.
+NAME_PREFIX = 0
+WORD_PREFIX = 1
+
+
+class PrefixIndex:
+    """Sorted array of (key, rank, product_id) entries searched with bisect."""
+
+    def __init__(self, version: int = 0):
+        self.version = version
+        self._entries: list[tuple[str, int, int]] = []
+        self._keys_by_product: dict[int, list[tuple[str, int, int]]] = {}
+        self._names: dict[int, str] = {}
+        self._popularity: dict[int, int] = {}
+
+    @classmethod
+    def build(cls, rows, version: int) -> "PrefixIndex":
+        index = cls(version)
+        for product_id, name, popularity in rows:
+            index._names[product_id] = name
+            index._popularity[product_id] = int(popularity or 0)
+            keys = cls._keys_for(product_id, name)
+            index._keys_by_product[product_id] = keys
+            index._entries.extend(keys)
+        index._entries.sort()
+        return index
+
+    @staticmethod
+    def _keys_for(product_id: int, name: str) -> list[tuple[str, int, int]]:
+        normalized = " ".join(name.lower().split())
+        keys = [(normalized, NAME_PREFIX, product_id)]
+        keys.extend((word, WORD_PREFIX, product_id) for word in normalized.split()[1:])
+        return keys
+
+    def upsert(self, product_id: int, name: str, active: bool) -> None:
+        self.remove(product_id)
+        if not active:
+            return
+        self._names[product_id] = name
+        self._popularity.setdefault(product_id, 0)
+        keys = self._keys_for(product_id, name)
+        self._keys_by_product[product_id] = keys
+        for key in keys:
+            insort(self._entries, key)
+
+    def remove(self, product_id: int) -> None:
+        for key in self._keys_by_product.pop(product_id, []):
+            pos = bisect_left(self._entries, key)
+            if pos < len(self._entries) and self._entries[pos] == key:
+                del self._entries[pos]
+        self._names.pop(product_id, None)
+
+    def lookup(self, prefix: str, limit: int) -> list[tuple[int, str]]:
+        """Return up to ``limit`` (product_id, name) pairs, best match first.
+
+        A blank prefix matches every active product, lowest id first.
+        """
+        needle = " ".join(prefix.lower().split())
+        if not needle:
+            return [(product_id, self._names[product_id]) for product_id in heapq.nsmallest(limit, self._names)]
+        best_rank: dict[int, int] = {}
+        pos = bisect_left(self._entries, (needle,))
+        while pos < len(self._entries) and self._entries[pos][0].startswith(needle):
+            _, rank, product_id = self._entries[pos]
+            if rank < best_rank.get(product_id, WORD_PREFIX + 1):
+                best_rank[product_id] = rank
+            pos += 1
+        top = heapq.nsmallest(
+            limit,
+            best_rank.items(),
+            key=lambda pair: (pair[1], -self._popularity.get(pair[0], 0), self._names[pair[0]], pair[0]),
+        )
+        return [(product_id, self._names[product_id]) for product_id, _ in top]
+
+
+class CatalogAutocomplete:
+    """Owns the worker's PrefixIndex and keeps it aligned with the catalog version."""
+
+    _lock = threading.Lock()
+    _index: PrefixIndex | None = None
+    _checked_at: float = 0.0
+
+    @staticmethod
+    def lookup(query: str, limit: int) -> list[tuple[int, str]]:
+        index = CatalogAutocomplete._fresh_index()
+        with CatalogAutocomplete._lock:
+            return index.lookup(query, limit)
+
+    @staticmethod
+    def warm() -> None:
+        """Build the index at startup; a cold index is rebuilt on first lookup instead."""
+        try:
+            CatalogAutocomplete.rebuild()
+        except SQLAlchemyError:
+            db.session.rollback()
+            current_app.logger.warning("Autocomplete index not built at startup", exc_info=True)
+
+    @staticmethod
+    def rebuild() -> PrefixIndex:
+        version = CacheVersionService.current(CATALOG)
+        popularity = (
+            select(OrderItem.product_id, func.sum(OrderItem.quantity).label("sold"))
+            .group_by(OrderItem.product_id)
+            .subquery()
+        )
+        rows = db.session.execute(
+            select(Product.id, Product.name, func.coalesce(popularity.c.sold, 0))
+            .outerjoin(popularity, popularity.c.product_id == Product.id)
+            .where(Product.is_active.is_(True))
+        ).all()
+        index = PrefixIndex.build(rows, version)
+        with CatalogAutocomplete._lock:
+            CatalogAutocomplete._index = index
+            CatalogAutocomplete._checked_at = time.monotonic()
+        return index
+
+    @staticmethod
+    def apply_product(product: Product, version: int) -> None:
+        """Apply a committed product write; fall back to a rebuild if other writes were missed."""
+        with CatalogAutocomplete._lock:
+            index = CatalogAutocomplete._index
+            if index is None:
+                return
+            if index.version != version - 1:
+                CatalogAutocomplete._checked_at = 0.0
+                return
+            index.upsert(product.id, product.name, bool(product.is_active))
+            index.version = version
+
+    @staticmethod
+    def _fresh_index() -> PrefixIndex:
+        index = CatalogAutocomplete._index
+        if index is None:
+            return CatalogAutocomplete.rebuild()
+        interval = current_app.config.get("CATALOG_VERSION_CHECK_SECONDS", 5)
+        if time.monotonic() - CatalogAutocomplete._checked_at < interval:
+            return index
+        if CacheVersionService.current(CATALOG) != index.version:
+            return CatalogAutocomplete.rebuild()
+        CatalogAutocomplete._checked_at = time.monotonic()
+        return index
@@ -7,6 +7,7 @@ from app.middleware.error_handler import DomainError
 from app.models import Category
 from app.schemas.catalog import CategoryResponse
 from app.services.audit_service import AuditService
+from app.services.cache_version_service import CATALOG, CacheVersionService
 from .mappers import to_category_response
 
 
@@ -14,6 +15,7 @@ def create_category(name: str, description: str | None) -> CategoryResponse:
     """Create a new category."""
     category = Category(name=name, description=description)
     db.session.add(category)
+    CacheVersionService.bump(CATALOG)
     db.session.commit()
     AuditService.log_event(
         entity_type="category", action="CREATE", entity_id=category.id
@@ -33,6 +35,7 @@ def update_category(
     category.name = name
     category.description = description
     db.session.add(category)
+    CacheVersionService.bump(CATALOG)
     db.session.commit()
     
     AuditService.log_event(
@@ -53,6 +56,7 @@ def toggle_category(category_id: int, active: bool) -> CategoryResponse:
     
     category.is_active = active
     db.session.add(category)
+    CacheVersionService.bump(CATALOG)
     db.session.commit()
     
     AuditService.log_event(
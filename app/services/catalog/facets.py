@@ -0,0 +1,92 @@
+"""Facet and total counts for product search, cached per normalized search."""
+
+from __future__ import annotations
+
+from flask import current_app
+from sqlalchemy import case, func, select
+
+from app.extensions import db
+from app.schemas.catalog import CategoryFacet, PriceBucketFacet, SearchFacets
+from app.services.cache_version_service import CATALOG, INVENTORY, CacheVersionService
+from app.utils.ttl_cache import TTLCache
+
+FACETS = ("category", "price", "organic")
+PRICE_BUCKET_EDGES = (0, 10, 25, 50, 100)
+
+_cache = TTLCache(maxsize=512)
+
+
+def _price_bucket(price):
+    """Index into PRICE_BUCKET_EDGES of the bucket holding ``price``."""
+    whens = [(price < edge, index) for index, edge in enumerate(PRICE_BUCKET_EDGES[1:])]
+    return case(*whens, else_=len(PRICE_BUCKET_EDGES) - 1)
+
+
+def grouped_counts(base) -> list[tuple[int, int, bool, int]]:
+    """(category_id, price bucket, is_organic, count) rows for the products ``base`` selects."""
+    matched = base.subquery()
+    bucket = _price_bucket(matched.c.price).label("bucket")
+    stmt = (
+        select(matched.c.category_id, bucket, matched.c.is_organic, func.count())
+        .group_by(matched.c.category_id, bucket, matched.c.is_organic)
+    )
+    return [tuple(row) for row in db.session.execute(stmt)]
+
+
+def build_facets(rows, requested: set[str]) -> SearchFacets:
+    categories: dict[int, int] = {}
+    buckets = [0] * len(PRICE_BUCKET_EDGES)
+    organic = 0
+    for category_id, bucket, is_organic, count in rows:
+        categories[category_id] = categories.get(category_id, 0) + count
+        buckets[int(bucket)] += count
+        if is_organic:
+            organic += count
+    facets = SearchFacets()
+    if "category" in requested:
+        facets.categories = [
+            CategoryFacet(category_id=category_id, count=count)
+            for category_id, count in sorted(categories.items(), key=lambda pair: (-pair[1], pair[0]))
+        ]
+    if "price" in requested:
+        upper = list(PRICE_BUCKET_EDGES[1:]) + [None]
+        facets.price = [
+            PriceBucketFacet(min=low, max=high, count=count)
+            for low, high, count in zip(PRICE_BUCKET_EDGES, upper, buckets)
+        ]
+    if "organic" in requested:
+        facets.organic = organic
+    return facets
+
+
+def _versions(stock_filtered: bool) -> tuple:
+    """Cache versions the counts depend on; stock-filtered searches also follow inventory writes."""
+    if stock_filtered:
+        return CacheVersionService.current(CATALOG), CacheVersionService.current_striped(INVENTORY)
+    return (CacheVersionService.current(CATALOG),)
+
+
+def cached_counts(base, key: tuple, stock_filtered: bool = False) -> list[tuple[int, int, bool, int]]:
+    """Grouped counts for ``base``, cached per normalized search and catalog (and inventory) version."""
+    ttl = float(current_app.config.get("CATALOG_FACET_CACHE_SECONDS", 30))
+    if ttl <= 0:
+        return grouped_counts(base)
+    cache_key = (*_versions(stock_filtered), *key)
+    rows = _cache.get(cache_key)
+    if rows is None:
+        rows = grouped_counts(base)
+        _cache.set(cache_key, rows, ttl)
+    return rows
+
+
+def cached_total(base, key: tuple, stock_filtered: bool = False) -> int:
+    """Exact match count for ``base``, served from the per-search cache when fresh."""
+    ttl = float(current_app.config.get("CATALOG_FACET_CACHE_SECONDS", 30))
+    if ttl <= 0:
+        return db.session.scalar(select(func.count()).select_from(base.subquery())) or 0
+    cache_key = ("total", *_versions(stock_filtered), *key)
+    total = _cache.get(cache_key)
+    if total is None:
+        total = db.session.scalar(select(func.count()).select_from(base.subquery())) or 0
+        _cache.set(cache_key, total, ttl)
+    return total
@@ -0,0 +1,170 @@
+"""Pre-serialized featured product lists, rebuilt in the background."""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Iterable
+
+from flask import Flask, current_app
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.extensions import db
+from app.models import Branch, FeaturedSnapshot, Product
+from app.services.cache_version_service import BRANCHES, CATALOG, CacheVersionService
+from .mappers import map_products
+
+SNAPSHOT_SIZE = 50
+NO_BRANCH = 0
+# Floor between background rebuilds so a burst of touch() calls costs one rebuild.
+MIN_REFRESH_GAP_SECONDS = 5
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class FeaturedSnapshotService:
+    """Serves featured products from featured_snapshots; one primary-key read per request."""
+
+    _wake = threading.Event()
+    _featured_ids: set[int] = set()
+    _thread: threading.Thread | None = None
+    _branches: tuple[int, frozenset[int], float] | None = None
+
+    @staticmethod
+    def get(
+        limit: int, branch_id: int | None, fields: frozenset[str] | None = None
+    ) -> tuple[list[dict], float | None]:
+        """Return up to ``limit`` serialized products and the snapshot age in seconds.
+
+        ``limit`` is clamped to SNAPSHOT_SIZE. See ``resolve`` for which snapshot is served;
+        with none built yet the list is empty and the age None.
+        """
+        snapshot = FeaturedSnapshotService.resolve(branch_id)
+        if snapshot is None:
+            return [], None
+        limit = min(max(limit, 0), SNAPSHOT_SIZE)
+        age = max((_now() - snapshot.built_at).total_seconds(), 0.0)
+        items = snapshot.items[:limit]
+        if fields is not None:
+            items = [{name: value for name, value in item.items() if name in fields} for item in items]
+        return items, round(age, 3)
+
+    @staticmethod
+    def cache_validator(branch_id: int | None) -> str:
+        """ETag validator for the snapshot ``get`` would serve; moves with every rebuild."""
+        snapshot = FeaturedSnapshotService.resolve(branch_id)
+        if snapshot is None:
+            return "none"
+        return f"{snapshot.branch_id}:{snapshot.built_at.isoformat()}"
+
+    @staticmethod
+    def resolve(branch_id: int | None) -> FeaturedSnapshot | None:
+        """The snapshot to serve for ``branch_id``.
+
+        Unknown or inactive branches get the branch-less snapshot. With the refresher running,
+        a missing or stale snapshot is served as is and the refresher is woken. Without it
+        (tests, scripts, FEATURED_REFRESH_SECONDS <= 0) all snapshots are rebuilt here first.
+        """
+        key = branch_id if branch_id in FeaturedSnapshotService._active_branch_ids() else NO_BRANCH
+        snapshot = FeaturedSnapshotService._stored(key)
+        max_age = float(current_app.config.get("FEATURED_SNAPSHOT_MAX_AGE_SECONDS", 300))
+        if snapshot is None or snapshot.branch_id != key or (_now() - snapshot.built_at).total_seconds() > max_age:
+            FeaturedSnapshotService.touch()
+        if FeaturedSnapshotService._thread is None and FeaturedSnapshotService._wake.is_set():
+            FeaturedSnapshotService._wake.clear()
+            FeaturedSnapshotService.rebuild_all()
+            snapshot = FeaturedSnapshotService._stored(key)
+        return snapshot
+
+    @staticmethod
+    def _stored(key: int) -> FeaturedSnapshot | None:
+        snapshot = db.session.get(FeaturedSnapshot, key)
+        if snapshot is None and key != NO_BRANCH:
+            snapshot = db.session.get(FeaturedSnapshot, NO_BRANCH)
+        return snapshot
+
+    @staticmethod
+    def rebuild(branch_key: int) -> FeaturedSnapshot:
+        """Recompute and store the snapshot for one branch key."""
+        version = CacheVersionService.current(CATALOG)
+        products = db.session.execute(
+            select(Product)
+            .where(Product.is_active.is_(True))
+            .order_by(Product.updated_at.desc(), Product.id.desc())
+            .limit(SNAPSHOT_SIZE)
+        ).scalars().all()
+        items = [item.model_dump() for item in map_products(products, branch_key or None)]
+        snapshot = db.session.get(FeaturedSnapshot, branch_key)
+        if snapshot is None:
+            snapshot = FeaturedSnapshot(branch_id=branch_key)
+            db.session.add(snapshot)
+        snapshot.catalog_version = version
+        snapshot.items = items
+        snapshot.built_at = _now()
+        try:
+            db.session.commit()
+        except SQLAlchemyError:
+            # Another worker stored the same key first; its snapshot is as good as ours.
+            db.session.rollback()
+            snapshot = db.session.get(FeaturedSnapshot, branch_key, populate_existing=True) or snapshot
+        FeaturedSnapshotService._featured_ids.update(product.id for product in products)
+        return snapshot
+
+    @staticmethod
+    def rebuild_all() -> None:
+        branch_ids = db.session.execute(select(Branch.id).where(Branch.is_active.is_(True))).scalars().all()
+        FeaturedSnapshotService._featured_ids = set()
+        for key in [NO_BRANCH, *branch_ids]:
+            FeaturedSnapshotService.rebuild(key)
+
+    @staticmethod
+    def _active_branch_ids() -> frozenset[int]:
+        """Active branch ids, cached per worker and re-read when the ``branches`` version moves."""
+        cached = FeaturedSnapshotService._branches
+        interval = float(current_app.config.get("BRANCH_CACHE_CHECK_SECONDS", 30))
+        if cached is not None and time.monotonic() - cached[2] < interval:
+            return cached[1]
+        version = CacheVersionService.current(BRANCHES)
+        if cached is not None and cached[0] == version:
+            branch_ids = cached[1]
+        else:
+            branch_ids = frozenset(
+                db.session.execute(select(Branch.id).where(Branch.is_active.is_(True))).scalars().all()
+            )
+        FeaturedSnapshotService._branches = (version, branch_ids, time.monotonic())
+        return branch_ids
+
+    @staticmethod
+    def touch(product_ids: Iterable[int] | None = None) -> None:
+        """Ask the refresher for an early rebuild; ``None`` means any product may have changed."""
+        if product_ids is None or FeaturedSnapshotService._featured_ids.intersection(product_ids):
+            FeaturedSnapshotService._wake.set()
+
+    @staticmethod
+    def start_refresher(app: Flask) -> None:
+        """Run rebuild_all every FEATURED_REFRESH_SECONDS, or sooner after touch()."""
+        interval = float(app.config.get("FEATURED_REFRESH_SECONDS", 60))
+        if interval <= 0 or FeaturedSnapshotService._thread is not None:
+            return
+
+        def _run() -> None:
+            while True:
+                FeaturedSnapshotService._wake.wait(timeout=interval)
+                FeaturedSnapshotService._wake.clear()
+                with app.app_context():
+                    try:
+                        FeaturedSnapshotService.rebuild_all()
+                    except SQLAlchemyError:
+                        db.session.rollback()
+                        app.logger.warning("Featured snapshot refresh failed", exc_info=True)
+                    finally:
+                        db.session.remove()
+                time.sleep(MIN_REFRESH_GAP_SECONDS)
+
+        thread = threading.Thread(target=_run, name="featured-snapshot-refresher", daemon=True)
+        FeaturedSnapshotService._thread = thread
+        thread.start()
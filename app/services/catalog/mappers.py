@@ -1,9 +1,15 @@
 from __future__ import annotations
-from typing import Sequence
-from sqlalchemy import select
-from app.extensions import db
-from app.models import Category, Inventory, Product
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+from sqlalchemy.orm import load_only, undefer_group
+from app.middleware.error_handler import DomainError
+from app.models import Category, Product
+from app.models.product import DETAIL_GROUP
 from app.schemas.catalog import CategoryResponse, ProductResponse
+from app.services.stock_cache import StockCache
+
+PRODUCT_FIELDS = tuple(ProductResponse.model_fields)
+STOCK_FIELDS = frozenset({"in_stock_anywhere", "in_stock_for_branch", "available_quantity", "branch_available_quantity"})
 
 
 def to_category_response(category: Category) -> CategoryResponse:
@@ -16,33 +22,45 @@ def to_category_response(category: Category) -> CategoryResponse:
     )
 
 
-def load_inventory(product: Product) -> None:
-    if not product.inventory:
-        product.inventory = (
-            db.session.execute(select(Inventory).where(Inventory.product_id == product.id)).scalars().all()
+@dataclass(frozen=True)
+class StockSummary:
+    """Per-product inventory aggregates needed by ProductResponse."""
+
+    total_available: int = 0
+    branch_available: int = 0
+    in_stock_anywhere: bool = False
+
+
+def load_stock(product_ids: Iterable[int], branch_id: int | None) -> dict[int, StockSummary]:
+    """Summarize inventory for ``product_ids`` from the shared stock cache; misses cost one query."""
+    return {
+        product_id: StockSummary(
+            sum(breakdown.values()),
+            breakdown.get(branch_id, 0) if branch_id else 0,
+            any(quantity > 0 for quantity in breakdown.values()),
         )
+        for product_id, breakdown in StockCache.by_branch(product_ids).items()
+        if breakdown
+    }
 
 
 def matches_stock(product: Product, branch_id: int | None, desired: bool) -> bool:
-    load_inventory(product)
-    if branch_id:
-        row = next((i for i in product.inventory if i.branch_id == branch_id), None)
-        quantity = row.available_quantity if row else 0
-    else:
-        quantity = sum(i.available_quantity for i in product.inventory)
+    stock = load_stock([product.id], branch_id).get(product.id, StockSummary())
+    quantity = stock.branch_available if branch_id else stock.total_available
     return (quantity > 0) == desired
 
 
-def to_product_response(product: Product, branch_id: int | None) -> ProductResponse:
-    load_inventory(product)
+def to_product_response(
+    product: Product, branch_id: int | None, stock: StockSummary | None = None, detail: bool = True
+) -> ProductResponse:
+    """Map a product; list views pass ``detail=False`` so deferred columns are never loaded."""
+    if stock is None:
+        stock = load_stock([product.id], branch_id).get(product.id, StockSummary())
     branch_available: bool | None = None
     branch_available_quantity: int | None = None
-    row = None
     if branch_id:
-        row = next((i for i in product.inventory if i.branch_id == branch_id), None)
-        branch_available = bool(row and row.available_quantity > 0)
-        branch_available_quantity = row.available_quantity if row else 0
-    total_available = sum(i.available_quantity for i in product.inventory)
+        branch_available = stock.branch_available > 0
+        branch_available_quantity = stock.branch_available
     return ProductResponse(
         id=product.id,
         name=product.name,
@@ -50,19 +68,65 @@ def to_product_response(product: Product, branch_id: int | None) -> ProductRespo
         price=product.price,
         old_price=getattr(product, 'old_price', None),
         unit=getattr(product, 'unit', None),
-        nutritional_info=getattr(product, 'nutritional_info', None),
+        nutritional_info=product.nutritional_info if detail else None,
         is_organic=getattr(product, 'is_organic', False),
-        bin_location=getattr(product, 'bin_location', None),
+        bin_location=product.bin_location if detail else None,
         image_url=getattr(product, 'image_url', None),
-        description=product.description,
+        description=product.description if detail else None,
         category_id=product.category_id,
         is_active=product.is_active,
-        in_stock_anywhere=any(i.available_quantity > 0 for i in product.inventory),
+        in_stock_anywhere=stock.in_stock_anywhere,
         in_stock_for_branch=branch_available,
-        available_quantity=total_available,
+        available_quantity=stock.total_available,
         branch_available_quantity=branch_available_quantity,
     )
 
 
-def map_products(items: Sequence[Product], branch_id: int | None) -> list[ProductResponse]:
-    return [to_product_response(item, branch_id) for item in items]
+def parse_fields(raw: str | None) -> frozenset[str] | None:
+    """Parse a ``fields=a,b`` sparse fieldset; ``id`` is always included."""
+    if not raw:
+        return None
+    requested = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = requested - set(PRODUCT_FIELDS)
+    if unknown:
+        raise DomainError(
+            "BAD_REQUEST", "Unknown product fields", status_code=400, details={"fields": sorted(unknown)}
+        )
+    return frozenset(requested | {"id"})
+
+
+def product_load_options(fields: frozenset[str] | None, detail: bool = False) -> list:
+    """Loader options selecting only the product columns a response needs."""
+    if fields is None:
+        return [undefer_group(DETAIL_GROUP)] if detail else []
+    columns = [getattr(Product, name) for name in PRODUCT_FIELDS if name in fields and name in Product.__table__.c]
+    return [load_only(*columns)]
+
+
+def to_sparse_product(
+    product: Product, branch_id: int | None, stock: StockSummary | None, fields: frozenset[str]
+) -> dict:
+    values = {name: getattr(product, name) for name in PRODUCT_FIELDS if name in fields and name in Product.__table__.c}
+    if fields & STOCK_FIELDS:
+        stock = stock or StockSummary()
+        stock_values = {
+            "in_stock_anywhere": stock.in_stock_anywhere,
+            "in_stock_for_branch": stock.branch_available > 0 if branch_id else None,
+            "available_quantity": stock.total_available,
+            "branch_available_quantity": stock.branch_available if branch_id else None,
+        }
+        values.update({name: value for name, value in stock_values.items() if name in fields})
+    return {name: values[name] for name in PRODUCT_FIELDS if name in values}
+
+
+def map_products(
+    items: Sequence[Product], branch_id: int | None, fields: frozenset[str] | None = None
+) -> list[ProductResponse] | list[dict]:
+    if fields is not None and not fields & STOCK_FIELDS:
+        return [to_sparse_product(item, branch_id, None, fields) for item in items]
+    stock = load_stock((item.id for item in items), branch_id)
+    if fields is not None:
+        return [to_sparse_product(item, branch_id, stock.get(item.id, StockSummary()), fields) for item in items]
+    return [
+        to_product_response(item, branch_id, stock.get(item.id, StockSummary()), detail=False) for item in items
+    ]
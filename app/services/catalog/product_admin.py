@@ -8,9 +8,20 @@ from app.middleware.error_handler import DomainError
 from app.models import Category, Product
 from app.schemas.catalog import ProductResponse
 from app.services.audit_service import AuditService
+from app.services.cache_version_service import CATALOG, CacheVersionService
+from .autocomplete import CatalogAutocomplete
+from .featured import FeaturedSnapshotService
 from .mappers import to_product_response
 
 
+def _commit_catalog_change(product: Product) -> None:
+    """Commit a product write together with a catalog version bump."""
+    version = CacheVersionService.bump(CATALOG)
+    db.session.commit()
+    CatalogAutocomplete.apply_product(product, version)
+    FeaturedSnapshotService.touch()
+
+
 def create_product(
     name: str,
     sku: str,
@@ -33,7 +44,7 @@ def create_product(
     
     try:
         db.session.add(product)
-        db.session.commit()
+        _commit_catalog_change(product)
     except IntegrityError as exc:
         db.session.rollback()
         if "unique constraint" in str(exc).lower() or "unique" in str(exc).lower():
@@ -87,7 +98,7 @@ def update_product(
         product.description = description
     
     db.session.add(product)
-    db.session.commit()
+    _commit_catalog_change(product)
     
     AuditService.log_event(
         entity_type="product",
@@ -113,7 +124,7 @@ def toggle_product(product_id: int, active: bool) -> ProductResponse:
     
     product.is_active = active
     db.session.add(product)
-    db.session.commit()
+    _commit_catalog_change(product)
     
     AuditService.log_event(
         entity_type="product",
@@ -1,14 +1,44 @@
 from __future__ import annotations
 from sqlalchemy import select, func, exists
-from sqlalchemy.orm import selectinload
 from app.extensions import db
 from app.middleware.error_handler import DomainError
-from app.models import Category, Inventory, Product
-from app.schemas.catalog import AutocompleteItem, AutocompleteResponse, CategoryResponse, ProductResponse
-from .mappers import map_products, to_category_response, to_product_response
+from app.models import CacheVersion, Category, Inventory, Product
+from app.services.cache_version_service import CATALOG, INVENTORY
+from app.services.inventory_shards import sellable_quantity
+from app.services.shared_queries import SharedOperations
+from app.schemas.catalog import AutocompleteItem, AutocompleteResponse, CategoryResponse, ProductResponse, SearchFacets
+from .mappers import map_products, product_load_options, to_category_response, to_product_response
+from .autocomplete import CatalogAutocomplete
+from .facets import build_facets, cached_counts, cached_total
+from .search import ProductSearch
+
+MAX_BATCH_IDS = 200
+
+
+def _search_key(query, category_id, in_stock, branch_id, min_price, max_price, organic_only) -> tuple:
+    """Normalized search filters, used as a cache key for counts."""
+    normalized = " ".join((query or "").lower().split())
+    return (normalized, category_id, in_stock, branch_id, min_price, max_price, bool(organic_only))
 
 
 class CatalogQueryService:
+    @staticmethod
+    def cache_validator() -> str:
+        """Cheap catalog validator: the catalog version plus the striped inventory version.
+
+        Both counters are bumped inside the writing transaction, so every committed catalog or
+        stock change moves the validator, whenever its transaction started.
+        """
+        catalog, inventory = db.session.execute(
+            select(
+                select(CacheVersion.version).where(CacheVersion.name == CATALOG).scalar_subquery(),
+                select(func.coalesce(func.sum(CacheVersion.version), 0))
+                .where(CacheVersion.name.like(f"{INVENTORY}:%"))
+                .scalar_subquery(),
+            )
+        ).one()
+        return f"{catalog or 0}:{inventory}"
+
     @staticmethod
     def list_categories(limit: int, offset: int) -> tuple[list[CategoryResponse], int]:
         stmt = select(Category).where(Category.is_active.is_(True)).offset(offset).limit(limit)
@@ -22,12 +52,13 @@ class CatalogQueryService:
         branch_id: int | None,
         limit: int,
         offset: int,
+        fields: frozenset[str] | None = None,
     ) -> tuple[list[ProductResponse], int]:
         stmt = (
             select(Product)
             .where(Product.category_id == category_id)
             .where(Product.is_active.is_(True))
-            .options(selectinload(Product.inventory).selectinload(Inventory.branch))
+            .options(*product_load_options(fields))
             .offset(offset)
             .limit(limit)
         )
@@ -38,16 +69,44 @@ class CatalogQueryService:
             .where(Product.category_id == category_id)
             .where(Product.is_active.is_(True))
         )
-        return map_products(products, branch_id), total or 0
+        return map_products(products, branch_id, fields), total or 0
 
     @staticmethod
-    def get_product(product_id: int, branch_id: int | None) -> ProductResponse:
-        stmt = select(Product).where(Product.id == product_id).options(selectinload(Product.inventory).selectinload(Inventory.branch))
+    def get_product(
+        product_id: int, branch_id: int | None, fields: frozenset[str] | None = None
+    ) -> ProductResponse | dict:
+        stmt = (
+            select(Product)
+            .where(Product.id == product_id)
+            .where(Product.is_active.is_(True))
+            .options(*product_load_options(fields, detail=True))
+        )
         product = db.session.execute(stmt).scalar_one_or_none()
-        if not product or not product.is_active:
+        if not product:
             raise DomainError("NOT_FOUND", "Product not found", status_code=404)
+        if fields is not None:
+            return map_products([product], branch_id, fields)[0]
         return to_product_response(product, branch_id)
 
+    @staticmethod
+    def get_products(
+        product_ids: list[int], branch_id: int | None, fields: frozenset[str] | None = None
+    ) -> tuple[list[ProductResponse], list[int]]:
+        """Resolve many products in two queries; returns them in request order plus the missing ids."""
+        ids = list(dict.fromkeys(product_ids))
+        if len(ids) > MAX_BATCH_IDS:
+            raise DomainError("BAD_REQUEST", f"At most {MAX_BATCH_IDS} ids per request", status_code=400)
+        stmt = (
+            select(Product)
+            .where(Product.id.in_(ids))
+            .where(Product.is_active.is_(True))
+            .options(*product_load_options(fields))
+        )
+        found = {product.id: product for product in db.session.execute(stmt).scalars()} if ids else {}
+        ordered = [found[product_id] for product_id in ids if product_id in found]
+        missing = [product_id for product_id in ids if product_id not in found]
+        return map_products(ordered, branch_id, fields), missing
+
     @staticmethod
     def search_products(
         query: str | None,
@@ -60,10 +119,125 @@ class CatalogQueryService:
         max_price: float | None = None,
         organic_only: bool | None = None,
         sort: str | None = None,
+        fields: frozenset[str] | None = None,
     ) -> tuple[list[ProductResponse], int]:
+        base, sort_column, descending = CatalogQueryService._search_base(
+            query, category_id, in_stock, branch_id, min_price, max_price, organic_only, sort
+        )
+        products = CatalogQueryService._search_page(base, sort_column, descending, limit, offset, fields)
+        count_stmt = select(func.count()).select_from(base.subquery())
+        total = db.session.scalar(count_stmt)
+        return map_products(products, branch_id, fields), total or 0
+
+    @staticmethod
+    def search_products_uncounted(
+        query: str | None,
+        category_id: int | None,
+        in_stock: bool | None,
+        branch_id: int | None,
+        limit: int,
+        offset: int,
+        estimate: bool = False,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        organic_only: bool | None = None,
+        sort: str | None = None,
+        fields: frozenset[str] | None = None,
+    ) -> tuple[list[ProductResponse], bool, int | None]:
+        """Search page without an exact COUNT: has_next comes from fetching one extra row.
+
+        With ``estimate`` the total is the Postgres planner estimate, or elsewhere an exact
+        count cached per normalized search.
+        """
+        base, sort_column, descending = CatalogQueryService._search_base(
+            query, category_id, in_stock, branch_id, min_price, max_price, organic_only, sort
+        )
+        products = CatalogQueryService._search_page(base, sort_column, descending, limit + 1, offset, fields)
+        has_next = len(products) > limit
+        total = None
+        if estimate:
+            total = SharedOperations.estimate_count(base)
+            if total is None:
+                key = _search_key(query, category_id, in_stock, branch_id, min_price, max_price, organic_only)
+                total = cached_total(base, key, stock_filtered=in_stock is not None)
+        return map_products(products[:limit], branch_id, fields), has_next, total
+
+    @staticmethod
+    def faceted_search(
+        query: str | None,
+        category_id: int | None,
+        in_stock: bool | None,
+        branch_id: int | None,
+        limit: int,
+        offset: int,
+        facets: set[str],
+        min_price: float | None = None,
+        max_price: float | None = None,
+        organic_only: bool | None = None,
+        sort: str | None = None,
+        fields: frozenset[str] | None = None,
+    ) -> tuple[list[ProductResponse], int, SearchFacets]:
+        """Search page plus facet counts; the total comes from the grouped facet pass, not a COUNT."""
+        base, sort_column, descending = CatalogQueryService._search_base(
+            query, category_id, in_stock, branch_id, min_price, max_price, organic_only, sort
+        )
+        products = CatalogQueryService._search_page(base, sort_column, descending, limit, offset, fields)
+        key = _search_key(query, category_id, in_stock, branch_id, min_price, max_price, organic_only)
+        rows = cached_counts(base, key, stock_filtered=in_stock is not None)
+        total = sum(row[-1] for row in rows)
+        return map_products(products, branch_id, fields), total, build_facets(rows, facets)
+
+    @staticmethod
+    def _search_page(
+        base, sort_column, descending: bool, limit: int, offset: int, fields: frozenset[str] | None
+    ) -> list[Product]:
+        ordering = (sort_column.desc(), Product.id.desc()) if descending else (sort_column.asc(), Product.id.asc())
+        stmt = base.options(*product_load_options(fields)).order_by(*ordering).offset(offset).limit(limit)
+        return db.session.execute(stmt).scalars().all()
+
+    @staticmethod
+    def search_products_keyset(
+        query: str | None,
+        category_id: int | None,
+        in_stock: bool | None,
+        branch_id: int | None,
+        limit: int,
+        cursor: str | None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        organic_only: bool | None = None,
+        sort: str | None = None,
+        fields: frozenset[str] | None = None,
+    ) -> tuple[list[ProductResponse], str | None]:
+        base, sort_column, descending = CatalogQueryService._search_base(
+            query, category_id, in_stock, branch_id, min_price, max_price, organic_only, sort
+        )
+        products, next_cursor = SharedOperations.paginate_keyset(
+            base_query=base.options(*product_load_options(fields)),
+            sort_column=sort_column,
+            id_column=Product.id,
+            limit=limit,
+            cursor=cursor,
+            descending=descending,
+        )
+        return map_products(products, branch_id, fields), next_cursor
+
+    @staticmethod
+    def _search_base(
+        query: str | None,
+        category_id: int | None,
+        in_stock: bool | None,
+        branch_id: int | None,
+        min_price: float | None,
+        max_price: float | None,
+        organic_only: bool | None,
+        sort: str | None,
+    ):
+        """Build the filtered search statement and its (sort column, descending) key."""
         base = select(Product).where(Product.is_active.is_(True))
+        rank = None
         if query:
-            base = base.where(Product.name.ilike(f"%{query}%"))
+            base, rank = ProductSearch.apply(base, query)
         if category_id:
             base = base.where(Product.category_id == category_id)
         if min_price is not None:
@@ -76,7 +250,7 @@ class CatalogQueryService:
             stock_match = (
                 select(Inventory.id)
                 .where(Inventory.product_id == Product.id)
-                .where(Inventory.available_quantity > 0)
+                .where(sellable_quantity() > 0)
             )
             if branch_id:
                 stock_match = stock_match.where(Inventory.branch_id == branch_id)
@@ -84,40 +258,35 @@ class CatalogQueryService:
             base = base.where(predicate if in_stock else ~predicate)
         # Sorting
         if sort == "price_asc":
-            base = base.order_by(Product.price.asc())
-        elif sort == "price_desc":
-            base = base.order_by(Product.price.desc())
-        elif sort == "updated_at_desc":
-            base = base.order_by(Product.updated_at.desc())
-        elif sort == "name_asc":
-            base = base.order_by(Product.name.asc())
-        elif sort == "name_desc":
-            base = base.order_by(Product.name.desc())
-        else:
-            base = base.order_by(Product.id.desc())
-        stmt = base.options(selectinload(Product.inventory).selectinload(Inventory.branch)).offset(offset).limit(limit)
-        products = db.session.execute(stmt).scalars().all()
-        count_stmt = select(func.count()).select_from(base.subquery())
-        total = db.session.scalar(count_stmt)
-        return map_products(products, branch_id), total or 0
+            return base, Product.price, False
+        if sort == "price_desc":
+            return base, Product.price, True
+        if sort == "updated_at_desc":
+            return base, Product.updated_at, True
+        if sort == "name_asc":
+            return base, Product.name, False
+        if sort == "name_desc":
+            return base, Product.name, True
+        if rank is not None:
+            return base, rank, True
+        return base, Product.id, True
 
     @staticmethod
-    def featured_products(limit: int, branch_id: int | None) -> list[ProductResponse]:
+    def featured_products(
+        limit: int, branch_id: int | None, fields: frozenset[str] | None = None
+    ) -> list[ProductResponse]:
         stmt = (
             select(Product)
             .where(Product.is_active.is_(True))
+            .options(*product_load_options(fields))
             .order_by(Product.updated_at.desc(), Product.id.desc())
             .limit(limit)
-            .options(selectinload(Product.inventory).selectinload(Inventory.branch))
         )
         products = db.session.execute(stmt).scalars().all()
-        return map_products(products, branch_id)
+        return map_products(products, branch_id, fields)
 
     @staticmethod
     def autocomplete(query: str | None, limit: int) -> AutocompleteResponse:
-        stmt = select(Product).where(Product.is_active.is_(True))
-        if query:
-            stmt = stmt.where(Product.name.ilike(f"%{query}%"))
-        products = db.session.execute(stmt.limit(limit)).scalars().all()
-        items = [AutocompleteItem(id=p.id, name=p.name) for p in products]
+        matches = CatalogAutocomplete.lookup(query or "", limit)
+        items = [AutocompleteItem(id=product_id, name=name) for product_id, name in matches]
         return AutocompleteResponse(total=len(items), limit=limit, offset=0, items=items)
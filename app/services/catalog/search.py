@@ -0,0 +1,156 @@
+"""Ranked product search: Postgres full-text/trigram, in-process n-gram elsewhere."""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+
+from sqlalchemy import case, func, literal, literal_column, or_, select
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.extensions import db
+from app.models import Product
+
+MAX_CANDIDATES = 2000
+MIN_SCORE = 0.6
+
+# Rendered inline (not bound) so the planner can match the ix_products_search_tsv expression.
+SEARCH_CONFIG = literal_column("'simple'")
+SEARCH_DOCUMENT = literal_column(
+    "to_tsvector('simple', coalesce(products.name, '') || ' ' || "
+    "coalesce(products.sku, '') || ' ' || coalesce(products.description, ''))"
+)
+
+
+def _grams(text: str | None, n: int = 3) -> set[str]:
+    if not text:
+        return set()
+    grams: set[str] = set()
+    for word in text.lower().split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return grams
+
+
+@dataclass
+class NgramIndex:
+    """Inverted trigram index over product name, SKU and description."""
+
+    fingerprint: tuple | None = None
+    names: dict[int, str] = field(default_factory=dict)
+    others: dict[int, str] = field(default_factory=dict)
+    name_grams: dict[str, set[int]] = field(default_factory=dict)
+    other_grams: dict[str, set[int]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, rows, fingerprint: tuple | None = None) -> "NgramIndex":
+        index = cls(fingerprint=fingerprint)
+        for product_id, name, sku, description in rows:
+            index.names[product_id] = (name or "").lower()
+            index.others[product_id] = f"{sku or ''} {description or ''}".lower()
+            for gram in _grams(name):
+                index.name_grams.setdefault(gram, set()).add(product_id)
+            for gram in _grams(sku) | _grams(description):
+                index.other_grams.setdefault(gram, set()).add(product_id)
+        return index
+
+    def search(self, query: str, limit: int = MAX_CANDIDATES) -> list[tuple[int, float]]:
+        """Return (product_id, score) pairs, best first."""
+        needle = query.strip().lower()
+        if not needle:
+            return []
+        query_grams = _grams(needle)
+        name_hits: Counter[int] = Counter()
+        other_hits: Counter[int] = Counter()
+        for gram in query_grams:
+            name_hits.update(self.name_grams.get(gram, ()))
+            other_hits.update(self.other_grams.get(gram, ()))
+        # Short queries produce padded grams only, so also honour plain substring matches.
+        candidates = set(name_hits) | set(other_hits)
+        if len(needle) < 3:
+            candidates |= {pid for pid, name in self.names.items() if needle in name}
+            candidates |= {pid for pid, other in self.others.items() if needle in other}
+
+        total = len(query_grams) or 1
+        scored: list[tuple[int, float]] = []
+        for product_id in candidates:
+            name_score = name_hits[product_id] / total
+            other_score = other_hits[product_id] / total
+            in_name = needle in self.names.get(product_id, "")
+            in_other = needle in self.others.get(product_id, "")
+            if not (in_name or in_other or name_score >= MIN_SCORE or other_score >= MIN_SCORE):
+                continue
+            score = name_score + 0.5 * other_score + (1.0 if in_name else 0.0) + (0.25 if in_other else 0.0)
+            scored.append((product_id, round(score, 4)))
+        scored.sort(key=lambda pair: (-pair[1], pair[0]))
+        return scored[:limit]
+
+
+class ProductSearch:
+    """Apply a ranked text match to a product query for the active dialect."""
+
+    _lock = threading.Lock()
+    _index: NgramIndex | None = None
+
+    @staticmethod
+    def is_postgres() -> bool:
+        return db.session.get_bind().dialect.name == "postgresql"
+
+    @staticmethod
+    def apply(stmt, query: str) -> tuple[object, ColumnElement]:
+        """Filter ``stmt`` to products matching ``query``; return it with a rank expression."""
+        if ProductSearch.is_postgres():
+            return ProductSearch._apply_postgres(stmt, query)
+        return ProductSearch._apply_ngram(stmt, query)
+
+    @staticmethod
+    def _apply_postgres(stmt, query: str):
+        document = SEARCH_DOCUMENT
+        ts_query = func.plainto_tsquery(SEARCH_CONFIG, query)
+        pattern = f"%{query}%"
+        # The ILIKE branches are served by the pg_trgm GIN indexes.
+        stmt = stmt.where(
+            or_(
+                document.op("@@")(ts_query),
+                Product.name.ilike(pattern),
+                Product.sku.ilike(pattern),
+            )
+        )
+        rank = func.ts_rank_cd(document, ts_query) + func.similarity(Product.name, query)
+        return stmt, rank
+
+    @staticmethod
+    def _apply_ngram(stmt, query: str):
+        scored = ProductSearch.ngram_index().search(query)
+        if not scored:
+            return stmt.where(literal(False)), literal(0)
+        scores = dict(scored)
+        stmt = stmt.where(Product.id.in_(list(scores)))
+        rank = case(scores, value=Product.id, else_=0)
+        return stmt, rank
+
+    @staticmethod
+    def ngram_index() -> NgramIndex:
+        """Return the worker's n-gram index, rebuilding it if the catalog changed."""
+        fingerprint = tuple(
+            db.session.execute(
+                select(func.count(Product.id), func.max(Product.id), func.max(Product.updated_at))
+            ).one()
+        )
+        index = ProductSearch._index
+        if index is not None and index.fingerprint == fingerprint:
+            return index
+        with ProductSearch._lock:
+            index = ProductSearch._index
+            if index is None or index.fingerprint != fingerprint:
+                rows = db.session.execute(
+                    select(Product.id, Product.name, Product.sku, Product.description)
+                ).all()
+                index = NgramIndex.build(rows, fingerprint)
+                ProductSearch._index = index
+        return index
+
+    @staticmethod
+    def invalidate() -> None:
+        ProductSearch._index = None
@@ -3,7 +3,9 @@ from app.services.checkout.cart_loader import CheckoutCartLoader
 from app.services.checkout.idempotency import CheckoutIdempotencyManager
 from app.services.checkout.inventory import CheckoutInventoryManager
 from app.services.checkout.order_builder import CheckoutOrderBuilder
+from app.services.checkout.payment_outbox import CheckoutPaymentOutbox
 from app.services.checkout.pricing import CheckoutPricing, CheckoutTotals
+from app.services.checkout.reservations import CheckoutReservationManager
 
 __all__ = [
     "CheckoutBranchValidator",
@@ -11,6 +13,8 @@ __all__ = [
     "CheckoutIdempotencyManager",
     "CheckoutInventoryManager",
     "CheckoutOrderBuilder",
+    "CheckoutPaymentOutbox",
     "CheckoutPricing",
+    "CheckoutReservationManager",
     "CheckoutTotals",
 ]
@@ -2,22 +2,78 @@ from __future__ import annotations
 
 import hashlib
 import json
-from sqlalchemy import select
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import delete, select
 from sqlalchemy.exc import IntegrityError
 
 from app.extensions import db
 from app.middleware.error_handler import DomainError
-from app.models import IdempotencyKey
-from app.models.enums import IdempotencyStatus
+from app.models import Cart, IdempotencyKey
+from app.models.enums import IdempotencyStatus, OrderStatus
 from app.schemas.checkout import CheckoutConfirmRequest, CheckoutConfirmResponse
+from app.utils.ttl_cache import TTLCache
 
 class CheckoutIdempotencyManager:
+    # Final replays only: a PENDING_PAYMENT response still changes when the payment worker runs.
+    # The request hash covers cart_id, which pins the user, so the key needs no user_id.
+    _replays = TTLCache(maxsize=4096)
+
     @staticmethod
     def hash_request(payload: CheckoutConfirmRequest) -> str:
         """Hash the critical request payload fields."""
         data = payload.model_dump()
         return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
 
+    @staticmethod
+    def find_replay(cart_id: int, key: str, request_hash: str) -> CheckoutConfirmResponse | None:
+        """Return the stored response of an already succeeded confirm without taking any lock."""
+        cache_key = (cart_id, key, request_hash)
+        cached = CheckoutIdempotencyManager._replays.get(cache_key)
+        if cached is not None:
+            return cached
+        now = datetime.utcnow()
+        row = db.session.execute(
+            select(IdempotencyKey.response_payload, IdempotencyKey.expires_at)
+            .join(Cart, Cart.user_id == IdempotencyKey.user_id)
+            .where(
+                Cart.id == cart_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.request_hash == request_hash,
+                IdempotencyKey.status == IdempotencyStatus.SUCCEEDED,
+                IdempotencyKey.expires_at > now,
+            )
+        ).first()
+        if row is None or not row.response_payload:
+            return None
+        response = CheckoutConfirmResponse.model_validate(row.response_payload)
+        ttl = min(
+            float(current_app.config.get("CHECKOUT_REPLAY_CACHE_SECONDS", 300)),
+            (row.expires_at - now).total_seconds(),
+        )
+        if response.status != OrderStatus.PENDING_PAYMENT and ttl > 0:
+            CheckoutIdempotencyManager._replays.set(cache_key, response, ttl)
+        return response
+
+    @staticmethod
+    def purge_expired(batch_size: int = 1000) -> int:
+        """Delete expired keys ``batch_size`` at a time, committing per batch; returns the count."""
+        purged = 0
+        while True:
+            ids = db.session.execute(
+                select(IdempotencyKey.id)
+                .where(IdempotencyKey.expires_at <= datetime.utcnow())
+                .order_by(IdempotencyKey.expires_at)
+                .limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                return purged
+            db.session.execute(delete(IdempotencyKey).where(IdempotencyKey.id.in_(ids)))
+            db.session.commit()
+            purged += len(ids)
+            if len(ids) < batch_size:
+                return purged
+
     @staticmethod
     def get_or_create_in_progress(user_id: int, key: str, request_hash: str) -> tuple[IdempotencyKey, bool]:
         existing = CheckoutIdempotencyManager._lock_existing(user_id, key)
@@ -1,42 +1,37 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+from sqlalchemy import Integer, column, literal, select, union_all, update, values
 
 from app.extensions import db
-from app.middleware.error_handler import DomainError
 from app.models import Inventory
 from app.schemas.checkout import MissingItem
 from app.services.audit_service import AuditService
+from app.services.inventory_shards import InventoryShardService, sellable_quantity
 
 
 class CheckoutInventoryManager:
     def __init__(self, branch_id: int):
         self.branch_id = branch_id
 
-    def lock_inventory(self, cart_items) -> dict[tuple[int, int], Inventory]:
-        inv_ids = [item.product_id for item in cart_items]
-        inventory_rows = (
+    def available(self, product_ids) -> dict[int, int]:
+        """This branch's sellable stock per product, summing shards for sharded rows."""
+        ids = list(product_ids)
+        if not ids:
+            return {}
+        return dict(
             db.session.execute(
-                select(Inventory)
-                .where(Inventory.product_id.in_(inv_ids))
-                .where(Inventory.branch_id == self.branch_id)
-                .with_for_update()
-            )
-            .scalars()
-            .all()
+                select(Inventory.product_id, sellable_quantity())
+                .where(Inventory.product_id.in_(ids), Inventory.branch_id == self.branch_id)
+            ).all()
         )
-        return {(inv.product_id, inv.branch_id): inv for inv in inventory_rows}
 
-    def missing_items(self, cart_items, inv_map=None) -> list[MissingItem]:
+    def missing_items(self, cart_items, held: dict[int, int] | None = None) -> list[MissingItem]:
+        """Cart lines this branch cannot cover; ``held`` is stock the cart already reserved here."""
+        stock = self.available({item.product_id for item in cart_items})
+        held = held or {}
         missing: list[MissingItem] = []
         for item in cart_items:
-            if inv_map is None:
-                inv_row = db.session.execute(
-                    select(Inventory).where(Inventory.product_id == item.product_id, Inventory.branch_id == self.branch_id)
-                ).scalar_one_or_none()
-            else:
-                inv_row = inv_map.get((item.product_id, self.branch_id))
-            available = inv_row.available_quantity if inv_row else 0
+            available = stock.get(item.product_id, 0) + held.get(item.product_id, 0)
             if available < item.quantity:
                 missing.append(
                     MissingItem(
@@ -47,31 +42,143 @@ class CheckoutInventoryManager:
                 )
         return missing
 
-    def decrement_inventory(self, cart_items, inv_map) -> None:
+    @staticmethod
+    def quantities(cart_items) -> dict[int, int]:
+        wanted: dict[int, int] = {}
         for item in cart_items:
-            key = (item.product_id, self.branch_id)
-            inv_row = inv_map.get(key)
-            if not inv_row:
-                continue
-            if inv_row.available_quantity < item.quantity:
-                raise DomainError(
-                    "INSUFFICIENT_STOCK",
-                    f"Not enough stock for product {item.product_id}",
-                    status_code=400,
-                )
-            old_value = {
-                "available_quantity": inv_row.available_quantity,
-                "reserved_quantity": inv_row.reserved_quantity,
-            }
-            inv_row.available_quantity -= item.quantity
-            db.session.add(inv_row)
-            AuditService.log_event(
-                entity_type="inventory",
-                action="DECREMENT",
-                entity_id=inv_row.id,
-                old_value=old_value,
-                new_value={
-                    "available_quantity": inv_row.available_quantity,
-                    "reserved_quantity": inv_row.reserved_quantity,
-                },
+            wanted[item.product_id] = wanted.get(item.product_id, 0) + item.quantity
+        return wanted
+
+    def update_lines(self, wanted: dict[int, int], changes, guard=None) -> list:
+        """Apply one ``UPDATE inventory ... FROM (VALUES ...) v`` over this branch's rows.
+
+        ``changes(v)`` returns the SET values and ``guard(v)`` an optional extra WHERE clause, both
+        in terms of the line relation ``v`` (product_id, quantity). On PostgreSQL the rows are first
+        locked in product_id order so concurrent writers sharing SKUs queue instead of deadlocking.
+        Returns (id, product_id, available_quantity, reserved_quantity) for every updated row.
+        """
+        if not wanted:
+            return []
+        v = self._line_values(sorted(wanted.items()))
+        conditions = [Inventory.branch_id == self.branch_id, Inventory.product_id == v.c.product_id]
+        if guard is not None:
+            conditions.append(guard(v))
+        stmt = (
+            update(Inventory)
+            .where(*conditions)
+            .values(**changes(v))
+            .returning(Inventory.id, Inventory.product_id, Inventory.available_quantity, Inventory.reserved_quantity)
+            .execution_options(synchronize_session=False)
+        )
+        if db.session.get_bind().dialect.name == "postgresql":
+            locked = (
+                select(Inventory.id)
+                .join(v, v.c.product_id == Inventory.product_id)
+                .where(Inventory.branch_id == self.branch_id)
+                .order_by(Inventory.product_id)
+                .with_for_update(of=Inventory)
+                .cte("locked")
+            )
+            stmt = stmt.where(Inventory.id.in_(select(locked.c.id)))
+        return sorted(db.session.execute(stmt).all(), key=lambda row: row.product_id)
+
+    def shortfall(self, wanted: dict[int, int], applied: set[int]) -> list[MissingItem]:
+        """Report the lines of ``wanted`` not in ``applied`` with their current availability."""
+        short = [product_id for product_id in wanted if product_id not in applied]
+        if not short:
+            return []
+        available = self.available(short)
+        return [
+            MissingItem(
+                product_id=product_id,
+                requested_quantity=wanted[product_id],
+                available_quantity=available.get(product_id, 0),
+            )
+            for product_id in short
+        ]
+
+    def sharded_rows(self, product_ids) -> dict[int, int]:
+        """Map product_id to inventory id for this branch's rows kept in inventory_shards."""
+        ids = list(product_ids)
+        if not ids:
+            return {}
+        rows = db.session.execute(
+            select(Inventory.product_id, Inventory.id).where(
+                Inventory.branch_id == self.branch_id,
+                Inventory.product_id.in_(ids),
+                Inventory.shard_count > 0,
             )
+        ).all()
+        return dict(rows)
+
+    def decrement_inventory(self, cart_items) -> list[MissingItem]:
+        """Take every cart line's quantity from stock with one conditional UPDATE, all or nothing.
+
+        Sharded rows are decremented through InventoryShardService.take instead. A line whose
+        row is missing or short is not applied; in that case nothing is and the short lines are
+        returned.
+        """
+        wanted = self.quantities(cart_items)
+        sharded = self.sharded_rows(wanted)
+        savepoint = db.session.begin_nested()
+        rows = self.update_lines(
+            {product_id: quantity for product_id, quantity in wanted.items() if product_id not in sharded},
+            lambda v: {"available_quantity": Inventory.available_quantity - v.c.quantity},
+            lambda v: Inventory.available_quantity >= v.c.quantity,
+        )
+        taken = {
+            product_id
+            for product_id, inv_id in sorted(sharded.items())
+            if InventoryShardService.take(inv_id, wanted[product_id])
+        }
+        if len(rows) + len(taken) < len(wanted):
+            savepoint.rollback()
+            return self.shortfall(wanted, {row.product_id for row in rows} | taken)
+        savepoint.commit()
+
+        AuditService.log_events(
+            [
+                {
+                    "entity_type": "inventory",
+                    "action": "DECREMENT",
+                    "entity_id": inv_id,
+                    "old_value": {"available_quantity": available + wanted[product_id], "reserved_quantity": reserved},
+                    "new_value": {"available_quantity": available, "reserved_quantity": reserved},
+                }
+                for inv_id, product_id, available, reserved in rows
+            ]
+            + [
+                {
+                    "entity_type": "inventory",
+                    "action": "DECREMENT",
+                    "entity_id": sharded[product_id],
+                    "new_value": {"sharded_quantity_taken": wanted[product_id]},
+                }
+                for product_id in sorted(taken)
+            ]
+        )
+        return []
+
+    def restock(self, wanted: dict[int, int]) -> None:
+        """Give ``wanted`` quantities back to available stock, e.g. for an order that was not paid."""
+        sharded = self.sharded_rows(wanted)
+        self.update_lines(
+            {product_id: quantity for product_id, quantity in wanted.items() if product_id not in sharded},
+            lambda v: {"available_quantity": Inventory.available_quantity + v.c.quantity},
+        )
+        for product_id, inv_id in sorted(sharded.items()):
+            InventoryShardService.give(inv_id, wanted[product_id])
+
+    @staticmethod
+    def _line_values(lines: list[tuple[int, int]]):
+        """(product_id, quantity) pairs as a FROM-able relation named ``v``.
+
+        PostgreSQL gets a VALUES list; SQLite cannot alias VALUES columns, so it gets UNION ALL.
+        """
+        if db.session.get_bind().dialect.name == "postgresql":
+            return values(column("product_id", Integer), column("quantity", Integer), name="v").data(lines)
+        rows = [
+            select(literal(product_id, Integer).label("product_id"), literal(quantity, Integer).label("quantity"))
+            for product_id, quantity in lines
+        ]
+        return union_all(*rows).subquery("v") if len(rows) > 1 else rows[0].subquery("v")
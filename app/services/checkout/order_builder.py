@@ -1,8 +1,9 @@
 from __future__ import annotations
 from datetime import datetime
 from secrets import token_hex
+from sqlalchemy import insert, select
 from app.extensions import db
-from app.models import Order, OrderDeliveryDetails, OrderItem, OrderPickupDetails
+from app.models import Order, OrderDeliveryDetails, OrderItem, OrderPickupDetails, Product
 from app.models.enums import FulfillmentType, OrderStatus
 from app.schemas.checkout import CheckoutConfirmRequest
 from app.services.audit_service import AuditService
@@ -14,29 +15,55 @@ class CheckoutOrderBuilder:
         return f"ORD-{int(datetime.utcnow().timestamp())}-{token_hex(3).upper()}"
 
     @staticmethod
-    def create_order(cart, payload: CheckoutConfirmRequest, branch_id: int, total_amount) -> Order:
+    def create_order(
+        cart,
+        payload: CheckoutConfirmRequest,
+        branch_id: int,
+        total_amount,
+        status: OrderStatus = OrderStatus.CREATED,
+    ) -> Order:
         order = Order(
             order_number=CheckoutOrderBuilder.order_number(),
             user_id=cart.user_id,
             total_amount=total_amount,
             fulfillment_type=payload.fulfillment_type or FulfillmentType.DELIVERY,
-            status=OrderStatus.CREATED,
+            status=status,
             branch_id=branch_id,  # Ensure branch_id is set from resolved branch
         )
         db.session.add(order)
-        for item in cart.items:
-            order_item = OrderItem(
-                order=order,
-                product_id=item.product_id,
-                name=item.product.name,
-                sku=item.product.sku,
-                unit_price=item.unit_price,
-                quantity=item.quantity,
-            )
-            db.session.add(order_item)
         db.session.flush()
+        CheckoutOrderBuilder.add_items(order, cart.items)
         return order
 
+    @staticmethod
+    def add_items(order: Order, cart_items) -> None:
+        """Snapshot every line's product name and SKU with one query and insert them in one statement."""
+        if not cart_items:
+            return
+        products = {
+            row.id: row
+            for row in db.session.execute(
+                select(Product.id, Product.name, Product.sku).where(
+                    Product.id.in_({item.product_id for item in cart_items})
+                )
+            )
+        }
+        db.session.execute(
+            insert(OrderItem).values(
+                [
+                    {
+                        "order_id": order.id,
+                        "product_id": item.product_id,
+                        "name": products[item.product_id].name,
+                        "sku": products[item.product_id].sku,
+                        "unit_price": item.unit_price,
+                        "quantity": item.quantity,
+                    }
+                    for item in cart_items
+                ]
+            )
+        )
+
     @staticmethod
     def add_fulfillment_details(order: Order, payload: CheckoutConfirmRequest, branch_id: int) -> None:
         if payload.fulfillment_type == FulfillmentType.DELIVERY:
@@ -0,0 +1,269 @@
+"""Second phase of checkout: capture the payments recorded in ``payment_outbox``."""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask, current_app
+from sqlalchemy import select
+
+from app.extensions import db
+from app.middleware.error_handler import DomainError
+from app.models import IdempotencyKey, Order, PaymentOutbox
+from app.models.enums import OrderStatus, PaymentOutboxStatus
+from app.services.audit_service import AuditService
+from app.services.cache_version_service import INVENTORY, CacheVersionService
+from app.services.payment_service import PaymentService
+from app.services.stock_cache import StockCache
+from .inventory import CheckoutInventoryManager
+
+
+class CheckoutPaymentOutbox:
+    """Charges orders that confirm committed as PENDING_PAYMENT.
+
+    Confirm only records what is owed; the provider call happens here, outside any lock, under
+    the order's idempotency key. A capture finalizes the order as CREATED. A declined charge, or
+    one that stays unsettled for CHECKOUT_PAYMENT_MAX_ATTEMPTS tries, cancels the order and
+    gives its stock back.
+    """
+
+    _thread: threading.Thread | None = None
+
+    @staticmethod
+    def enqueue(order: Order, payment_token_id: int, amount) -> PaymentOutbox:
+        entry = PaymentOutbox(
+            order_id=order.id,
+            payment_token_id=payment_token_id,
+            amount=amount,
+            status=PaymentOutboxStatus.PENDING,
+            attempts=0,
+        )
+        db.session.add(entry)
+        db.session.flush()
+        return entry
+
+    @staticmethod
+    def drain(limit: int = 50) -> int:
+        """Reconcile stale in-flight charges, then process pending entries; returns how many were tried.
+
+        At most ``limit`` entries are handled, each committed on its own. Entries another worker
+        holds are skipped; an entry left pending after reconciliation is retried on a later drain.
+        """
+        processed = CheckoutPaymentOutbox.reconcile(limit)
+        last_id = 0
+        while processed < limit:
+            entry = db.session.execute(
+                select(PaymentOutbox)
+                .where(PaymentOutbox.status == PaymentOutboxStatus.PENDING, PaymentOutbox.id > last_id)
+                .order_by(PaymentOutbox.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            ).scalar_one_or_none()
+            if entry is None:
+                break
+            last_id = entry.id
+            CheckoutPaymentOutbox._process(entry)
+            processed += 1
+        return processed
+
+    @staticmethod
+    def reconcile(limit: int = 50, stale_seconds: float | None = None) -> int:
+        """Settle CHARGING entries older than CHECKOUT_PAYMENT_RECONCILE_SECONDS; returns how many.
+
+        The provider is asked for a capture under the entry's idempotency key, never charged
+        again from here: a known capture finalizes the order, none sends the entry back to
+        PENDING, or compensates it once CHECKOUT_PAYMENT_MAX_ATTEMPTS have been spent.
+        """
+        if stale_seconds is None:
+            stale_seconds = float(current_app.config.get("CHECKOUT_PAYMENT_RECONCILE_SECONDS", 60))
+        max_attempts = int(current_app.config.get("CHECKOUT_PAYMENT_MAX_ATTEMPTS", 5))
+        cutoff = datetime.utcnow() - timedelta(seconds=stale_seconds)
+        settled = 0
+        last_id = 0
+        while settled < limit:
+            entry = db.session.execute(
+                select(PaymentOutbox)
+                .where(
+                    PaymentOutbox.status == PaymentOutboxStatus.CHARGING,
+                    PaymentOutbox.charge_started_at <= cutoff,
+                    PaymentOutbox.id > last_id,
+                )
+                .order_by(PaymentOutbox.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            ).scalar_one_or_none()
+            if entry is None:
+                break
+            last_id = entry.id
+            settled += 1
+            try:
+                reference = PaymentService.find_charge(entry.charge_key)
+            except Exception:
+                db.session.rollback()
+                current_app.logger.warning("Could not reconcile payment for order %s", entry.order_id, exc_info=True)
+                continue
+            order = CheckoutPaymentOutbox._awaiting_order(entry)
+            if order is None:
+                continue
+            if reference is not None:
+                CheckoutPaymentOutbox._capture(entry, order, reference)
+            elif entry.attempts >= max_attempts:
+                CheckoutPaymentOutbox._compensate(entry, order, "PAYMENT_PROVIDER_ERROR")
+            else:
+                entry.status = PaymentOutboxStatus.PENDING
+                db.session.commit()
+        return settled
+
+    @staticmethod
+    def _process(entry: PaymentOutbox) -> None:
+        if CheckoutPaymentOutbox._awaiting_order(entry) is None:
+            return
+
+        # The attempt is committed before the provider is called. If its outcome is then lost
+        # (provider timeout, failed commit, crash) the entry stays CHARGING for reconcile.
+        entry.attempts += 1
+        entry.status = PaymentOutboxStatus.CHARGING
+        entry.charge_started_at = datetime.utcnow()
+        db.session.commit()
+        entry_id = entry.id
+        try:
+            reference = PaymentService.charge(
+                entry.payment_token_id, float(entry.amount), idempotency_key=entry.charge_key
+            )
+        except DomainError as exc:
+            entry, order = CheckoutPaymentOutbox._relock(entry_id)
+            if order is not None:
+                CheckoutPaymentOutbox._compensate(entry, order, exc.code)
+            return
+        except Exception as exc:
+            current_app.logger.warning(
+                "Payment attempt %s for order %s has no known outcome", entry.attempts, entry.order_id, exc_info=True
+            )
+            db.session.rollback()
+            entry, _ = CheckoutPaymentOutbox._relock(entry_id)
+            entry.last_error = str(exc)[:256]
+            db.session.commit()
+            return
+
+        entry, order = CheckoutPaymentOutbox._relock(entry_id)
+        if order is not None:
+            CheckoutPaymentOutbox._capture(entry, order, reference)
+        else:
+            entry.payment_reference = reference
+            db.session.commit()
+            current_app.logger.error("Captured payment %s for order %s that is no longer awaiting it", reference, entry.order_id)
+
+    @staticmethod
+    def _capture(entry: PaymentOutbox, order: Order, reference: str) -> None:
+        """Finalize a captured payment; if that commit fails the capture is audited on its own."""
+        entry.status = PaymentOutboxStatus.CAPTURED
+        entry.payment_reference = reference
+        entry.last_error = None
+        order.status = OrderStatus.CREATED
+        CheckoutPaymentOutbox._update_replay(order, status=OrderStatus.CREATED, payment_reference=reference)
+        AuditService.log_event(
+            entity_type="order",
+            action="PAYMENT_CAPTURED",
+            entity_id=order.id,
+            actor_user_id=order.user_id,
+            old_value={"status": OrderStatus.PENDING_PAYMENT.value},
+            new_value={"status": order.status.value},
+            context={"reference": reference},
+        )
+        order_id = order.id
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            current_app.logger.exception("Captured payment for order %s but could not commit it", order_id)
+            try:
+                AuditService.log_event(
+                    entity_type="payment",
+                    action="PAYMENT_CAPTURED_NOT_COMMITTED",
+                    entity_id=order_id,
+                    context={"reference": reference, "order_id": str(order_id)},
+                )
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                current_app.logger.exception("Could not audit the uncommitted capture for order %s", order_id)
+            raise
+
+    @staticmethod
+    def _relock(entry_id: int) -> tuple[PaymentOutbox, Order | None]:
+        """Lock an entry again after the provider call, with its order if still awaiting payment."""
+        entry = db.session.get(PaymentOutbox, entry_id, with_for_update=True, populate_existing=True)
+        if entry.status != PaymentOutboxStatus.CHARGING:
+            return entry, None
+        return entry, CheckoutPaymentOutbox._awaiting_order(entry)
+
+    @staticmethod
+    def _awaiting_order(entry: PaymentOutbox) -> Order | None:
+        """Lock the entry's order; an order no longer awaiting payment fails the entry instead."""
+        order = db.session.get(Order, entry.order_id, with_for_update=True, populate_existing=True)
+        if order is None or order.status != OrderStatus.PENDING_PAYMENT:
+            entry.status = PaymentOutboxStatus.FAILED
+            entry.last_error = "Order is no longer awaiting payment"
+            db.session.commit()
+            return None
+        return order
+
+    @staticmethod
+    def _compensate(entry: PaymentOutbox, order: Order, reason: str) -> None:
+        """Cancel an order whose payment failed and return its stock, in one commit."""
+        wanted = CheckoutInventoryManager.quantities(order.items)
+        CheckoutInventoryManager(order.branch_id).restock(wanted)
+        entry.status = PaymentOutboxStatus.FAILED
+        entry.last_error = reason
+        order.status = OrderStatus.CANCELED
+        CheckoutPaymentOutbox._update_replay(order, status=OrderStatus.CANCELED)
+        AuditService.log_event(
+            entity_type="order",
+            action="PAYMENT_FAILED",
+            entity_id=order.id,
+            actor_user_id=order.user_id,
+            old_value={"status": OrderStatus.PENDING_PAYMENT.value},
+            new_value={"status": order.status.value},
+            context={"reason": reason, "attempts": entry.attempts},
+        )
+        CacheVersionService.bump_striped(INVENTORY)
+        db.session.commit()
+        StockCache.invalidate(wanted)
+
+    @staticmethod
+    def _update_replay(order: Order, **changes) -> None:
+        """Keep the idempotent replay of confirm in step with the order's payment outcome."""
+        record = db.session.execute(
+            select(IdempotencyKey).where(IdempotencyKey.order_id == order.id)
+        ).scalar_one_or_none()
+        if record is None or not record.response_payload:
+            return
+        payload = dict(record.response_payload)
+        payload.update({key: getattr(value, "value", value) for key, value in changes.items()})
+        record.response_payload = payload
+
+    @staticmethod
+    def start_worker(app: Flask) -> None:
+        """Drain the outbox every CHECKOUT_PAYMENT_DRAIN_SECONDS in a daemon thread."""
+        interval = float(app.config.get("CHECKOUT_PAYMENT_DRAIN_SECONDS", 2))
+        if interval <= 0 or CheckoutPaymentOutbox._thread is not None:
+            return
+        batch_size = int(app.config.get("CHECKOUT_PAYMENT_DRAIN_BATCH", 50))
+
+        def _run() -> None:
+            while True:
+                time.sleep(interval)
+                with app.app_context():
+                    try:
+                        CheckoutPaymentOutbox.drain(batch_size)
+                    except Exception:
+                        db.session.rollback()
+                        app.logger.warning("Payment outbox drain failed", exc_info=True)
+                    finally:
+                        db.session.remove()
+
+        thread = threading.Thread(target=_run, name="payment-outbox", daemon=True)
+        CheckoutPaymentOutbox._thread = thread
+        thread.start()
@@ -0,0 +1,227 @@
+"""Time-limited stock holds taken when a customer starts checkout."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from flask import Flask, current_app
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.extensions import db
+from app.models import Inventory, InventoryReservation
+from app.schemas.checkout import MissingItem, ReservedLine
+from app.services.audit_service import AuditService
+from app.services.cache_version_service import INVENTORY, CacheVersionService
+from app.services.inventory_shards import InventoryShardService
+from app.services.stock_cache import StockCache
+from .idempotency import CheckoutIdempotencyManager
+from .inventory import CheckoutInventoryManager
+
+
+def _now() -> datetime:
+    return datetime.utcnow()
+
+
+def _release_changes(v) -> dict:
+    # An admin may have overwritten reserved_quantity meanwhile; never drive it negative.
+    return {
+        "available_quantity": Inventory.available_quantity + v.c.quantity,
+        "reserved_quantity": case(
+            (Inventory.reserved_quantity >= v.c.quantity, Inventory.reserved_quantity - v.c.quantity), else_=0
+        ),
+    }
+
+
+class CheckoutReservationManager:
+    """Moves cart quantities from available to reserved stock for a limited time.
+
+    Confirm converts a matching hold into the sale without re-checking availability; holds that
+    expire are handed back by ``sweep_expired``.
+    """
+
+    _thread: threading.Thread | None = None
+
+    def __init__(self, branch_id: int):
+        self.branch_id = branch_id
+        self.inventory = CheckoutInventoryManager(branch_id)
+
+    def reserve(self, cart_id: int, cart_items) -> tuple[datetime | None, list[ReservedLine], list[MissingItem]]:
+        """Replace the cart's holds with one per line that fits; lines that don't are reported.
+
+        Sharded SKUs are not held: their confirm-time decrement already avoids a single hot row.
+        Reserving again while the cart still has active holds keeps their expiry, so a hold can
+        never be extended past CHECKOUT_RESERVATION_TTL_SECONDS from when it was first taken.
+        """
+        active_until = db.session.scalar(
+            select(func.min(InventoryReservation.expires_at)).where(
+                InventoryReservation.cart_id == cart_id, InventoryReservation.expires_at > _now()
+            )
+        )
+        CheckoutReservationManager.release_cart(cart_id)
+        wanted = self.inventory.quantities(cart_items)
+        for product_id in self.inventory.sharded_rows(wanted):
+            del wanted[product_id]
+        rows = self.inventory.update_lines(
+            wanted,
+            lambda v: {
+                "available_quantity": Inventory.available_quantity - v.c.quantity,
+                "reserved_quantity": Inventory.reserved_quantity + v.c.quantity,
+            },
+            lambda v: Inventory.available_quantity >= v.c.quantity,
+        )
+        ttl = float(current_app.config.get("CHECKOUT_RESERVATION_TTL_SECONDS", 600))
+        expires_at = (active_until or _now() + timedelta(seconds=ttl)) if rows else None
+        reserved = [ReservedLine(product_id=row.product_id, quantity=wanted[row.product_id]) for row in rows]
+        db.session.add_all(
+            InventoryReservation(
+                cart_id=cart_id,
+                branch_id=self.branch_id,
+                product_id=line.product_id,
+                quantity=line.quantity,
+                expires_at=expires_at,
+            )
+            for line in reserved
+        )
+        missing = self.inventory.shortfall(wanted, {line.product_id for line in reserved})
+        AuditService.log_event(
+            entity_type="cart",
+            action="RESERVE",
+            entity_id=cart_id,
+            new_value={
+                "branch_id": str(self.branch_id),
+                "reserved": {str(line.product_id): line.quantity for line in reserved},
+                "missing": [str(item.product_id) for item in missing],
+            },
+        )
+        return expires_at, reserved, missing
+
+    def convert(self, cart_id: int, cart_items) -> list:
+        """Turn the cart's holds into the sale and return the cart lines they did not cover.
+
+        A hold counts only if it is for this branch and exactly the line's quantity; any other
+        hold is released first so the caller can decrement those lines normally. A hold that
+        expired but was not swept yet still owns its stock and is converted.
+        """
+        holds = db.session.execute(
+            select(InventoryReservation)
+            .where(InventoryReservation.cart_id == cart_id)
+            .order_by(InventoryReservation.product_id)
+            .with_for_update()
+        ).scalars().all()
+        if not holds:
+            return list(cart_items)
+        wanted = self.inventory.quantities(cart_items)
+        covered = {
+            hold.product_id: hold.quantity
+            for hold in holds
+            if hold.branch_id == self.branch_id and wanted.get(hold.product_id) == hold.quantity
+        }
+        CheckoutReservationManager._release(hold for hold in holds if hold.product_id not in covered)
+        self.inventory.update_lines(
+            covered,
+            lambda v: {
+                "reserved_quantity": case(
+                    (Inventory.reserved_quantity >= v.c.quantity, Inventory.reserved_quantity - v.c.quantity),
+                    else_=0,
+                )
+            },
+        )
+        db.session.execute(delete(InventoryReservation).where(InventoryReservation.cart_id == cart_id))
+        return [item for item in cart_items if item.product_id not in covered]
+
+    @staticmethod
+    def held(cart_id: int, branch_id: int) -> dict[int, int]:
+        """Quantities the cart itself holds at ``branch_id``, per product.
+
+        They already left available stock but are the cart's own to convert, so checks of the
+        cart's availability add them back.
+        """
+        rows = db.session.execute(
+            select(InventoryReservation.product_id, func.sum(InventoryReservation.quantity))
+            .where(InventoryReservation.cart_id == cart_id, InventoryReservation.branch_id == branch_id)
+            .group_by(InventoryReservation.product_id)
+        ).all()
+        return {product_id: int(quantity) for product_id, quantity in rows}
+
+    @staticmethod
+    def release_cart(cart_id: int) -> None:
+        holds = db.session.execute(
+            select(InventoryReservation).where(InventoryReservation.cart_id == cart_id).with_for_update()
+        ).scalars().all()
+        if holds:
+            CheckoutReservationManager._release(holds)
+            db.session.execute(delete(InventoryReservation).where(InventoryReservation.cart_id == cart_id))
+
+    @staticmethod
+    def _release(holds) -> None:
+        """Give held quantities back to available stock (the caller deletes the rows)."""
+        by_branch: dict[int, dict[int, int]] = defaultdict(dict)
+        for hold in holds:
+            lines = by_branch[hold.branch_id]
+            lines[hold.product_id] = lines.get(hold.product_id, 0) + hold.quantity
+        for branch_id in sorted(by_branch):
+            CheckoutInventoryManager(branch_id).update_lines(by_branch[branch_id], _release_changes)
+
+    @staticmethod
+    def sweep_expired(batch_size: int = 500) -> int:
+        """Release expired holds ``batch_size`` at a time, committing per batch; returns the count."""
+        released = 0
+        while True:
+            holds = db.session.execute(
+                select(InventoryReservation)
+                .where(InventoryReservation.expires_at <= _now())
+                .order_by(InventoryReservation.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            ).scalars().all()
+            if not holds:
+                return released
+            CheckoutReservationManager._release(holds)
+            db.session.execute(
+                delete(InventoryReservation).where(InventoryReservation.id.in_([hold.id for hold in holds]))
+            )
+            product_ids = {hold.product_id for hold in holds}
+            CacheVersionService.bump_striped(INVENTORY)
+            db.session.commit()
+            StockCache.invalidate(product_ids)
+            released += len(holds)
+            if len(holds) < batch_size:
+                return released
+
+    @staticmethod
+    def start_sweeper(app: Flask) -> None:
+        """Run checkout housekeeping every CHECKOUT_RESERVATION_SWEEP_SECONDS.
+
+        Each pass sweeps expired holds, refreshes sharded stock mirrors and purges expired
+        idempotency keys and finished checkout queue tickets.
+        """
+        from app.services.checkout_queue import CheckoutQueueService
+
+        interval = float(app.config.get("CHECKOUT_RESERVATION_SWEEP_SECONDS", 30))
+        if interval <= 0 or CheckoutReservationManager._thread is not None:
+            return
+        batch_size = int(app.config.get("CHECKOUT_RESERVATION_SWEEP_BATCH", 500))
+        purge_batch = int(app.config.get("IDEMPOTENCY_PURGE_BATCH", 1000))
+
+        def _run() -> None:
+            while True:
+                time.sleep(interval)
+                with app.app_context():
+                    try:
+                        CheckoutReservationManager.sweep_expired(batch_size)
+                        InventoryShardService.sync_mirrors()
+                        CheckoutIdempotencyManager.purge_expired(purge_batch)
+                        CheckoutQueueService.purge_finished(purge_batch)
+                    except SQLAlchemyError:
+                        db.session.rollback()
+                        app.logger.warning("Reservation sweep failed", exc_info=True)
+                    finally:
+                        db.session.remove()
+
+        thread = threading.Thread(target=_run, name="reservation-sweeper", daemon=True)
+        CheckoutReservationManager._thread = thread
+        thread.start()
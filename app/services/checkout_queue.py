@@ -0,0 +1,306 @@
+"""Queue-mode checkout: confirms are admitted to a table and placed by one writer per branch."""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask, current_app, url_for
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.middleware.error_handler import DomainError
+from app.models import Cart, CheckoutQueueEntry
+from app.models.enums import CheckoutQueueStatus
+from app.schemas.checkout import CheckoutConfirmRequest, CheckoutConfirmResponse, CheckoutQueueTicketResponse
+from app.services.checkout import CheckoutBranchValidator, CheckoutIdempotencyManager
+from app.services.checkout_service import INSUFFICIENT_STOCK, CheckoutService
+from app.utils.responses import error_envelope
+
+# Namespace for the per-branch advisory lock that keeps a single writer per branch.
+_WRITER_LOCK_NAMESPACE = 0x43514B
+
+
+class CheckoutQueueService:
+    """Opt-in (CHECKOUT_QUEUE_ENABLED) admission for flash sales.
+
+    Request threads only validate, insert a ticket and return 202; they never touch inventory
+    locks. ``process`` places a branch's queued orders in one transaction, so contended rows are
+    locked by one writer at a time and the commit cost is shared by the batch.
+    """
+
+    _thread: threading.Thread | None = None
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(current_app.config.get("CHECKOUT_QUEUE_ENABLED", False))
+
+    @staticmethod
+    def branch_limit(branch_id: int) -> int:
+        """Queued tickets a branch admits; CHECKOUT_QUEUE_BRANCH_LIMITS ("1:2000,4:300") overrides."""
+        for pair in str(current_app.config.get("CHECKOUT_QUEUE_BRANCH_LIMITS") or "").split(","):
+            branch, _, limit = pair.partition(":")
+            if branch.strip() == str(branch_id) and limit.strip():
+                return int(limit)
+        return int(current_app.config.get("CHECKOUT_QUEUE_MAX_PENDING", 500))
+
+    @staticmethod
+    def admit(
+        payload: CheckoutConfirmRequest, idempotency_key: str, wait: float = 0
+    ) -> tuple[CheckoutConfirmResponse | CheckoutQueueTicketResponse, int]:
+        """Queue a confirm and return (body, HTTP status).
+
+        Waits up to ``wait`` seconds (capped by CHECKOUT_QUEUE_MAX_WAIT_SECONDS) for the writer;
+        a finished ticket answers exactly like a direct confirm, otherwise the ticket is
+        returned with 202.
+        """
+        request_hash = CheckoutIdempotencyManager.hash_request(payload)
+        replay = CheckoutIdempotencyManager.find_replay(payload.cart_id, idempotency_key, request_hash)
+        if replay is not None:
+            return replay, 200
+
+        branch_id = CheckoutBranchValidator.resolve_branch(payload.fulfillment_type, payload.branch_id)
+        user_id = db.session.scalar(select(Cart.user_id).where(Cart.id == payload.cart_id))
+        if user_id is None:
+            raise DomainError("NOT_FOUND", "Cart not found", status_code=404)
+
+        entry = CheckoutQueueService._existing(user_id, idempotency_key)
+        if entry is None:
+            queued = db.session.scalar(
+                select(func.count())
+                .select_from(CheckoutQueueEntry)
+                .where(
+                    CheckoutQueueEntry.branch_id == branch_id,
+                    CheckoutQueueEntry.status == CheckoutQueueStatus.QUEUED,
+                )
+            )
+            if queued >= CheckoutQueueService.branch_limit(branch_id):
+                raise DomainError(
+                    "CHECKOUT_BUSY",
+                    "Checkout is at capacity for this branch, please retry shortly",
+                    status_code=503,
+                    details={"branch_id": str(branch_id)},
+                )
+            entry = CheckoutQueueEntry(
+                user_id=user_id,
+                branch_id=branch_id,
+                idempotency_key=idempotency_key,
+                request_hash=request_hash,
+                payload=payload.model_dump(mode="json"),
+                status=CheckoutQueueStatus.QUEUED,
+            )
+            db.session.add(entry)
+            try:
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                entry = CheckoutQueueService._existing(user_id, idempotency_key)
+        if entry.request_hash != request_hash:
+            raise DomainError(
+                "IDEMPOTENCY_KEY_REUSE_MISMATCH",
+                "Same Idempotency-Key used with different request payload",
+                status_code=409,
+            )
+
+        entry_id = entry.id
+        max_wait = float(current_app.config.get("CHECKOUT_QUEUE_MAX_WAIT_SECONDS", 10))
+        deadline = time.monotonic() + min(max(wait, 0), max_wait)
+        poll = float(current_app.config.get("CHECKOUT_QUEUE_POLL_SECONDS", 0.1))
+        while entry.status == CheckoutQueueStatus.QUEUED and time.monotonic() < deadline:
+            time.sleep(poll)
+            db.session.rollback()
+            entry = db.session.get(CheckoutQueueEntry, entry_id, populate_existing=True)
+
+        if entry.status == CheckoutQueueStatus.DONE:
+            return CheckoutConfirmResponse.model_validate(entry.response_payload), entry.status_code
+        if entry.status == CheckoutQueueStatus.FAILED:
+            error = entry.response_payload or {}
+            raise DomainError(
+                error.get("code", "CHECKOUT_FAILED"),
+                error.get("message", "Checkout could not be completed"),
+                status_code=entry.status_code or 500,
+                details=error.get("details"),
+            )
+        return CheckoutQueueService._ticket(entry), 202
+
+    @staticmethod
+    def status(ticket_id: int, user_id: int) -> CheckoutQueueTicketResponse:
+        entry = db.session.get(CheckoutQueueEntry, ticket_id)
+        if not entry or entry.user_id != user_id:
+            raise DomainError("NOT_FOUND", "Checkout ticket not found", status_code=404)
+        return CheckoutQueueService._ticket(entry)
+
+    @staticmethod
+    def process(branch_id: int, limit: int = 20) -> int:
+        """Place up to ``limit`` queued orders for a branch with one commit; returns how many.
+
+        Each ticket runs the normal confirm inside its own savepoint, so a failing ticket is
+        recorded without undoing the rest of the batch. Returns 0 if another process is the
+        branch's writer right now.
+        """
+        if not CheckoutQueueService._claim_branch(branch_id):
+            return 0
+        entries = db.session.execute(
+            select(CheckoutQueueEntry)
+            .where(
+                CheckoutQueueEntry.branch_id == branch_id,
+                CheckoutQueueEntry.status == CheckoutQueueStatus.QUEUED,
+            )
+            .order_by(CheckoutQueueEntry.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        product_ids: set[int] = set()
+        for entry in entries:
+            payload = CheckoutConfirmRequest.model_validate(entry.payload)
+            savepoint = db.session.begin_nested()
+            try:
+                response, is_new, placed = CheckoutService.place_order(
+                    payload, entry.idempotency_key, entry.request_hash
+                )
+            except DomainError as exc:
+                if exc.code == INSUFFICIENT_STOCK:
+                    savepoint.commit()  # keep the idempotency key marked FAILED
+                else:
+                    savepoint.rollback()
+                error = error_envelope(exc.code, exc.message, status_code=exc.status_code, details=exc.details)
+                CheckoutQueueService._finish(entry, CheckoutQueueStatus.FAILED, exc.status_code, error["error"])
+                continue
+            except Exception:
+                savepoint.rollback()
+                current_app.logger.exception("Queued checkout %s failed", entry.id)
+                error = error_envelope(
+                    "UNEXPECTED_ERROR", "Checkout could not be completed, please try again", status_code=500
+                )
+                CheckoutQueueService._finish(entry, CheckoutQueueStatus.FAILED, 500, error["error"])
+                continue
+            savepoint.commit()
+            product_ids.update(placed)
+            CheckoutQueueService._finish(
+                entry, CheckoutQueueStatus.DONE, 201 if is_new else 200, response.model_dump(mode="json")
+            )
+        db.session.commit()
+        if product_ids:
+            CheckoutService.after_commit(product_ids)
+        return len(entries)
+
+    @staticmethod
+    def drain(limit: int = 20) -> int:
+        """Run ``process`` once for every branch with queued tickets; returns the tickets handled."""
+        branch_ids = db.session.execute(
+            select(CheckoutQueueEntry.branch_id)
+            .where(CheckoutQueueEntry.status == CheckoutQueueStatus.QUEUED)
+            .distinct()
+        ).scalars().all()
+        db.session.rollback()
+        return sum(CheckoutQueueService.process(branch_id, limit) for branch_id in sorted(branch_ids))
+
+    @staticmethod
+    def purge_finished(batch_size: int = 1000, retention_seconds: float | None = None) -> int:
+        """Delete DONE/FAILED tickets untouched for CHECKOUT_QUEUE_RETENTION_SECONDS, ``batch_size`` at a time.
+
+        Commits per batch and returns the count. Retries of a purged ticket are still answered
+        from the idempotency key while it lives.
+        """
+        if retention_seconds is None:
+            retention_seconds = float(current_app.config.get("CHECKOUT_QUEUE_RETENTION_SECONDS", 3600))
+        cutoff = datetime.utcnow() - timedelta(seconds=retention_seconds)
+        purged = 0
+        while True:
+            ids = db.session.execute(
+                select(CheckoutQueueEntry.id)
+                .where(
+                    CheckoutQueueEntry.status.in_((CheckoutQueueStatus.DONE, CheckoutQueueStatus.FAILED)),
+                    CheckoutQueueEntry.updated_at <= cutoff,
+                )
+                .order_by(CheckoutQueueEntry.id)
+                .limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                return purged
+            db.session.execute(delete(CheckoutQueueEntry).where(CheckoutQueueEntry.id.in_(ids)))
+            db.session.commit()
+            purged += len(ids)
+            if len(ids) < batch_size:
+                return purged
+
+    @staticmethod
+    def start_worker(app: Flask) -> None:
+        """Drain the queue every CHECKOUT_QUEUE_POLL_SECONDS in a daemon thread (queue mode only)."""
+        if not app.config.get("CHECKOUT_QUEUE_ENABLED") or CheckoutQueueService._thread is not None:
+            return
+        interval = float(app.config.get("CHECKOUT_QUEUE_POLL_SECONDS", 0.1))
+        batch_size = int(app.config.get("CHECKOUT_QUEUE_BATCH", 20))
+
+        def _run() -> None:
+            while True:
+                with app.app_context():
+                    try:
+                        handled = CheckoutQueueService.drain(batch_size)
+                    except Exception:
+                        db.session.rollback()
+                        handled = 0
+                        app.logger.warning("Checkout queue drain failed", exc_info=True)
+                    finally:
+                        db.session.remove()
+                if not handled:
+                    time.sleep(interval)
+
+        thread = threading.Thread(target=_run, name="checkout-queue", daemon=True)
+        CheckoutQueueService._thread = thread
+        thread.start()
+
+    @staticmethod
+    def _existing(user_id: int, idempotency_key: str) -> CheckoutQueueEntry | None:
+        return db.session.execute(
+            select(CheckoutQueueEntry).where(
+                CheckoutQueueEntry.user_id == user_id,
+                CheckoutQueueEntry.idempotency_key == idempotency_key,
+            )
+        ).scalar_one_or_none()
+
+    @staticmethod
+    def _finish(entry: CheckoutQueueEntry, status: CheckoutQueueStatus, status_code: int, body: dict) -> None:
+        entry.status = status
+        entry.status_code = status_code
+        entry.response_payload = body
+        db.session.flush()
+
+    @staticmethod
+    def _claim_branch(branch_id: int) -> bool:
+        """Take the branch's writer lock for this transaction (PostgreSQL advisory lock)."""
+        if db.session.get_bind().dialect.name != "postgresql":
+            return True
+        return bool(
+            db.session.scalar(
+                text("SELECT pg_try_advisory_xact_lock(:namespace, :branch_id)"),
+                {"namespace": _WRITER_LOCK_NAMESPACE, "branch_id": branch_id},
+            )
+        )
+
+    @staticmethod
+    def _ticket(entry: CheckoutQueueEntry) -> CheckoutQueueTicketResponse:
+        position = None
+        if entry.status == CheckoutQueueStatus.QUEUED:
+            position = db.session.scalar(
+                select(func.count())
+                .select_from(CheckoutQueueEntry)
+                .where(
+                    CheckoutQueueEntry.branch_id == entry.branch_id,
+                    CheckoutQueueEntry.status == CheckoutQueueStatus.QUEUED,
+                    CheckoutQueueEntry.id <= entry.id,
+                )
+            )
+        failed = entry.status == CheckoutQueueStatus.FAILED
+        return CheckoutQueueTicketResponse(
+            ticket_id=entry.id,
+            status=entry.status,
+            status_url=url_for("checkout.confirm_status", ticket_id=entry.id),
+            position=position,
+            result=CheckoutConfirmResponse.model_validate(entry.response_payload)
+            if entry.status == CheckoutQueueStatus.DONE
+            else None,
+            error=entry.response_payload if failed else None,
+        )
@@ -8,12 +8,14 @@ from flask import current_app
 
 from app.extensions import db
 from app.middleware.error_handler import DomainError
-from app.models.enums import FulfillmentType
+from app.models.enums import FulfillmentType, OrderStatus
 from app.schemas.checkout import (
     CheckoutConfirmRequest,
     CheckoutConfirmResponse,
     CheckoutPreviewRequest,
     CheckoutPreviewResponse,
+    CheckoutReservationResponse,
+    CheckoutReserveRequest,
 )
 from app.models.payment_token import PaymentToken
 from app.services.audit_service import AuditService
@@ -23,34 +25,114 @@ from app.services.checkout import (
     CheckoutIdempotencyManager,
     CheckoutInventoryManager,
     CheckoutOrderBuilder,
+    CheckoutPaymentOutbox,
     CheckoutPricing,
+    CheckoutReservationManager,
 )
-from app.services.payment_service import PaymentService
+from app.services.cache_version_service import INVENTORY, CacheVersionService
+from app.services.catalog.featured import FeaturedSnapshotService
+from app.services.settings_service import SettingsService
+from app.services.stock_cache import StockCache
+from app.utils.ttl_cache import TTLCache
+
+
+INSUFFICIENT_STOCK = "INSUFFICIENT_STOCK"
 
 
 class CheckoutService:
+    _previews = TTLCache(maxsize=2048)
+
     @staticmethod
     def preview(payload: CheckoutPreviewRequest) -> CheckoutPreviewResponse:
         branch_id = CheckoutBranchValidator.resolve_branch(payload.fulfillment_type, payload.branch_id)
         cart = CheckoutCartLoader.load(payload.cart_id)
+        # The cart's lines act as its version: any edit changes the key, as does an inventory write
+        # committed by any worker or a settings change. The delivery slot and address do not affect the preview, so
+        # re-previewing after picking a slot is a hit.
+        cache_key = (
+            cart.id,
+            branch_id,
+            payload.fulfillment_type,
+            CacheVersionService.current_striped(INVENTORY),
+            SettingsService.snapshot().version,
+            tuple(sorted((item.product_id, item.quantity, str(item.unit_price)) for item in cart.items)),
+        )
+        cached = CheckoutService._previews.get(cache_key)
+        if cached is not None:
+            return cached
+
         inventory = CheckoutInventoryManager(branch_id)
-        missing = inventory.missing_items(cart.items)
+        missing = inventory.missing_items(cart.items, CheckoutReservationManager.held(cart.id, branch_id))
         totals = CheckoutPricing.calculate(cart, payload.fulfillment_type)
-        return CheckoutPreviewResponse(
+        result = CheckoutPreviewResponse(
             cart_total=totals.cart_total,
             delivery_fee=totals.delivery_fee if payload.fulfillment_type == FulfillmentType.DELIVERY else None,
             missing_items=missing,
             fulfillment_type=payload.fulfillment_type,
         )
+        ttl = float(current_app.config.get("CHECKOUT_PREVIEW_CACHE_SECONDS", 15))
+        if ttl > 0:
+            CheckoutService._previews.set(cache_key, result, ttl)
+        return result
+
+    @staticmethod
+    def reserve(payload: CheckoutReserveRequest) -> CheckoutReservationResponse:
+        """Start checkout: hold the cart's quantities for CHECKOUT_RESERVATION_TTL_SECONDS."""
+        branch_id = CheckoutBranchValidator.resolve_branch(payload.fulfillment_type, payload.branch_id)
+        cart = CheckoutCartLoader.load(payload.cart_id, for_update=True)
+        expires_at, reserved, missing = CheckoutReservationManager(branch_id).reserve(cart.id, cart.items)
+        CacheVersionService.bump_striped(INVENTORY)
+        db.session.commit()
+        StockCache.invalidate(item.product_id for item in cart.items)
+        return CheckoutReservationResponse(expires_at=expires_at, reserved=reserved, missing_items=missing)
 
     @staticmethod
     def confirm(payload: CheckoutConfirmRequest, idempotency_key: str) -> tuple[CheckoutConfirmResponse, bool]:
+        request_hash = CheckoutService._hash_request(payload)
+        # Retries of a confirm that already succeeded are answered before any lock is taken.
+        replay = CheckoutIdempotencyManager.find_replay(payload.cart_id, idempotency_key, request_hash)
+        if replay is not None:
+            return replay, False
+
+        try:
+            response_payload, is_new, product_ids = CheckoutService.place_order(
+                payload, idempotency_key, request_hash
+            )
+            if is_new:
+                db.session.commit()
+        except DomainError as exc:
+            if exc.code == INSUFFICIENT_STOCK:
+                db.session.commit()  # keep the idempotency key marked FAILED
+            else:
+                db.session.rollback()
+            raise
+        except Exception as exc:
+            db.session.rollback()
+            print("CheckoutService.confirm unexpected error:", exc)
+            traceback.print_exc()
+            current_app.logger.exception(
+                "Unexpected error confirming checkout for cart %s",
+                payload.cart_id,
+            )
+            raise
+
+        if is_new:
+            CheckoutService.after_commit(product_ids)
+        return response_payload, is_new  # is_new=True for newly created orders
+
+    @staticmethod
+    def place_order(
+        payload: CheckoutConfirmRequest, idempotency_key: str, request_hash: str
+    ) -> tuple[CheckoutConfirmResponse, bool, list[int]]:
+        """Run confirm up to, but not including, the commit; the caller owns the transaction.
+
+        Returns the response, whether an order was created and the cart's product ids. An
+        INSUFFICIENT_STOCK error leaves the idempotency key marked FAILED for the caller to commit.
+        """
         branch_id = CheckoutBranchValidator.resolve_branch(payload.fulfillment_type, payload.branch_id)
         cart = CheckoutCartLoader.load(payload.cart_id, for_update=True)
         CheckoutBranchValidator.validate_delivery_slot(payload.fulfillment_type, payload.delivery_slot_id, branch_id)
 
-        request_hash = CheckoutService._hash_request(payload)
-        
         # Check or create IN_PROGRESS idempotency record
         idempotency_record, is_new = CheckoutIdempotencyManager.get_or_create_in_progress(
             cart.user_id, idempotency_key, request_hash
@@ -58,65 +140,54 @@ class CheckoutService:
         
         # If not new, return cached response (SUCCEEDED status) with 200 status
         if not is_new:
-            return CheckoutConfirmResponse.model_validate(idempotency_record.response_payload), False
+            return CheckoutConfirmResponse.model_validate(idempotency_record.response_payload), False, []
 
         inventory = CheckoutInventoryManager(branch_id)
-        inv_map = inventory.lock_inventory(cart.items)
-        missing = inventory.missing_items(cart.items, inv_map)
+        savepoint = db.session.begin_nested()
+        uncovered = CheckoutReservationManager(branch_id).convert(cart.id, cart.items)
+        missing = inventory.decrement_inventory(uncovered)
         if missing:
+            savepoint.rollback()
             CheckoutIdempotencyManager.mark_failed(idempotency_record)
-            db.session.commit()
             raise DomainError(
-                "INSUFFICIENT_STOCK",
+                INSUFFICIENT_STOCK,
                 "Insufficient stock for items",
                 status_code=409,
                 details={"missing": [m.model_dump() for m in missing]},
             )
+        savepoint.commit()
 
+        # Phase one ends with the caller's commit: the order is stored as PENDING_PAYMENT with an
+        # outbox entry, so the locks taken above are released without waiting on the payment
+        # provider. CheckoutPaymentOutbox captures the charge afterwards and finalizes or compensates.
         totals = CheckoutPricing.calculate(cart, payload.fulfillment_type)
-        payment_ref: str | None = None
-        response_payload: CheckoutConfirmResponse | None = None
-        order = None
-        try:
-            order = CheckoutOrderBuilder.create_order(cart, payload, branch_id, totals.total_amount)
-            CheckoutOrderBuilder.add_fulfillment_details(order, payload, branch_id)
-            inventory.decrement_inventory(cart.items, inv_map)
-            CheckoutOrderBuilder.audit_creation(order, totals.total_amount)
-            payment_ref = PaymentService.charge(payload.payment_token_id, float(totals.total_amount))
-            CheckoutService._maybe_save_default_payment_token(cart.user_id, payload.payment_token_id, payload.save_as_default)
-
-            response_payload = CheckoutConfirmResponse(
-                order_id=order.id,
-                order_number=order.order_number,
-                total_paid=Decimal(totals.total_amount),
-                payment_reference=payment_ref,
-            )
+        order = CheckoutOrderBuilder.create_order(
+            cart, payload, branch_id, totals.total_amount, status=OrderStatus.PENDING_PAYMENT
+        )
+        CheckoutOrderBuilder.add_fulfillment_details(order, payload, branch_id)
+        CheckoutOrderBuilder.audit_creation(order, totals.total_amount)
+        CheckoutPaymentOutbox.enqueue(order, payload.payment_token_id, totals.total_amount)
+        CheckoutService._maybe_save_default_payment_token(cart.user_id, payload.payment_token_id, payload.save_as_default)
 
-            # Mark idempotency as succeeded
-            CheckoutIdempotencyManager.mark_succeeded(idempotency_record, response_payload, order.id)
+        response_payload = CheckoutConfirmResponse(
+            order_id=order.id,
+            order_number=order.order_number,
+            total_paid=Decimal(totals.total_amount),
+            payment_reference=None,
+            status=order.status,
+        )
 
-            db.session.commit()
-        except DomainError:
-            db.session.rollback()
-            raise
-        except Exception as exc:
-            db.session.rollback()
-            if payment_ref:
-                AuditService.log_event(
-                    entity_type="payment",
-                    action="PAYMENT_CAPTURED_NOT_COMMITTED",
-                    entity_id=cart.id,
-                    context={"reference": payment_ref, "cart_id": str(cart.id)},
-                )
-            print("CheckoutService.confirm unexpected error:", exc)
-            traceback.print_exc()
-            current_app.logger.exception(
-                "Unexpected error confirming checkout for cart %s",
-                cart.id,
-            )
-            raise
+        # Mark idempotency as succeeded
+        CheckoutIdempotencyManager.mark_succeeded(idempotency_record, response_payload, order.id)
+        CacheVersionService.bump_striped(INVENTORY)
+        return response_payload, True, [item.product_id for item in cart.items]
 
-        return response_payload, True  # is_new=True for newly created orders
+    @staticmethod
+    def after_commit(product_ids) -> None:
+        """Refresh read caches once placed orders are committed."""
+        product_ids = list(product_ids)
+        StockCache.invalidate(product_ids)
+        FeaturedSnapshotService.touch(product_ids)
 
     @staticmethod
     def _hash_request(payload: CheckoutConfirmRequest) -> str:
@@ -3,6 +3,10 @@ from flask import request ,jsonify
 
 from app.extensions import db
 from app.models.inventory import Inventory
+from app.services.cache_version_service import INVENTORY, CacheVersionService
+from app.services.catalog.featured import FeaturedSnapshotService
+from app.services.inventory_shards import InventoryShardService
+from app.services.stock_cache import StockCache
 from app.utils.responses import error_envelope, success_envelope
 
 
@@ -40,6 +44,8 @@ def handle_bulk_inventory_upload():
         if inv:
             inv.available_quantity = available_quantity
             inv.reserved_quantity = reserved_quantity
+            if inv.shard_count:
+                InventoryShardService.spread(inv)
             action = "updated"
         else:
             inv = Inventory(
@@ -53,7 +59,11 @@ def handle_bulk_inventory_upload():
         success_count += 1
         processed.append({"row_number": idx, "product_id": str(product_id), "branch_id": str(branch_id), "status": "success", "action": action})
 
+    CacheVersionService.bump_striped(INVENTORY)
     db.session.commit()
+    touched = [int(item["product_id"]) for item in processed if item["status"] == "success"]
+    StockCache.invalidate(touched)
+    FeaturedSnapshotService.touch(touched)
     summary = {
         "total": len(processed),
         "success": success_count,
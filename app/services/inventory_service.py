@@ -6,6 +6,7 @@ from sqlalchemy.orm import selectinload
 from ..extensions import db
 from ..middleware.error_handler import DomainError
 from ..models import Branch, Inventory, Product
+from ..schemas.common import CursorPagination
 from ..schemas.branches import (
     InventoryCreateRequest,
     InventoryListResponse,
@@ -13,6 +14,11 @@ from ..schemas.branches import (
     InventoryUpdateRequest,
 )
 from .audit_service import AuditService
+from .cache_version_service import INVENTORY, CacheVersionService
+from .catalog.featured import FeaturedSnapshotService
+from .inventory_shards import InventoryShardService
+from .stock_cache import StockCache
+from .shared_queries import SharedOperations
 
 
 class InventoryService:
@@ -23,13 +29,7 @@ class InventoryService:
         limit: int,
         offset: int,
     ) -> InventoryListResponse:
-        stmt = select(Inventory).options(
-            selectinload(Inventory.branch), selectinload(Inventory.product)
-        )
-        if branch_id:
-            stmt = stmt.where(Inventory.branch_id == branch_id)
-        if product_id:
-            stmt = stmt.where(Inventory.product_id == product_id)
+        stmt = InventoryService._filtered(branch_id, product_id)
         total = db.session.scalar(select(func.count()).select_from(stmt.subquery()))
         items = db.session.execute(stmt.offset(offset).limit(limit)).scalars().all()
         responses = [
@@ -54,6 +54,53 @@ class InventoryService:
             "offset": offset,
         })
 
+    @staticmethod
+    def list_inventory_keyset(
+        branch_id: int | None,
+        product_id: int | None,
+        limit: int,
+        cursor: str | None,
+    ) -> InventoryListResponse:
+        rows, next_cursor = SharedOperations.paginate_keyset(
+            base_query=InventoryService._filtered(branch_id, product_id),
+            sort_column=Inventory.id,
+            id_column=Inventory.id,
+            limit=limit,
+            cursor=cursor,
+            descending=False,
+        )
+        responses = [
+            InventoryResponse(
+                id=item.id,
+                branch_id=item.branch_id,
+                branch_name=item.branch.name,
+                product_id=item.product_id,
+                product_name=item.product.name,
+                product_sku=item.product.sku,
+                available_quantity=item.available_quantity,
+                reserved_quantity=item.reserved_quantity,
+                limit=limit,
+                offset=0,
+                total=0,
+            )
+            for item in rows
+        ]
+        return InventoryListResponse(
+            items=responses,
+            pagination=CursorPagination(limit=limit, next_cursor=next_cursor),
+        )
+
+    @staticmethod
+    def _filtered(branch_id: int | None, product_id: int | None):
+        stmt = select(Inventory).options(
+            selectinload(Inventory.branch), selectinload(Inventory.product)
+        )
+        if branch_id:
+            stmt = stmt.where(Inventory.branch_id == branch_id)
+        if product_id:
+            stmt = stmt.where(Inventory.product_id == product_id)
+        return stmt
+
     @staticmethod
     def update_inventory(item_id: int, payload: InventoryUpdateRequest) -> InventoryResponse:
         inventory = db.session.get(Inventory, item_id)
@@ -66,7 +113,12 @@ class InventoryService:
         inventory.available_quantity = payload.available_quantity
         inventory.reserved_quantity = payload.reserved_quantity
         db.session.add(inventory)
+        if inventory.shard_count:
+            InventoryShardService.spread(inventory)
+        CacheVersionService.bump_striped(INVENTORY)
         db.session.commit()
+        StockCache.invalidate([inventory.product_id])
+        FeaturedSnapshotService.touch([inventory.product_id])
         AuditService.log_event(
             entity_type="inventory",
             action="UPDATE",
@@ -120,7 +172,10 @@ class InventoryService:
             reserved_quantity=payload.reserved_quantity,
         )
         db.session.add(inventory)
+        CacheVersionService.bump_striped(INVENTORY)
         db.session.commit()
+        StockCache.invalidate([inventory.product_id])
+        FeaturedSnapshotService.touch([inventory.product_id])
         AuditService.log_event(
             entity_type="inventory",
             action="CREATE",
@@ -0,0 +1,180 @@
+"""Sharded stock for hot inventory rows.
+
+A row with ``shard_count > 0`` keeps its sellable stock in ``inventory_shards`` so concurrent
+checkouts of the same SKU lock different rows. ``Inventory.available_quantity`` becomes a mirror
+of the shard sum, refreshed by ``sync_mirrors`` and so up to a sweep behind. Only display paths
+(admin inventory listings) read the mirror; every stock decision uses ``sellable_quantity()``.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy import case, func, select, update
+
+from app.extensions import db
+from app.middleware.error_handler import DomainError
+from app.models import Inventory, InventoryShard
+from app.schemas.branches import InventoryShardsResponse
+from app.services.audit_service import AuditService
+
+
+def _shard_sum():
+    return (
+        select(func.coalesce(func.sum(InventoryShard.quantity), 0))
+        .where(InventoryShard.inventory_id == Inventory.id)
+        .scalar_subquery()
+    )
+
+
+def sellable_quantity():
+    """SQL expression for an inventory row's available stock, summing shards when sharded."""
+    return case((Inventory.shard_count > 0, _shard_sum()), else_=Inventory.available_quantity)
+
+
+class InventoryShardService:
+    @staticmethod
+    def configure(inventory_id: int, shard_count: int) -> InventoryShardsResponse:
+        """Split a row's stock over ``shard_count`` shards; 0 folds it back into the row."""
+        inventory = InventoryShardService._lock(inventory_id)
+        old_count = inventory.shard_count
+        InventoryShardService.absorb(inventory)
+        inventory.shard_count = shard_count
+        InventoryShardService.spread(inventory)
+        AuditService.log_event(
+            entity_type="inventory",
+            action="SHARD",
+            entity_id=inventory.id,
+            old_value={"shard_count": old_count},
+            new_value={"shard_count": shard_count},
+        )
+        db.session.commit()
+        return InventoryShardService.describe(inventory_id)
+
+    @staticmethod
+    def rebalance(inventory_id: int) -> InventoryShardsResponse:
+        """Even out the shards of one row, e.g. after checkouts drained some of them."""
+        inventory = InventoryShardService._lock(inventory_id)
+        InventoryShardService.absorb(inventory)
+        InventoryShardService.spread(inventory)
+        db.session.commit()
+        return InventoryShardService.describe(inventory_id)
+
+    @staticmethod
+    def describe(inventory_id: int) -> InventoryShardsResponse:
+        inventory = db.session.get(Inventory, inventory_id, populate_existing=True)
+        if not inventory:
+            raise DomainError("NOT_FOUND", "Inventory not found", status_code=404)
+        shards = db.session.execute(
+            select(InventoryShard.quantity)
+            .where(InventoryShard.inventory_id == inventory_id)
+            .order_by(InventoryShard.shard_no)
+        ).scalars().all()
+        return InventoryShardsResponse(
+            inventory_id=inventory.id,
+            shard_count=inventory.shard_count,
+            available_quantity=sum(shards) if inventory.shard_count else inventory.available_quantity,
+            shards=list(shards),
+        )
+
+    @staticmethod
+    def absorb(inventory: Inventory) -> None:
+        """Lock the row's shards and make ``available_quantity`` their exact sum.
+
+        Call on a locked row before a relative change (e.g. +N) so it starts from the true total.
+        """
+        if inventory.shard_count:
+            shards = InventoryShardService._locked_shards(inventory.id)
+            inventory.available_quantity = sum(shard.quantity for shard in shards)
+
+    @staticmethod
+    def spread(inventory: Inventory) -> None:
+        """Distribute ``available_quantity`` evenly over ``shard_count`` shards (in place)."""
+        shards = InventoryShardService._locked_shards(inventory.id)
+        count = inventory.shard_count
+        if not count and not shards:
+            return
+        total = max(inventory.available_quantity, 0)
+        by_number = {shard.shard_no: shard for shard in shards}
+        for shard_no in range(count):
+            quantity = total // count + (1 if shard_no < total % count else 0)
+            shard = by_number.pop(shard_no, None)
+            if shard is None:
+                db.session.add(InventoryShard(inventory_id=inventory.id, shard_no=shard_no, quantity=quantity))
+            else:
+                shard.quantity = quantity
+        for shard in by_number.values():
+            db.session.delete(shard)
+        db.session.flush()
+
+    @staticmethod
+    def take(inventory_id: int, quantity: int) -> bool:
+        """Decrement ``quantity`` from a sharded row; False (nothing taken) if it lacks stock.
+
+        Tries one random shard that covers the whole quantity, skipping shards other checkouts
+        hold. Only when none does are all shards locked in order and drained greedily.
+        """
+        candidates = select(InventoryShard).where(
+            InventoryShard.inventory_id == inventory_id, InventoryShard.quantity >= quantity
+        )
+        shard = db.session.execute(
+            candidates.order_by(func.random()).limit(1).with_for_update(skip_locked=True)
+        ).scalar_one_or_none()
+        if shard is not None:
+            shard.quantity -= quantity
+            db.session.flush()
+            return True
+
+        shards = InventoryShardService._locked_shards(inventory_id)
+        if sum(shard.quantity for shard in shards) < quantity:
+            return False
+        remaining = quantity
+        for shard in shards:
+            step = min(shard.quantity, remaining)
+            shard.quantity -= step
+            remaining -= step
+            if not remaining:
+                break
+        db.session.flush()
+        return True
+
+    @staticmethod
+    def give(inventory_id: int, quantity: int) -> None:
+        """Return ``quantity`` to a sharded row, topping up its emptiest shard that is not locked."""
+        shard = db.session.execute(
+            select(InventoryShard)
+            .where(InventoryShard.inventory_id == inventory_id)
+            .order_by(InventoryShard.quantity, InventoryShard.shard_no)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        ).scalar_one_or_none()
+        if shard is None:
+            shard = InventoryShardService._locked_shards(inventory_id)[0]
+        shard.quantity += quantity
+        db.session.flush()
+
+    @staticmethod
+    def sync_mirrors() -> None:
+        """Copy each sharded row's shard sum into its ``available_quantity`` mirror."""
+        shard_sum = _shard_sum()
+        db.session.execute(
+            update(Inventory)
+            .where(Inventory.shard_count > 0, Inventory.available_quantity != shard_sum)
+            .values(available_quantity=shard_sum)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+    @staticmethod
+    def _lock(inventory_id: int) -> Inventory:
+        inventory = db.session.get(Inventory, inventory_id, with_for_update=True)
+        if not inventory:
+            raise DomainError("NOT_FOUND", "Inventory not found", status_code=404)
+        return inventory
+
+    @staticmethod
+    def _locked_shards(inventory_id: int) -> list[InventoryShard]:
+        return db.session.execute(
+            select(InventoryShard)
+            .where(InventoryShard.inventory_id == inventory_id)
+            .order_by(InventoryShard.shard_no)
+            .with_for_update()
+        ).scalars().all()
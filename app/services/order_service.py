@@ -12,6 +12,7 @@ from app.models import Order
 from app.models.enums import OrderStatus
 from app.schemas.orders import CancelOrderResponse, OrderItemResponse, OrderResponse
 from app.services.audit_service import AuditService
+from app.services.shared_queries import SharedOperations
 
 class OrderService:
     @staticmethod
@@ -30,6 +31,18 @@ class OrderService:
         )
         return [OrderService._to_response(order) for order in orders], total or 0
 
+    @staticmethod
+    def list_orders_keyset(user_id: int, limit: int, cursor: str | None) -> tuple[list[OrderResponse], str | None]:
+        stmt = select(Order).where(Order.user_id == user_id).options(selectinload(Order.items))
+        return SharedOperations.paginate_keyset(
+            base_query=stmt,
+            sort_column=Order.created_at,
+            id_column=Order.id,
+            limit=limit,
+            cursor=cursor,
+            transform_fn=OrderService._to_response,
+        )
+
     @staticmethod
     def get_order(order_id: int, user_id: int) -> OrderResponse:
         order = OrderService._load_order(order_id)
@@ -2,14 +2,19 @@
 
 from __future__ import annotations
 
+from hashlib import sha256
 from secrets import token_hex
 from app.extensions import db
 from app.middleware.error_handler import DomainError
 from app.models.payment_token import PaymentToken
 
 class PaymentService:
+    # Stands in for the provider's record of captures made under an idempotency key.
+    _captures: dict[str, str] = {}
+
     @staticmethod
-    def charge(payment_token_id: int, amount: float) -> str:
+    def charge(payment_token_id: int, amount: float, idempotency_key: str | None = None) -> str:
+        """Capture ``amount``; a repeated ``idempotency_key`` returns the original capture."""
         token = db.session.get(PaymentToken, payment_token_id)
 
         if not token:
@@ -34,4 +39,14 @@ class PaymentService:
             )
 
         # Only return mock reference if all validations pass
-        return  f"MOCKPAY-{token.id}-{token_hex(4).upper()}"
+        if idempotency_key is None:
+            return f"MOCKPAY-{token.id}-{token_hex(4).upper()}"
+        return PaymentService._captures.setdefault(
+            idempotency_key,
+            f"MOCKPAY-{token.id}-{sha256(idempotency_key.encode()).hexdigest()[:8].upper()}",
+        )
+
+    @staticmethod
+    def find_charge(idempotency_key: str) -> str | None:
+        """Reference of a capture made under ``idempotency_key``, or None if the provider has none."""
+        return PaymentService._captures.get(idempotency_key)
@@ -0,0 +1,128 @@
+"""Global settings access with a per-worker immutable snapshot."""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+
+from flask import current_app
+
+from app.extensions import db
+from app.models import GlobalSettings
+from app.services.audit_service import AuditService
+from app.services.cache_version_service import SETTINGS, CacheVersionService
+
+_EDITABLE_FIELDS = ("delivery_min", "delivery_fee", "free_threshold")
+
+
+@dataclass(frozen=True)
+class SettingsSnapshot:
+    """Detached copy of the GlobalSettings row, stamped with the ``settings`` cache version."""
+
+    version: int
+    delivery_min: Decimal
+    delivery_fee: Decimal
+    free_threshold: Decimal
+
+    @property
+    def free_delivery_from(self) -> Decimal:
+        """Cart total from which delivery is free: ``delivery_min`` or ``free_threshold``, whichever is lower."""
+        return min(self.delivery_min, self.free_threshold)
+
+    def delivery_fee_for(self, cart_total: Decimal) -> Decimal:
+        """Delivery is free from ``free_delivery_from`` up; below it ``delivery_fee`` applies."""
+        return Decimal("0") if cart_total >= self.free_delivery_from else self.delivery_fee
+
+    def to_public_dict(self) -> dict:
+        return {
+            "delivery_min": float(self.delivery_min),
+            "delivery_fee": float(self.delivery_fee),
+            "free_threshold": float(self.free_threshold),
+        }
+
+
+class SettingsService:
+    _snapshot: SettingsSnapshot | None = None
+    _checked_at: float = 0.0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def snapshot() -> SettingsSnapshot:
+        """Return the cached settings; no query unless SETTINGS_CACHE_CHECK_SECONDS have passed.
+
+        Updates in this worker drop the snapshot at once; other workers reload it when they next
+        see a bumped ``settings`` version.
+        """
+        with SettingsService._lock:
+            cached, checked_at = SettingsService._snapshot, SettingsService._checked_at
+        interval = float(current_app.config.get("SETTINGS_CACHE_CHECK_SECONDS", 30))
+        if cached is not None and time.monotonic() - checked_at < interval:
+            return cached
+        version = CacheVersionService.current(SETTINGS)
+        if cached is None or cached.version != version:
+            cached = SettingsService._load(version)
+        with SettingsService._lock:
+            SettingsService._snapshot = cached
+            SettingsService._checked_at = time.monotonic()
+        return cached
+
+    @staticmethod
+    def invalidate() -> None:
+        with SettingsService._lock:
+            SettingsService._snapshot = None
+
+    @staticmethod
+    def get_or_create() -> GlobalSettings:
+        """Get existing settings or create default settings."""
+        settings = db.session.query(GlobalSettings).order_by(GlobalSettings.id).first()
+        if not settings:
+            settings = GlobalSettings(
+                delivery_min=150.0,
+                delivery_fee=30.0,
+                free_threshold=200.0,
+            )
+            db.session.add(settings)
+            db.session.commit()
+        return settings
+
+    @staticmethod
+    def update(data: dict, user_id: int) -> dict:
+        settings = SettingsService.get_or_create()
+        old_values = settings.to_dict()
+        for name in _EDITABLE_FIELDS:
+            if name in data:
+                setattr(settings, name, float(data[name]))
+        settings.updated_by = user_id
+        db.session.flush()
+        CacheVersionService.bump(SETTINGS)
+        AuditService.log_event(
+            entity_type="global_settings",
+            action="UPDATE",
+            actor_user_id=user_id,
+            entity_id=settings.id,
+            old_value=old_values,
+            new_value=settings.to_dict(),
+        )
+        db.session.commit()
+        SettingsService.invalidate()
+        return settings.to_dict()
+
+    @staticmethod
+    def _load(version: int) -> SettingsSnapshot:
+        # Without a settings row yet, fall back to the deployment's configured delivery rule.
+        row = db.session.query(GlobalSettings).order_by(GlobalSettings.id).first()
+        if row is None:
+            return SettingsSnapshot(
+                version=version,
+                delivery_min=Decimal(str(current_app.config.get("DELIVERY_MIN_TOTAL", 150))),
+                delivery_fee=Decimal(str(current_app.config.get("DELIVERY_FEE_UNDER_MIN", 30))),
+                free_threshold=Decimal(str(current_app.config.get("DELIVERY_FREE_THRESHOLD", 200))),
+            )
+        return SettingsSnapshot(
+            version=version,
+            delivery_min=Decimal(str(row.delivery_min)),
+            delivery_fee=Decimal(str(row.delivery_fee)),
+            free_threshold=Decimal(str(row.free_threshold)),
+        )
@@ -1,13 +1,44 @@
 """Shared database queries and operations that can be reused across services."""
 
 from __future__ import annotations
-from sqlalchemy import select, func
+import base64
+import binascii
+import json
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import select, func, tuple_
 from sqlalchemy.exc import IntegrityError
 from app.extensions import db
 from app.middleware.error_handler import DomainError
 from app.models import User, Address
 from app.schemas.profile import UserProfileResponse
 
+def encode_cursor(sort_value, row_id: int) -> str:
+    """Encode a keyset position as an opaque URL-safe token."""
+    if isinstance(sort_value, datetime):
+        value = {"dt": sort_value.isoformat()}
+    elif isinstance(sort_value, Decimal):
+        value = {"dec": str(sort_value)}
+    else:
+        value = sort_value
+    raw = json.dumps([value, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[object, int]:
+    """Decode a token produced by ``encode_cursor``."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if isinstance(value, dict) and "dt" in value:
+            value = datetime.fromisoformat(value["dt"])
+        elif isinstance(value, dict) and "dec" in value:
+            value = Decimal(value["dec"])
+        return value, int(row_id)
+    except (ValueError, TypeError, binascii.Error, UnicodeError):
+        raise DomainError("BAD_REQUEST", "Invalid pagination cursor", status_code=400)
+
+
 class SharedQueries:
     """Common database queries used across multiple services."""
 
@@ -95,6 +126,59 @@ class SharedOperations:
         
         return rows, total or 0
 
+    @staticmethod
+    def estimate_count(base_query) -> int | None:
+        """Planner row estimate for ``base_query`` on Postgres; None on other dialects."""
+        bind = db.session.get_bind()
+        if bind.dialect.name != "postgresql":
+            return None
+        compiled = base_query.compile(dialect=bind.dialect, compile_kwargs={"render_postcompile": True})
+        plan = db.session.connection().exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    @staticmethod
+    def paginate_keyset(
+        base_query,
+        sort_column,
+        id_column,
+        limit: int = 50,
+        cursor: str | None = None,
+        descending: bool = True,
+        transform_fn=None,
+    ) -> tuple[list, str | None]:
+        """Seek past ``cursor`` on (sort_column, id_column) instead of OFFSET; no COUNT is run.
+
+        ``base_query`` must select a single entity and carry no ORDER BY.
+        An empty or missing cursor returns the first page.
+        """
+        stmt = base_query.add_columns(sort_column.label("_sort_key"))
+        if cursor:
+            value, row_id = decode_cursor(cursor)
+            if sort_column is id_column:
+                key, bound = id_column, row_id
+            else:
+                key, bound = tuple_(sort_column, id_column), tuple_(value, row_id)
+            stmt = stmt.where(key < bound if descending else key > bound)
+        if descending:
+            stmt = stmt.order_by(sort_column.desc(), id_column.desc())
+        else:
+            stmt = stmt.order_by(sort_column.asc(), id_column.asc())
+        rows = db.session.execute(stmt.limit(limit + 1)).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_entity, last_key = rows[-1][0], rows[-1][-1]
+            next_cursor = encode_cursor(last_key, getattr(last_entity, id_column.key))
+        items = [row[0] for row in rows]
+        if transform_fn:
+            items = [transform_fn(item) for item in items]
+        return items, next_cursor
+
     @staticmethod
     def build_filtered_query(base_query, conditions: dict):
         for check_fn, where_clause in conditions.values():
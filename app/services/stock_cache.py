@@ -0,0 +1,73 @@
+"""Per-worker cache of inventory availability for reads that tolerate brief staleness."""
+
+from __future__ import annotations
+
+import threading
+from types import MappingProxyType
+from typing import Iterable, Mapping
+
+from flask import current_app
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import Inventory
+from app.services.inventory_shards import sellable_quantity
+from app.utils.ttl_cache import TTLCache
+
+
+class StockCache:
+    """Available quantity per branch, keyed by product.
+
+    Inventory writers call ``invalidate`` after committing. Other workers see a write once their
+    entry expires (STOCK_CACHE_SECONDS). Checkout confirmation never reads from here; it locks the
+    inventory rows themselves.
+    """
+
+    _entries = TTLCache(maxsize=20000)
+    _lock = threading.Lock()
+    _generation = 0
+
+    @staticmethod
+    def by_branch(product_ids: Iterable[int]) -> dict[int, Mapping[int, int]]:
+        """Map each product to {branch_id: available_quantity}; misses are loaded in one query."""
+        ids = list(dict.fromkeys(product_ids))
+        ttl = float(current_app.config.get("STOCK_CACHE_SECONDS", 10))
+        found: dict[int, Mapping[int, int]] = {}
+        missing: list[int] = []
+        for product_id in ids:
+            entry = StockCache._entries.get(product_id) if ttl > 0 else None
+            if entry is None:
+                missing.append(product_id)
+            else:
+                found[product_id] = entry
+        if not missing:
+            return found
+
+        generation = StockCache._generation
+        loaded: dict[int, dict[int, int]] = {product_id: {} for product_id in missing}
+        rows = db.session.execute(
+            select(Inventory.product_id, Inventory.branch_id, sellable_quantity())
+            .where(Inventory.product_id.in_(missing))
+        )
+        for product_id, branch_id, quantity in rows:
+            loaded[product_id][branch_id] = quantity or 0
+        with StockCache._lock:
+            # Skip storing if a write was invalidated while we were reading.
+            store = ttl > 0 and generation == StockCache._generation
+            for product_id, breakdown in loaded.items():
+                entry = MappingProxyType(breakdown)
+                found[product_id] = entry
+                if store:
+                    StockCache._entries.set(product_id, entry, ttl)
+        return found
+
+    @staticmethod
+    def invalidate(product_ids: Iterable[int] | None = None) -> None:
+        """Drop cached stock for ``product_ids``; ``None`` drops everything."""
+        with StockCache._lock:
+            StockCache._generation += 1
+            if product_ids is None:
+                StockCache._entries.clear()
+                return
+            for product_id in product_ids:
+                StockCache._entries.pop(product_id)
@@ -5,6 +5,7 @@ from app.middleware.error_handler import DomainError
 from app.models import Inventory
 from app.models.enums import StockRequestType
 from app.services.audit_service import AuditService
+from app.services.inventory_shards import InventoryShardService
 
 
 def apply_inventory_change(
@@ -23,6 +24,7 @@ def apply_inventory_change(
     ).scalar_one_or_none()
     if not inventory:
         raise DomainError("NOT_FOUND", "Inventory not found for branch/product", status_code=404)
+    InventoryShardService.absorb(inventory)
     old_value = {
         "available_quantity": inventory.available_quantity,
         "reserved_quantity": inventory.reserved_quantity,
@@ -31,6 +33,8 @@ def apply_inventory_change(
         inventory.available_quantity = approved_quantity
     elif request_type == StockRequestType.ADD_QUANTITY:
         inventory.available_quantity += approved_quantity
+    if inventory.shard_count:
+        InventoryShardService.spread(inventory)
     session.add(inventory)
     AuditService.log_event(
         entity_type="inventory",
@@ -8,6 +8,9 @@ from app.models import StockRequest
 from app.models.enums import StockRequestStatus
 from app.schemas.stock_requests import BulkReviewRequest, StockRequestResponse
 from app.services.audit_service import AuditService
+from app.services.cache_version_service import INVENTORY, CacheVersionService
+from app.services.catalog.featured import FeaturedSnapshotService
+from app.services.stock_cache import StockCache
 from .apply import apply_inventory_change
 from .mappers import to_response
 
@@ -72,7 +75,12 @@ class StockRequestReviewService:
                 raise DomainError("INVALID_REJECTION", "Rejection reason is required", status_code=400)
         stock_request.status = status
         session.add(stock_request)
+        if status == StockRequestStatus.APPROVED:
+            CacheVersionService.bump_striped(INVENTORY)
         session.commit()
+        if status == StockRequestStatus.APPROVED:
+            StockCache.invalidate([stock_request.product_id])
+            FeaturedSnapshotService.touch([stock_request.product_id])
         AuditService.log_event(
             entity_type="stock_request",
             action="REVIEW",
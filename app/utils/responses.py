@@ -46,3 +46,7 @@ def error_envelope(
 def pagination_envelope(total: int, limit: int, offset: int) -> dict[str, int]:
     """Provide consistent pagination metadata."""
     return {"total": total, "limit": limit, "offset": offset}
+
+def cursor_envelope(limit: int, next_cursor: str | None) -> dict[str, object]:
+    """Pagination metadata for keyset (cursor) pages."""
+    return {"limit": limit, "next_cursor": next_cursor, "has_next": next_cursor is not None}
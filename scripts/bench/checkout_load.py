@@ -0,0 +1,325 @@
+# scripts/bench/checkout_load.py
+"""Concurrent checkout confirm load test with contention, deadlock and oversell reporting.
+
+Needs PostgreSQL. Seeds a tagged set of customers, carts, payment tokens and products (a few hot
+SKUs shared by many carts plus a long tail of cold ones) through the scripts/seed helpers, then
+fires one POST /checkout/confirm per cart through the WSGI app from a thread pool. Prints one
+JSON document:
+
+    APP_ENV=development DATABASE_URL=postgresql://... JWT_SECRET_KEY=bench DELIVERY_SOURCE_BRANCH_ID=1 \\
+        python -m scripts.bench.checkout_load --users 400 --concurrency 32 --overlap 0.5
+
+``--overlap`` is the share of each cart's lines drawn from the hot SKUs (0 = no shared rows,
+1 = every line contends). Seeded rows are tagged and left in place; point it at a throwaway
+database. The app's background workers are off for the run; the payment outbox is drained once
+after it.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import secrets
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, func, select, text
+
+from app import create_app
+from app.extensions import db, limiter
+from app.models import Inventory, Order, OrderItem
+from app.models.enums import CartStatus, OrderStatus, Role
+from app.services.checkout import CheckoutPaymentOutbox
+from app.services.inventory_shards import sellable_quantity
+from scripts.bench.utils import quiet_config
+from scripts.seed.seed_carts import _get_or_create_cart, _upsert_item
+from scripts.seed.seed_categories import _ensure_category
+from scripts.seed.seed_inventory import _ensure_inventory
+from scripts.seed.seed_payment_tokens import _ensure_payment_token
+from scripts.seed.seed_products import _ensure_product
+from scripts.seed.seed_users import _ensure_user
+from scripts.seed.utils import commit_or_rollback
+
+# SQLSTATEs counted as contention failures.
+_DEADLOCK = "40P01"
+_SERIALIZATION = "40001"
+_LOCK_NOT_AVAILABLE = "55P03"
+
+
+def _percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return round(ordered[index], 2)
+
+
+def _seed(args, branch_id: int, tag: str) -> tuple[list[tuple[int, int, int]], dict[int, int]]:
+    """Create the run's rows; returns (user_id, cart_id, token_id) per customer and stock per product."""
+    session = db.session
+    rnd = random.Random(args.seed)
+    category = _ensure_category(session, name=f"Bench {tag}", description="checkout load", icon_slug="bench")
+    session.flush()
+    products = [
+        _ensure_product(
+            session,
+            sku=f"BENCH-{tag}-{kind}{i}",
+            name=f"Bench {kind} {i} {tag}",
+            price="5.00",
+            category_id=category.id,
+        )
+        for kind, count in (("HOT", args.hot_skus), ("COLD", args.cold_skus))
+        for i in range(count)
+    ]
+    session.flush()
+    hot, cold = products[: args.hot_skus], products[args.hot_skus:]
+    stock = {}
+    for product in products:
+        quantity = args.hot_stock if product in hot else args.cold_stock
+        _ensure_inventory(
+            session, product_id=product.id, branch_id=branch_id, available_quantity=quantity, reserved_quantity=0
+        )
+        stock[product.id] = quantity
+
+    customers = []
+    for i in range(args.users):
+        user = _ensure_user(
+            session,
+            email=f"bench-{tag}-{i}@example.com",
+            full_name=f"Bench Customer {i}",
+            password_hash="bench",
+            role=Role.CUSTOMER,
+            default_branch_id=branch_id,
+        )
+        session.flush()
+        token = _ensure_payment_token(
+            session,
+            user_id=user.id,
+            provider="mockpay",
+            provider_token=f"tok-{tag}-{i}",
+            is_default=True,
+            brand="visa",
+            last4="4242",
+            exp_month=12,
+            exp_year=2099,
+        )
+        cart = _get_or_create_cart(session, user_id=user.id, status=CartStatus.ACTIVE)
+        chosen: set = set()
+        while len(chosen) < args.lines:
+            pool = hot if hot and rnd.random() < args.overlap else (cold or hot)
+            chosen.add(rnd.choice(pool))
+        for product in chosen:
+            _upsert_item(
+                session, cart_id=cart.id, product_id=product.id, quantity=rnd.randint(1, args.max_qty), unit_price="5.00"
+            )
+        session.flush()
+        customers.append((user.id, cart.id, token.id))
+    commit_or_rollback(session)
+    return customers, stock
+
+
+class _DbProbe:
+    """Engine hooks: time spent in row-locking statements and contention failures by SQLSTATE."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.lock_ms: list[float] = []
+        self.failures = {"deadlock": 0, "serialization": 0, "lock_not_available": 0}
+        self._started = threading.local()
+        self._lock = threading.Lock()
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        self._started.at = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        upper = statement.lstrip().upper()
+        if "FOR UPDATE" in upper or upper.startswith("UPDATE") or upper.startswith("WITH"):
+            elapsed = (time.perf_counter() - self._started.at) * 1000
+            with self._lock:
+                self.lock_ms.append(elapsed)
+
+    def _error(self, context):
+        code = getattr(context.original_exception, "pgcode", None)
+        key = {_DEADLOCK: "deadlock", _SERIALIZATION: "serialization", _LOCK_NOT_AVAILABLE: "lock_not_available"}.get(code)
+        if key:
+            with self._lock:
+                self.failures[key] += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._before)
+        event.listen(self.engine, "after_cursor_execute", self._after)
+        event.listen(self.engine, "handle_error", self._error)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._before)
+        event.remove(self.engine, "after_cursor_execute", self._after)
+        event.remove(self.engine, "handle_error", self._error)
+
+
+def _sample_lock_waiters(app, stop: threading.Event, samples: list[int], interval: float) -> None:
+    """Poll pg_stat_activity for backends currently waiting on a heavyweight lock."""
+    with app.app_context():
+        while not stop.is_set():
+            samples.append(
+                db.session.scalar(
+                    text(
+                        "SELECT count(*) FROM pg_stat_activity "
+                        "WHERE datname = current_database() AND wait_event_type = 'Lock'"
+                    )
+                )
+            )
+            db.session.rollback()
+            stop.wait(interval)
+        db.session.remove()
+
+
+def _drive(app, customers, args, branch_id: int, tag: str) -> tuple[list[float], dict[str, int], float]:
+    with app.app_context():
+        headers = {
+            user_id: {"Authorization": f"Bearer {create_access_token(identity=str(user_id), additional_claims={'role': 'CUSTOMER'})}"}
+            for user_id, _, _ in customers
+        }
+    latencies: list[float] = []
+    outcomes: dict[str, int] = {}
+    guard = threading.Lock()
+
+    def confirm(customer) -> None:
+        user_id, cart_id, token_id = customer
+        client = app.test_client()
+        body = {"cart_id": cart_id, "payment_token_id": token_id, "fulfillment_type": "PICKUP", "branch_id": branch_id}
+        started = time.perf_counter()
+        response = client.post(
+            "/api/v1/checkout/confirm",
+            json=body,
+            headers={**headers[user_id], "Idempotency-Key": f"bench-{tag}-{cart_id}"},
+        )
+        elapsed = (time.perf_counter() - started) * 1000
+        payload = response.get_json(silent=True) or {}
+        code = (payload.get("error") or {}).get("code") if response.status_code >= 400 else None
+        outcome = str(response.status_code) + (f":{code}" if code else "")
+        with guard:
+            latencies.append(elapsed)
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(confirm, customers))
+    return latencies, outcomes, time.perf_counter() - started
+
+
+def _oversell(stock: dict[int, int], branch_id: int) -> dict:
+    """Compare each seeded row's remaining stock with what live orders took from it."""
+    ids = list(stock)
+    remaining = dict(
+        db.session.execute(
+            select(Inventory.product_id, sellable_quantity()).where(
+                Inventory.product_id.in_(ids), Inventory.branch_id == branch_id
+            )
+        ).all()
+    )
+    sold = dict(
+        db.session.execute(
+            select(OrderItem.product_id, func.sum(OrderItem.quantity))
+            .join(Order, Order.id == OrderItem.order_id)
+            .where(OrderItem.product_id.in_(ids), Order.status != OrderStatus.CANCELED)
+            .group_by(OrderItem.product_id)
+        ).all()
+    )
+    negative = [pid for pid, qty in remaining.items() if qty < 0]
+    mismatched = [pid for pid in ids if remaining.get(pid, 0) + int(sold.get(pid, 0)) != stock[pid]]
+    return {
+        "units_sold": int(sum(sold.values())),
+        "negative_stock_rows": len(negative),
+        "ledger_mismatches": len(mismatched),
+        "ok": not negative and not mismatched,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200, help="customers, one cart and one confirm each")
+    parser.add_argument("--concurrency", type=int, default=16, help="confirm calls in flight")
+    parser.add_argument("--hot-skus", type=int, default=5)
+    parser.add_argument("--cold-skus", type=int, default=200)
+    parser.add_argument("--overlap", type=float, default=0.5, help="share of cart lines drawn from the hot SKUs")
+    parser.add_argument("--lines", type=int, default=4, help="distinct products per cart")
+    parser.add_argument("--max-qty", type=int, default=2)
+    parser.add_argument("--hot-stock", type=int, default=100, help="stock per hot SKU; below demand forces 409s")
+    parser.add_argument("--cold-stock", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--sample-interval", type=float, default=0.05, help="seconds between lock-waiter samples")
+    args = parser.parse_args()
+    if args.hot_skus + args.cold_skus < args.lines:
+        parser.error("--lines exceeds the number of seeded products")
+
+    app = create_app(quiet_config())
+    limiter.enabled = False
+    tag = secrets.token_hex(3)
+    with app.app_context():
+        if db.engine.dialect.name != "postgresql":
+            raise SystemExit("checkout_load needs a PostgreSQL DATABASE_URL")
+        branch_id = int(app.config["DELIVERY_SOURCE_BRANCH_ID"])
+        customers, stock = _seed(args, branch_id, tag)
+        engine = db.engine
+
+    stop, waiters = threading.Event(), []
+    sampler = threading.Thread(target=_sample_lock_waiters, args=(app, stop, waiters, args.sample_interval))
+    with _DbProbe(engine) as probe:
+        sampler.start()
+        try:
+            latencies, outcomes, elapsed = _drive(app, customers, args, branch_id, tag)
+        finally:
+            stop.set()
+            sampler.join()
+        lock_ms = list(probe.lock_ms)
+        failures = dict(probe.failures)
+
+    with app.app_context():
+        drained = 0
+        while True:
+            batch = CheckoutPaymentOutbox.drain(500)
+            drained += batch
+            if batch < 500:
+                break
+        oversell = _oversell(stock, branch_id)
+
+    created = sum(count for outcome, count in outcomes.items() if outcome == "201")
+    print(
+        json.dumps(
+            {
+                "run": tag,
+                "params": vars(args),
+                "requests": len(latencies),
+                "seconds": round(elapsed, 3),
+                "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+                "orders_per_second": round(created / elapsed, 1) if elapsed else None,
+                "latency_ms": {
+                    "p50": _percentile(latencies, 50),
+                    "p95": _percentile(latencies, 95),
+                    "p99": _percentile(latencies, 99),
+                    "mean": round(statistics.fmean(latencies), 2) if latencies else None,
+                },
+                "outcomes": outcomes,
+                "lock_wait": {
+                    "locking_statements": len(lock_ms),
+                    "total_ms": round(sum(lock_ms), 1),
+                    "p95_ms": _percentile(lock_ms, 95),
+                    "max_waiters": max(waiters, default=0),
+                    "mean_waiters": round(statistics.fmean(waiters), 2) if waiters else 0,
+                },
+                "contention_failures": failures,
+                "payments_drained": drained,
+                "oversell": oversell,
+            },
+            sort_keys=True,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# scripts/bench/hot_sku.py
+"""Hot-SKU checkout decrement throughput by shard count.
+
+Needs PostgreSQL (SKIP LOCKED). Creates a throwaway product and inventory row at the delivery
+branch, hammers it from concurrent workers and prints one JSON line per shard count:
+
+    DATABASE_URL=postgresql://... python -m scripts.bench.hot_sku --workers 32 --seconds 10
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import secrets
+import threading
+import time
+from types import SimpleNamespace
+
+from app import create_app
+from app.extensions import db
+from app.models import Category, Inventory, Product
+from app.services.checkout import CheckoutInventoryManager
+from app.services.inventory_shards import InventoryShardService
+from scripts.bench.utils import quiet_config
+
+
+def _setup(branch_id: int, stock: int) -> tuple[int, int, int]:
+    tag = secrets.token_hex(4)
+    category = Category(name=f"bench-{tag}", description="hot sku benchmark")
+    db.session.add(category)
+    db.session.flush()
+    product = Product(name=f"Bench Hot SKU {tag}", sku=f"BENCH-{tag}", price="1.00", category_id=category.id)
+    db.session.add(product)
+    db.session.flush()
+    inventory = Inventory(product_id=product.id, branch_id=branch_id, available_quantity=stock, reserved_quantity=0)
+    db.session.add(inventory)
+    db.session.commit()
+    return category.id, product.id, inventory.id
+
+
+def _run(app, branch_id: int, product_id: int, workers: int, seconds: float) -> dict:
+    line = [SimpleNamespace(product_id=product_id, quantity=1)]
+    done = [0] * workers
+    failed = [0] * workers
+    deadline = time.monotonic() + seconds
+
+    def worker(index: int) -> None:
+        with app.app_context():
+            manager = CheckoutInventoryManager(branch_id)
+            while time.monotonic() < deadline:
+                if manager.decrement_inventory(line):
+                    failed[index] += 1
+                    db.session.rollback()
+                else:
+                    db.session.commit()
+                    done[index] += 1
+            db.session.remove()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    return {"decrements": sum(done), "short": sum(failed), "seconds": round(elapsed, 3),
+            "per_second": round(sum(done) / elapsed, 1)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--shards", default="0,1,4,16", help="comma-separated shard counts (0 = unsharded)")
+    parser.add_argument("--stock", type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    app = create_app(quiet_config())
+    with app.app_context():
+        branch_id = int(app.config["DELIVERY_SOURCE_BRANCH_ID"])
+        category_id, product_id, inventory_id = _setup(branch_id, args.stock)
+        try:
+            for shard_count in (int(value) for value in args.shards.split(",")):
+                InventoryShardService.configure(inventory_id, shard_count)
+                result = _run(app, branch_id, product_id, args.workers, args.seconds)
+                print(json.dumps({"shards": shard_count, "workers": args.workers, **result}))
+        finally:
+            InventoryShardService.configure(inventory_id, 0)
+            db.session.execute(db.delete(Inventory).where(Inventory.id == inventory_id))
+            db.session.execute(db.delete(Product).where(Product.id == product_id))
+            db.session.execute(db.delete(Category).where(Category.id == category_id))
+            db.session.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+# scripts/bench/utils.py
+from __future__ import annotations
+
+from app.config import AppConfig
+
+
+def quiet_config(**overrides) -> AppConfig:
+    """AppConfig with every background worker off, so only the benchmark touches the database.
+
+    The featured refresher, reservation sweeper, payment outbox worker and checkout queue would
+    otherwise lock and write the rows being measured from inside the same process.
+    """
+    return AppConfig(
+        **{
+            "FEATURED_REFRESH_SECONDS": 0,
+            "CHECKOUT_RESERVATION_SWEEP_SECONDS": 0,
+            "CHECKOUT_PAYMENT_DRAIN_SECONDS": 0,
+            "CHECKOUT_QUEUE_ENABLED": False,
+            **overrides,
+        }
+    )
@@ -22,3 +22,53 @@ def test_admin_settings_get(test_app, auth_header, create_user_with_role):
             headers=auth_header(employee),
         )
         assert response.status_code == 403
+
+
+def test_settings_update_reprices_delivery_from_cached_snapshot(test_app, auth_header, create_user_with_role, count_statements):
+    """Pricing reads a cached snapshot with no queries; an update is visible immediately."""
+    from decimal import Decimal
+
+    from app.services.settings_service import SettingsService
+
+    admin = create_user_with_role(role=Role.ADMIN)
+    with test_app.test_client() as client:
+        response = client.put(
+            "/api/v1/admin/settings",
+            json={"delivery_min": 500, "delivery_fee": 45},
+            headers=auth_header(admin),
+        )
+        assert response.status_code == 200
+
+        snapshot = SettingsService.snapshot()
+        assert snapshot.delivery_fee_for(Decimal("100")) == Decimal("45")
+        assert snapshot.delivery_fee_for(Decimal("500")) == Decimal("0")
+
+        with count_statements() as statements:
+            assert SettingsService.snapshot() is snapshot
+        assert statements == []
+
+        info = client.get("/api/v1/store/shipping-info").get_json()["data"]
+        assert info["delivery"]["delivery_fee"] == 45.0
+        assert info["delivery"]["delivery_min"] == 500.0
+
+
+def test_cart_above_free_threshold_ships_free(test_app, auth_header, create_user_with_role):
+    from decimal import Decimal
+
+    from app.services.cart.helpers import delivery_totals
+    from app.services.settings_service import SettingsService
+
+    admin = create_user_with_role(role=Role.ADMIN)
+    with test_app.test_client() as client:
+        response = client.put(
+            "/api/v1/admin/settings",
+            json={"delivery_min": 500, "delivery_fee": 45, "free_threshold": 250},
+            headers=auth_header(admin),
+        )
+        assert response.status_code == 200
+
+        snapshot = SettingsService.snapshot()
+        assert snapshot.delivery_fee_for(Decimal("249.99")) == Decimal("45")
+        assert snapshot.delivery_fee_for(Decimal("300")) == Decimal("0")
+        assert delivery_totals(Decimal("300")) == {"delivery_fee": Decimal("0"), "amount_to_free_delivery": Decimal("0")}
+        assert delivery_totals(Decimal("200"))["amount_to_free_delivery"] == Decimal("50")
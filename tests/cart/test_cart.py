@@ -29,3 +29,108 @@ def test_cart_add_fails_when_out_of_stock(session, users):
     with pytest.raises(DomainError) as exc:
         CartService.add_item(user.id, product.id, 1)
     assert exc.value.code == "OUT_OF_STOCK_ANYWHERE"
+
+def test_cart_add_merges_line_with_fixed_query_count(session, users, test_app, count_statements):
+    from app.models import Inventory
+
+    user, _ = users
+    warehouse_id = int(test_app.config["DELIVERY_SOURCE_BRANCH_ID"])
+    category = Category(name="Cart Pipeline")
+    session.add(category)
+    session.flush()
+    products = [Product(name=f"Pipe {i}", sku=f"PIPE{i}", price="2.00", category_id=category.id) for i in range(5)]
+    session.add_all(products)
+    session.flush()
+    session.add_all(
+        Inventory(product_id=p.id, branch_id=warehouse_id, available_quantity=10, reserved_quantity=0) for p in products
+    )
+    session.commit()
+    for product in products[1:]:
+        CartService.add_item(user.id, product.id, 1)
+    user_id, product_id = user.id, products[0].id
+
+    with count_statements() as statements:
+        CartService.add_item(user_id, product_id, 1)
+        cart = CartService.add_item(user_id, product_id, 2)
+
+    lines = [item for item in cart.items if item.product_id == product_id]
+    assert [line.quantity for line in lines] == [3]
+    selects = [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+    # Per add: product/stock/cart line and the joined cart view; the delivery branch is cached.
+    assert len(selects) <= 4
+
+    with pytest.raises(DomainError) as exc:
+        CartService.add_item(user_id, product_id, 8)
+    assert exc.value.code == "OUT_OF_STOCK_DELIVERY_BRANCH"
+
+def test_cart_batch_set_applies_valid_lines_and_reports_failures(session, users, test_app):
+    from app.models import Inventory
+    from app.schemas.cart import CartBatchLine
+
+    user, _ = users
+    warehouse_id = int(test_app.config["DELIVERY_SOURCE_BRANCH_ID"])
+    category = Category(name="Cart Batch")
+    session.add(category)
+    session.flush()
+    stocked = Product(name="Batch Stocked", sku="CBS1", price="3.00", category_id=category.id)
+    scarce = Product(name="Batch Scarce", sku="CBS2", price="4.00", category_id=category.id)
+    session.add_all([stocked, scarce])
+    session.flush()
+    session.add_all([
+        Inventory(product_id=stocked.id, branch_id=warehouse_id, available_quantity=10, reserved_quantity=0),
+        Inventory(product_id=scarce.id, branch_id=warehouse_id, available_quantity=1, reserved_quantity=0),
+    ])
+    session.commit()
+    stocked_id, scarce_id = stocked.id, scarce.id
+
+    result = CartService.set_items(user.id, [
+        CartBatchLine(product_id=stocked_id, quantity=4),
+        CartBatchLine(product_id=scarce_id, quantity=5),
+        CartBatchLine(product_id=999999, quantity=1),
+    ])
+    quantities = {item.product_id: item.quantity for item in result.cart.items}
+    assert quantities[stocked_id] == 4
+    assert scarce_id not in quantities
+    assert {(f.product_id, f.code) for f in result.failed} == {
+        (scarce_id, "OUT_OF_STOCK_DELIVERY_BRANCH"),
+        (999999, "PRODUCT_INACTIVE"),
+    }
+
+    result = CartService.set_items(user.id, [CartBatchLine(product_id=stocked_id, quantity=0)])
+    assert stocked_id not in {item.product_id for item in result.cart.items}
+
+def test_cart_reads_are_cached_until_a_mutation(session, users, test_app, count_statements):
+    from sqlalchemy import update
+    from app.models import Cart, CartItem, Inventory
+
+    _, user = users
+    warehouse_id = int(test_app.config["DELIVERY_SOURCE_BRANCH_ID"])
+    category = Category(name="Cart Cache")
+    session.add(category)
+    session.flush()
+    product = Product(name="Cached Line", sku="CCL1", price="1.50", category_id=category.id)
+    session.add(product)
+    session.flush()
+    session.add(Inventory(product_id=product.id, branch_id=warehouse_id, available_quantity=5, reserved_quantity=0))
+    session.commit()
+    user_id, product_id = user.id, product.id
+
+    CartService.get_cart(user_id)
+    with count_statements() as statements:
+        CartService.get_cart(user_id)
+        CartService.get_cart(user_id)
+    # A cached read only checks the cart's version.
+    assert len(statements) == 2 and all("cart_items" not in sql for sql in statements)
+
+    CartService.add_item(user_id, product_id, 2)
+    cart = CartService.get_cart(user_id)
+    assert [(item.product_name, item.quantity) for item in cart.items if item.product_id == product_id] == [
+        ("Cached Line", 2)
+    ]
+
+    # An edit committed by another worker bumps the shared version, so this worker's view is not served.
+    session.execute(update(CartItem).where(CartItem.cart_id == cart.id).values(quantity=3))
+    session.execute(update(Cart).where(Cart.id == cart.id).values(version=Cart.version + 1))
+    session.commit()
+    cart = CartService.get_cart(user_id)
+    assert [item.quantity for item in cart.items if item.product_id == product_id] == [3]
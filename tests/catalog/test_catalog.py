@@ -2,6 +2,7 @@ import pytest
 
 from app.middleware.error_handler import DomainError
 from app.services.catalog import CatalogAdminService, CatalogQueryService
+from app.services.stock_cache import StockCache
 
 
 def test_product_toggle_disables_access(session):
@@ -36,3 +37,207 @@ def test_search_in_stock_filters_by_branch(session, product_with_inventory):
     )
     assert total_empty == 0
     assert items_empty == []
+
+
+def test_search_ranks_name_matches_first(session):
+    category = CatalogAdminService.create_category("Bakery", "Bread and more")
+    CatalogAdminService.create_product(
+        name="Rye Crackers", sku="RC1", price="3.00", category_id=category.id, description="Great with sourdough"
+    )
+    sourdough = CatalogAdminService.create_product(
+        name="Sourdough Loaf", sku="SD1", price="6.00", category_id=category.id, description=None
+    )
+    items, total = CatalogQueryService.search_products(
+        query="sourdough", category_id=None, in_stock=None, branch_id=None, limit=10, offset=0
+    )
+    assert total == 2
+    assert items[0].id == sourdough.id
+
+
+def test_ngram_index_matches_substrings_and_sku():
+    from app.services.catalog.search import NgramIndex
+
+    index = NgramIndex.build([(1, "Whole Milk", "DAIRY-1", None), (2, "Oat Drink", "OAT-2", "milk alternative")])
+    ranked = index.search("milk")
+    assert [pid for pid, _ in ranked] == [1, 2]
+    assert [pid for pid, _ in index.search("oat-2")] == [2]
+    assert index.search("zzz") == []
+
+
+def test_prefix_index_orders_by_match_then_popularity():
+    from app.services.catalog.autocomplete import PrefixIndex
+
+    index = PrefixIndex.build([(1, "Milk Chocolate", 5), (2, "Oat Milk", 50), (3, "Milkshake", 20)], version=1)
+    assert [pid for pid, _ in index.lookup("milk", 10)] == [3, 1, 2]
+    index.upsert(4, "Milk 3%", active=True)
+    index.upsert(3, "Milkshake", active=False)
+    assert [pid for pid, _ in index.lookup("mil", 10)] == [1, 4, 2]
+
+
+def test_autocomplete_blank_query_lists_active_products(session):
+    category = CatalogAdminService.create_category("Snacks", "Crisps and nuts")
+    first = CatalogAdminService.create_product(
+        name="Salted Peanuts", sku="SP1", price="2.00", category_id=category.id, description=None
+    )
+    second = CatalogAdminService.create_product(
+        name="Paprika Crisps", sku="PC1", price="2.50", category_id=category.id, description=None
+    )
+    hidden = CatalogAdminService.create_product(
+        name="Cashews", sku="CS1", price="5.00", category_id=category.id, description=None
+    )
+    CatalogAdminService.toggle_product(hidden.id, active=False)
+
+    for query in (None, "", "   "):
+        ids = [item.id for item in CatalogQueryService.autocomplete(query, 50).items]
+        assert [pid for pid in ids if pid in (first.id, second.id, hidden.id)] == [first.id, second.id]
+        assert ids == sorted(ids)
+    assert len(CatalogQueryService.autocomplete("", 1).items) == 1
+
+
+def test_autocomplete_reflects_admin_writes(session):
+    category = CatalogAdminService.create_category("Frozen", "Cold stuff")
+    product = CatalogAdminService.create_product(
+        name="Zucchini Fries", sku="ZF1", price="7.00", category_id=category.id, description=None
+    )
+    result = CatalogQueryService.autocomplete("zucc", 5)
+    assert [item.id for item in result.items] == [product.id]
+
+    CatalogAdminService.toggle_product(product.id, active=False)
+    assert CatalogQueryService.autocomplete("zucc", 5).items == []
+
+
+def test_search_keyset_pages_cover_results_once(session):
+    category = CatalogAdminService.create_category("Pantry", "Dry goods")
+    created = {
+        CatalogAdminService.create_product(
+            name=f"Pasta {i}", sku=f"PA{i}", price=f"{i}.00", category_id=category.id, description=None
+        ).id
+        for i in range(1, 6)
+    }
+    seen, cursor = [], ""
+    while True:
+        items, cursor = CatalogQueryService.search_products_keyset(
+            query=None, category_id=category.id, in_stock=None, branch_id=None, limit=2, cursor=cursor, sort="price_asc"
+        )
+        seen.extend(item.id for item in items)
+        if cursor is None:
+            break
+    assert set(seen) == created
+    assert len(seen) == len(created)
+
+    with pytest.raises(DomainError) as exc:
+        CatalogQueryService.search_products_keyset(
+            query=None, category_id=None, in_stock=None, branch_id=None, limit=2, cursor="not-a-cursor"
+        )
+    assert exc.value.code == "BAD_REQUEST"
+
+
+def test_product_response_uses_aggregated_stock(session):
+    from app.models import Branch, Inventory
+
+    category = CatalogAdminService.create_category("Produce", "Fresh")
+    product = CatalogAdminService.create_product(
+        name="Apples", sku="AP1", price="2.00", category_id=category.id, description=None
+    )
+    stocked, empty = Branch(name="North", address="Street 3"), Branch(name="South", address="Street 4")
+    session.add_all([stocked, empty])
+    session.flush()
+    session.add_all([
+        Inventory(product_id=product.id, branch_id=stocked.id, available_quantity=3, reserved_quantity=0),
+        Inventory(product_id=product.id, branch_id=empty.id, available_quantity=0, reserved_quantity=0),
+    ])
+    session.commit()
+    # Rows written straight through the session bypass the inventory services' invalidation.
+    StockCache.invalidate([product.id])
+
+    north = CatalogQueryService.get_product(product.id, branch_id=stocked.id)
+    assert north.available_quantity == 3
+    assert north.branch_available_quantity == 3
+    assert north.in_stock_anywhere is True
+
+    south = CatalogQueryService.get_product(product.id, branch_id=empty.id)
+    assert south.in_stock_for_branch is False
+    assert south.branch_available_quantity == 0
+
+
+def test_faceted_search_counts_match_filtered_results(session):
+    category = CatalogAdminService.create_category("Party Snacks", "Chips and nuts")
+    for i, price in enumerate(("4.00", "12.00", "60.00")):
+        CatalogAdminService.create_product(
+            name=f"Crunchy Mix {i}", sku=f"CM{i}", price=price, category_id=category.id, description=None
+        )
+    items, total, facets = CatalogQueryService.faceted_search(
+        query="crunchy", category_id=None, in_stock=None, branch_id=None, limit=1, offset=0,
+        facets={"category", "price"},
+    )
+    assert total == 3
+    assert len(items) == 1
+    assert facets.categories[0].category_id == category.id
+    assert facets.categories[0].count == 3
+    assert [bucket.count for bucket in facets.price] == [1, 1, 0, 1, 0]
+    assert facets.organic is None
+
+
+def test_uncounted_search_detects_next_page_without_total(session):
+    category = CatalogAdminService.create_category("Spice Rack", None)
+    for i in range(3):
+        CatalogAdminService.create_product(
+            name=f"Paprika {i}", sku=f"PK{i}", price="2.00", category_id=category.id, description=None
+        )
+    items, has_next, total = CatalogQueryService.search_products_uncounted(
+        query=None, category_id=category.id, in_stock=None, branch_id=None, limit=2, offset=0
+    )
+    assert len(items) == 2 and has_next is True and total is None
+
+    items, has_next, total = CatalogQueryService.search_products_uncounted(
+        query=None, category_id=category.id, in_stock=None, branch_id=None, limit=2, offset=2, estimate=True
+    )
+    assert len(items) == 1 and has_next is False
+    assert total == 3
+
+
+def test_stock_filtered_counts_follow_inventory_writes(session, test_app):
+    from app.schemas.branches import InventoryCreateRequest, InventoryUpdateRequest
+    from app.services.inventory_service import InventoryService
+
+    warehouse_id = int(test_app.config["DELIVERY_SOURCE_BRANCH_ID"])
+    category = CatalogAdminService.create_category("Stock Facets", None)
+    product = CatalogAdminService.create_product(
+        name="Facet Figs", sku="FF1", price="3.00", category_id=category.id, description=None
+    )
+    inventory = InventoryService.create_inventory(
+        InventoryCreateRequest(product_id=product.id, branch_id=warehouse_id, available_quantity=0, reserved_quantity=0)
+    )
+    search = dict(query=None, category_id=category.id, in_stock=True, branch_id=warehouse_id, limit=10, offset=0)
+    assert CatalogQueryService.faceted_search(**search, facets={"category"})[1] == 0
+    assert CatalogQueryService.search_products_uncounted(**search, estimate=True)[2] == 0
+
+    InventoryService.update_inventory(inventory.id, InventoryUpdateRequest(available_quantity=5, reserved_quantity=0))
+    items, total, facets = CatalogQueryService.faceted_search(**search, facets={"category"})
+    assert [item.id for item in items] == [product.id] and total == 1
+    assert facets.categories[0].count == 1
+    assert CatalogQueryService.search_products_uncounted(**search, estimate=True)[2] == 1
+
+
+def test_cached_stock_is_invalidated_by_inventory_writes(session, test_app, count_statements):
+    from app.schemas.branches import InventoryCreateRequest, InventoryUpdateRequest
+    from app.services.inventory_service import InventoryService
+
+    warehouse_id = int(test_app.config["DELIVERY_SOURCE_BRANCH_ID"])
+    category = CatalogAdminService.create_category("Stock Cache", None)
+    product = CatalogAdminService.create_product(
+        name="Cached Pears", sku="SC1", price="3.00", category_id=category.id, description=None
+    )
+    inventory = InventoryService.create_inventory(
+        InventoryCreateRequest(product_id=product.id, branch_id=warehouse_id, available_quantity=4, reserved_quantity=0)
+    )
+    assert CatalogQueryService.get_product(product.id, branch_id=warehouse_id).branch_available_quantity == 4
+
+    with count_statements() as statements:
+        StockCache.by_branch([product.id])
+    assert statements == []
+
+    InventoryService.update_inventory(inventory.id, InventoryUpdateRequest(available_quantity=0, reserved_quantity=0))
+    refreshed = CatalogQueryService.get_product(product.id, branch_id=warehouse_id)
+    assert refreshed.branch_available_quantity == 0
+    assert refreshed.in_stock_anywhere is False
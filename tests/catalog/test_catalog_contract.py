@@ -62,3 +62,118 @@ def test_admin_analytics_revenue_empty_returns_arrays(client, session, admin_tok
     data = resp.get_json()["data"]
     assert isinstance(data.get("labels"), list)
     assert isinstance(data.get("values"), list)
+
+
+def test_catalog_conditional_get_returns_304_until_catalog_changes(client, session):
+    from app.services.catalog import CatalogAdminService
+
+    resp = client.get("/api/v1/catalog/categories")
+    etag = resp.headers["ETag"]
+    assert "public" in resp.headers["Cache-Control"]
+    cached = client.get("/api/v1/catalog/categories", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+
+    CatalogAdminService.create_category("Frozen Desserts", "Ice cream")
+    fresh = client.get("/api/v1/catalog/categories", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+
+
+def test_batch_products_returns_request_order_and_missing(client, session):
+    from app.services.catalog import CatalogAdminService
+
+    category = CatalogAdminService.create_category("Batch Goods", None)
+    first = CatalogAdminService.create_product(name="Batch One", sku="BT1", price="1.00", category_id=category.id, description=None)
+    second = CatalogAdminService.create_product(name="Batch Two", sku="BT2", price="2.00", category_id=category.id, description=None)
+    resp = client.get(f"/api/v1/catalog/products?ids={second.id},999999,{first.id}")
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert [item["id"] for item in body["data"]] == [second.id, first.id]
+    assert body["meta"]["missing"] == [999999]
+
+    assert client.get("/api/v1/catalog/products?ids=a,b").status_code == 400
+
+
+def test_sparse_fieldset_limits_product_keys(client, session):
+    resp = client.get("/api/v1/catalog/products/featured?limit=3&fields=name,price")
+    assert resp.status_code == 200
+    for item in resp.get_json()["data"]:
+        assert set(item) == {"id", "name", "price"}
+
+    assert client.get("/api/v1/catalog/products/featured?fields=nope").status_code == 400
+
+
+def test_list_views_leave_detail_columns_unloaded(session):
+    from sqlalchemy import inspect, select
+
+    from app.models import Product
+    from app.services.catalog.mappers import product_load_options
+
+    session.expunge_all()
+    listed = session.execute(select(Product).options(*product_load_options(None))).scalars().all()
+    assert listed
+    assert all("description" in inspect(product).unloaded for product in listed)
+
+    session.expunge_all()
+    sparse = session.execute(
+        select(Product).options(*product_load_options(frozenset({"id", "name"})))
+    ).scalars().all()
+    assert all("price" in inspect(product).unloaded for product in sparse)
+
+
+def test_featured_served_from_snapshot_with_age(client, session, monkeypatch):
+    import threading
+
+    from sqlalchemy import delete, func, select
+
+    from app.models import Branch, FeaturedSnapshot
+    from app.services.catalog import CatalogAdminService, FeaturedSnapshotService
+
+    # No refresher runs under test, so a cold start builds the snapshots in the request.
+    session.execute(delete(FeaturedSnapshot))
+    session.commit()
+    resp = client.get("/api/v1/catalog/products/featured?limit=3")
+    assert resp.status_code == 200 and resp.get_json()["data"]
+    assert resp.get_json()["meta"]["snapshot_age_seconds"] >= 0
+    etag = resp.headers["ETag"]
+    assert client.get("/api/v1/catalog/products/featured?limit=3", headers={"If-None-Match": etag}).status_code == 304
+    wide = client.get("/api/v1/catalog/products/featured?limit=51")
+    assert wide.status_code == 200 and len(wide.get_json()["data"]) <= 50
+
+    # A rebuild moves the ETag even though no catalog or stock version changed.
+    FeaturedSnapshotService.rebuild_all()
+    rebuilt = client.get("/api/v1/catalog/products/featured?limit=3", headers={"If-None-Match": etag})
+    assert rebuilt.status_code == 200 and rebuilt.headers["ETag"] != etag
+
+    monkeypatch.setattr(FeaturedSnapshotService, "_thread", threading.Thread(target=lambda: None))
+
+    # Requests never write: an unknown branch is served the branch-less snapshot.
+    unknown_branch = (session.scalar(select(func.max(Branch.id))) or 0) + 1000
+    resp = client.get(f"/api/v1/catalog/products/featured?limit=3&branchId={unknown_branch}")
+    assert resp.status_code == 200
+    assert session.get(FeaturedSnapshot, unknown_branch) is None
+
+    category = CatalogAdminService.create_category("Snapshot Goods", None)
+    newest = CatalogAdminService.create_product(
+        name="Snapshot Fresh", sku="SNAP1", price="3.00", category_id=category.id, description=None
+    )
+    items, _ = FeaturedSnapshotService.get(3, None)
+    assert newest.id not in [item["id"] for item in items]
+    FeaturedSnapshotService.rebuild_all()
+    items, age = FeaturedSnapshotService.get(3, None)
+    assert items[0]["id"] == newest.id
+    assert age < 5
+
+
+def test_catalog_etag_moves_with_every_committed_stock_write(client, session):
+    from app.services.cache_version_service import INVENTORY, CacheVersionService
+
+    etag = client.get("/api/v1/catalog/categories").headers["ETag"]
+    assert "Last-Modified" not in client.get("/api/v1/catalog/categories").headers
+
+    # A checkout's stock write bumps the inventory version in its own transaction.
+    CacheVersionService.bump_striped(INVENTORY)
+    session.commit()
+    fresh = client.get("/api/v1/catalog/categories", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200 and fresh.headers["ETag"] != etag
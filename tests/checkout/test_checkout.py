@@ -1,12 +1,13 @@
 from decimal import Decimal
 import pytest
-from sqlalchemy import select
+from sqlalchemy import func, select
 
 from app.extensions import db
 from app.middleware.error_handler import DomainError
 from app.models import Audit, Cart, CartItem, DeliverySlot
 from app.models.enums import FulfillmentType
 from app.schemas.checkout import CheckoutConfirmRequest, CheckoutPreviewRequest
+from app.services.checkout import CheckoutPaymentOutbox
 from app.services.checkout_service import CheckoutService
 from app.services.payment_service import PaymentService
 
@@ -65,7 +66,218 @@ def test_checkout_preview_branch_switch_missing(session, users, product_with_inv
     preview = CheckoutService.preview(payload)
     assert preview.missing_items, "Expected missing items when branch has no stock"
 
+def test_checkout_preview_reads_inventory_once_and_caches(session, users, test_app, count_statements):
+    import re
+
+    from app.models import Category, Inventory, Product
+    from app.services.cache_version_service import INVENTORY, CacheVersionService
+
+    user, _ = users
+    warehouse_id = int(test_app.config["DELIVERY_SOURCE_BRANCH_ID"])
+    category = Category(name="Preview Batch")
+    session.add(category)
+    session.flush()
+    products = [Product(name=f"Preview {i}", sku=f"PVB{i}", price="5.00", category_id=category.id) for i in range(4)]
+    session.add_all(products)
+    session.flush()
+    session.add_all(
+        Inventory(product_id=p.id, branch_id=warehouse_id, available_quantity=i, reserved_quantity=0)
+        for i, p in enumerate(products)
+    )
+    cart = Cart(user_id=user.id)
+    session.add(cart)
+    session.flush()
+    session.add_all(CartItem(cart_id=cart.id, product_id=p.id, quantity=2, unit_price="5.00") for p in products)
+    session.commit()
+    payload = CheckoutPreviewRequest(cart_id=cart.id, fulfillment_type=FulfillmentType.PICKUP, branch_id=warehouse_id)
+
+    with count_statements() as statements:
+        first = CheckoutService.preview(payload)
+        inventory_reads = sum(bool(re.search(r"FROM inventory\b", sql)) for sql in statements)
+        statements.clear()
+        again = CheckoutService.preview(payload)
+
+    assert inventory_reads == 1
+    assert not any(re.search(r"FROM inventory\b", sql) for sql in statements)
+    assert again == first
+    assert [(m.product_id, m.available_quantity) for m in first.missing_items] == [
+        (products[0].id, 0),
+        (products[1].id, 1),
+    ]
+
+    # A stock write committed by another worker (no local invalidation) moves the shared version.
+    session.execute(select(Inventory).where(Inventory.product_id == products[1].id)).scalar_one().available_quantity = 2
+    CacheVersionService.bump_striped(INVENTORY)
+    session.commit()
+    assert [m.product_id for m in CheckoutService.preview(payload).missing_items] == [products[0].id]
+
+def test_checkout_confirm_decrements_all_lines_or_none(session, users, test_app, monkeypatch):
+    from app.models import Category, Inventory, Product
+
+    user, _ = users
+    warehouse_id = int(test_app.config["DELIVERY_SOURCE_BRANCH_ID"])
+    category = Category(name="Decrement Engine")
+    session.add(category)
+    session.flush()
+    plenty = Product(name="Decrement Plenty", sku="DEP1", price="4.00", category_id=category.id)
+    scarce = Product(name="Decrement Scarce", sku="DES1", price="6.00", category_id=category.id)
+    session.add_all([plenty, scarce])
+    session.flush()
+    session.add_all([
+        Inventory(product_id=plenty.id, branch_id=warehouse_id, available_quantity=5, reserved_quantity=0),
+        Inventory(product_id=scarce.id, branch_id=warehouse_id, available_quantity=1, reserved_quantity=0),
+    ])
+    cart = Cart(user_id=user.id)
+    session.add(cart)
+    session.flush()
+    scarce_line = CartItem(cart_id=cart.id, product_id=scarce.id, quantity=2, unit_price="6.00")
+    session.add_all([CartItem(cart_id=cart.id, product_id=plenty.id, quantity=2, unit_price="4.00"), scarce_line])
+    session.commit()
+    plenty_id, scarce_id = plenty.id, scarce.id
+    monkeypatch.setattr(PaymentService, "charge", lambda *_args, **_kw: "ref-decrement")
+
+    def stock():
+        rows = session.execute(
+            select(Inventory.product_id, Inventory.available_quantity).where(
+                Inventory.product_id.in_([plenty_id, scarce_id])
+            )
+        ).all()
+        return dict(rows)
+
+    payload = _cart_payload(cart, fulfillment=FulfillmentType.PICKUP, branch_id=warehouse_id)
+    with pytest.raises(DomainError) as exc:
+        CheckoutService.confirm(payload, idempotency_key="decrement-short")
+    assert exc.value.code == "INSUFFICIENT_STOCK"
+    assert exc.value.details["missing"] == [
+        {"product_id": scarce_id, "requested_quantity": 2, "available_quantity": 1}
+    ]
+    assert stock() == {plenty_id: 5, scarce_id: 1}
+
+    scarce_line.quantity = 1
+    session.add(scarce_line)
+    session.commit()
+    result, is_new = CheckoutService.confirm(payload, idempotency_key="decrement-ok")
+    assert is_new and result.payment_reference is None
+    assert stock() == {plenty_id: 3, scarce_id: 0}
+
+def test_checkout_reservation_holds_converts_and_expires(session, users, test_app, monkeypatch):
+    from datetime import datetime, timedelta
+    from app.models import Category, Inventory, InventoryReservation, Product
+    from app.schemas.checkout import CheckoutReserveRequest
+    from app.services.checkout import CheckoutReservationManager
+
+    user, other = users
+    warehouse_id = int(test_app.config["DELIVERY_SOURCE_BRANCH_ID"])
+    category = Category(name="Reservations")
+    session.add(category)
+    session.flush()
+    product = Product(name="Flash Sale Kettle", sku="RSV1", price="20.00", category_id=category.id)
+    session.add(product)
+    session.flush()
+    session.add(Inventory(product_id=product.id, branch_id=warehouse_id, available_quantity=3, reserved_quantity=0))
+    carts = [Cart(user_id=user.id), Cart(user_id=other.id)]
+    session.add_all(carts)
+    session.flush()
+    session.add_all(CartItem(cart_id=c.id, product_id=product.id, quantity=2, unit_price="20.00") for c in carts)
+    session.commit()
+    product_id, first_id, second_id = product.id, carts[0].id, carts[1].id
+    monkeypatch.setattr(PaymentService, "charge", lambda *_args, **_kw: "ref-reserved")
+
+    def stock():
+        return session.execute(
+            select(Inventory.available_quantity, Inventory.reserved_quantity).where(Inventory.product_id == product_id)
+        ).one()
+
+    def reserve(cart_id):
+        return CheckoutService.reserve(
+            CheckoutReserveRequest(cart_id=cart_id, fulfillment_type=FulfillmentType.PICKUP, branch_id=warehouse_id)
+        )
+
+    held = reserve(first_id)
+    assert [(line.product_id, line.quantity) for line in held.reserved] == [(product_id, 2)]
+    assert tuple(stock()) == (1, 2)
+    # The cart's own hold covers its line, and reserving again does not push the expiry out.
+    preview = CheckoutService.preview(
+        CheckoutPreviewRequest(cart_id=first_id, fulfillment_type=FulfillmentType.PICKUP, branch_id=warehouse_id)
+    )
+    assert preview.missing_items == []
+    assert reserve(first_id).expires_at == held.expires_at
+    assert tuple(stock()) == (1, 2)
+    blocked = reserve(second_id)
+    assert blocked.reserved == [] and blocked.missing_items[0].available_quantity == 1
+
+    payload = CheckoutConfirmRequest(
+        cart_id=first_id, payment_token_id=1, fulfillment_type=FulfillmentType.PICKUP, branch_id=warehouse_id
+    )
+    _, is_new = CheckoutService.confirm(payload, idempotency_key="reserved-confirm")
+    assert is_new
+    assert tuple(stock()) == (1, 0)
+    assert session.scalar(select(InventoryReservation.id).where(InventoryReservation.cart_id == first_id)) is None
+
+    session.execute(select(Inventory).where(Inventory.product_id == product_id)).scalar_one().available_quantity = 2
+    session.commit()
+    reserve(second_id)
+    assert tuple(stock()) == (0, 2)
+    hold = session.execute(select(InventoryReservation).where(InventoryReservation.cart_id == second_id)).scalar_one()
+    hold.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    session.commit()
+    assert CheckoutReservationManager.sweep_expired(batch_size=1) == 1
+    assert tuple(stock()) == (2, 0)
+
+def test_sharded_inventory_decrements_shards_and_rebalances(session, users, test_app, monkeypatch):
+    from app.models import Category, Inventory, Product
+    from app.services.cart import validators
+    from app.services.inventory_shards import InventoryShardService
+    from app.services.stock_cache import StockCache
+
+    user, _ = users
+    warehouse_id = int(test_app.config["DELIVERY_SOURCE_BRANCH_ID"])
+    category = Category(name="Sharded Stock")
+    session.add(category)
+    session.flush()
+    product = Product(name="Promo Headphones", sku="SHD1", price="15.00", category_id=category.id)
+    session.add(product)
+    session.flush()
+    inventory = Inventory(product_id=product.id, branch_id=warehouse_id, available_quantity=10, reserved_quantity=0)
+    session.add(inventory)
+    cart = Cart(user_id=user.id)
+    session.add(cart)
+    session.flush()
+    line = CartItem(cart_id=cart.id, product_id=product.id, quantity=4, unit_price="15.00")
+    session.add(line)
+    session.commit()
+    product_id, inventory_id = product.id, inventory.id
+    monkeypatch.setattr(PaymentService, "charge", lambda *_args, **_kw: "ref-sharded")
+
+    assert InventoryShardService.configure(inventory_id, 4).shards == [3, 3, 2, 2]
+    payload = _cart_payload(cart, fulfillment=FulfillmentType.PICKUP, branch_id=warehouse_id)
+    CheckoutService.confirm(payload, idempotency_key="sharded-ok")
+    described = InventoryShardService.describe(inventory_id)
+    assert described.available_quantity == 6 and sum(described.shards) == 6
+    assert StockCache.by_branch([product_id])[product_id][warehouse_id] == 6
+
+    line.quantity = 7
+    session.add(line)
+    session.commit()
+    # The mirror still says 10 until the sweeper syncs it; stock decisions sum the shards.
+    assert session.get(Inventory, inventory_id, populate_existing=True).available_quantity == 10
+    preview = CheckoutService.preview(
+        CheckoutPreviewRequest(cart_id=cart.id, fulfillment_type=FulfillmentType.PICKUP, branch_id=warehouse_id)
+    )
+    assert [(m.product_id, m.available_quantity) for m in preview.missing_items] == [(product_id, 6)]
+    assert validators.load_products_stock([product_id], warehouse_id)[product_id][2:] == (6, 6)
+    with pytest.raises(DomainError) as exc:
+        CheckoutService.confirm(payload.model_copy(), idempotency_key="sharded-short")
+    assert exc.value.details["missing"][0]["available_quantity"] == 6
+
+    assert InventoryShardService.rebalance(inventory_id).shards == [2, 2, 1, 1]
+    assert InventoryShardService.configure(inventory_id, 0).shards == []
+    assert session.get(Inventory, inventory_id, populate_existing=True).available_quantity == 6
+
 def test_payment_danger_zone_logged(session, test_app, users, product_with_inventory, monkeypatch):
+    from app.models import Order, PaymentOutbox
+    from app.models.enums import OrderStatus, PaymentOutboxStatus
+
     user, product, inv, _, cart = _prep_cart(session, users, product_with_inventory, qty=1)
     inv.available_quantity = 5
     session.add(inv)
@@ -77,19 +289,236 @@ def test_payment_danger_zone_logged(session, test_app, users, product_with_inven
         branch_id=inv.branch_id,
     )
 
-    def _fail_commit(*_args, **_kwargs):
-        raise RuntimeError("boom")
+    confirmed, _ = CheckoutService.confirm(payload, idempotency_key="danger-key")
+    real_commit = db.session.commit
+    charged = []
+
+    def _charge(*_args, **_kw):
+        charged.append(True)
+        return "ref123"
 
-    monkeypatch.setattr(PaymentService, "charge", lambda *_args, **_kw: "ref123")
-    monkeypatch.setattr(db.session, "commit", _fail_commit)
+    def _fail_capture_commit():
+        # Only the commit right after the capture fails.
+        if charged and charged.pop():
+            raise RuntimeError("boom")
+        real_commit()
 
+    monkeypatch.setattr(PaymentService, "charge", _charge)
+
+    monkeypatch.setattr(db.session, "commit", _fail_capture_commit)
     with pytest.raises(RuntimeError):
-        CheckoutService.confirm(payload, idempotency_key="danger-key")
+        CheckoutPaymentOutbox.drain()
     audit_rows = db.session.execute(
         select(Audit).where(Audit.action == "PAYMENT_CAPTURED_NOT_COMMITTED")
     ).scalars().all()
     assert audit_rows, "Expected danger zone audit log when commit fails after payment"
 
+    # The lost capture is never charged again; reconcile finds it at the provider instead.
+    def _no_second_charge(*_args, **_kw):
+        raise AssertionError("an entry in CHARGING must not be charged again")
+
+    monkeypatch.setattr(PaymentService, "charge", _no_second_charge)
+    monkeypatch.setattr(db.session, "commit", real_commit)
+    CheckoutPaymentOutbox.drain()
+    entry = db.session.execute(
+        select(PaymentOutbox).where(PaymentOutbox.order_id == confirmed.order_id)
+    ).scalar_one()
+    assert entry.status == PaymentOutboxStatus.CHARGING and entry.attempts == 1
+    monkeypatch.setattr(PaymentService, "find_charge", lambda key: "ref123" if key == entry.charge_key else None)
+    assert CheckoutPaymentOutbox.reconcile(stale_seconds=0) >= 1
+    assert db.session.get(Order, confirmed.order_id, populate_existing=True).status == OrderStatus.CREATED
+
+def test_checkout_payment_is_captured_after_confirm_commits(session, users, test_app, monkeypatch):
+    from app.models import Category, Inventory, Order, PaymentOutbox, Product
+    from app.models.enums import OrderStatus, PaymentOutboxStatus
+
+    user, _ = users
+    warehouse_id = int(test_app.config["DELIVERY_SOURCE_BRANCH_ID"])
+    category = Category(name="Payment Outbox")
+    session.add(category)
+    session.flush()
+    product = Product(name="Outbox Toaster", sku="POB1", price="30.00", category_id=category.id)
+    session.add(product)
+    session.flush()
+    session.add(Inventory(product_id=product.id, branch_id=warehouse_id, available_quantity=5, reserved_quantity=0))
+    carts = [Cart(user_id=user.id), Cart(user_id=user.id)]
+    session.add_all(carts)
+    session.flush()
+    session.add_all([
+        CartItem(cart_id=carts[0].id, product_id=product.id, quantity=2, unit_price="30.00"),
+        CartItem(cart_id=carts[1].id, product_id=product.id, quantity=1, unit_price="30.00"),
+    ])
+    session.commit()
+    product_id = product.id
+
+    def _no_charge_in_confirm(*_args, **_kw):
+        raise AssertionError("confirm must not call the payment provider")
+
+    def stock():
+        return session.scalar(select(Inventory.available_quantity).where(Inventory.product_id == product_id))
+
+    monkeypatch.setattr(PaymentService, "charge", _no_charge_in_confirm)
+    paid, _ = CheckoutService.confirm(
+        _cart_payload(carts[0], fulfillment=FulfillmentType.PICKUP, branch_id=warehouse_id), idempotency_key="outbox-paid"
+    )
+    declined, _ = CheckoutService.confirm(
+        _cart_payload(carts[1], fulfillment=FulfillmentType.PICKUP, branch_id=warehouse_id), idempotency_key="outbox-declined"
+    )
+    assert paid.status == OrderStatus.PENDING_PAYMENT and paid.payment_reference is None
+    assert stock() == 2
+
+    def _charge(payment_token_id, amount, idempotency_key=None):
+        if amount == 60.0:
+            return "ref-outbox"
+        raise DomainError("PAYMENT_DECLINED", "Card declined", status_code=402)
+
+    monkeypatch.setattr(PaymentService, "charge", _charge)
+    assert CheckoutPaymentOutbox.drain() >= 2
+    assert CheckoutPaymentOutbox.drain() == 0
+
+    assert session.get(Order, paid.order_id, populate_existing=True).status == OrderStatus.CREATED
+    assert session.get(Order, declined.order_id, populate_existing=True).status == OrderStatus.CANCELED
+    outbox = session.execute(
+        select(PaymentOutbox.status, PaymentOutbox.last_error)
+        .where(PaymentOutbox.order_id.in_([paid.order_id, declined.order_id]))
+        .order_by(PaymentOutbox.id)
+    ).all()
+    assert [tuple(row) for row in outbox] == [
+        (PaymentOutboxStatus.CAPTURED, None),
+        (PaymentOutboxStatus.FAILED, "PAYMENT_DECLINED"),
+    ]
+    assert stock() == 3
+    replay, is_new = CheckoutService.confirm(
+        _cart_payload(carts[0], fulfillment=FulfillmentType.PICKUP, branch_id=warehouse_id), idempotency_key="outbox-paid"
+    )
+    assert not is_new and replay.payment_reference == "ref-outbox" and replay.status == OrderStatus.CREATED
+
+def test_checkout_confirm_materializes_order_lines_in_bulk(session, users, test_app, monkeypatch, count_statements):
+    from app.models import Category, Inventory, OrderItem, Product
+
+    user, _ = users
+    warehouse_id = int(test_app.config["DELIVERY_SOURCE_BRANCH_ID"])
+    category = Category(name="Bulk Basket")
+    session.add(category)
+    session.flush()
+    products = [Product(name=f"Bulk Item {i}", sku=f"BLK{i}", price="2.00", category_id=category.id) for i in range(12)]
+    session.add_all(products)
+    session.flush()
+    session.add_all(
+        Inventory(product_id=p.id, branch_id=warehouse_id, available_quantity=5, reserved_quantity=0) for p in products
+    )
+    cart = Cart(user_id=user.id)
+    session.add(cart)
+    session.flush()
+    session.add_all(CartItem(cart_id=cart.id, product_id=p.id, quantity=1, unit_price="2.00") for p in products)
+    session.commit()
+    expected = {p.id: (p.name, p.sku) for p in products}
+    session.expire_all()
+
+    with count_statements() as statements:
+        result, _ = CheckoutService.confirm(
+            _cart_payload(cart, fulfillment=FulfillmentType.PICKUP, branch_id=warehouse_id), idempotency_key="bulk-lines"
+        )
+
+    def count(prefix):
+        return sum(1 for sql in statements if sql.lstrip().upper().startswith(prefix))
+
+    assert count("INSERT INTO ORDER_ITEMS") == 1
+    assert count("INSERT INTO AUDIT") == 2  # the order's CREATE entry plus one batch for every DECREMENT
+    assert count("SELECT PRODUCTS") == 1
+    lines = session.execute(
+        select(OrderItem.product_id, OrderItem.name, OrderItem.sku).where(OrderItem.order_id == result.order_id)
+    ).all()
+    assert {row.product_id: (row.name, row.sku) for row in lines} == expected
+    decrements = session.scalar(
+        select(func.count()).select_from(Audit).where(Audit.action == "DECREMENT", Audit.entity_type == "inventory")
+    )
+    assert decrements >= len(products)
+
+def test_checkout_replay_skips_locks_and_expired_keys_are_purged(session, users, test_app, monkeypatch, count_statements):
+    from datetime import datetime, timedelta
+    from app.models import Category, IdempotencyKey, Inventory, Product
+    from app.services.checkout import CheckoutIdempotencyManager
+
+    user, _ = users
+    warehouse_id = int(test_app.config["DELIVERY_SOURCE_BRANCH_ID"])
+    category = Category(name="Replay Fast Path")
+    session.add(category)
+    session.flush()
+    product = Product(name="Replay Kettle", sku="RPL1", price="9.00", category_id=category.id)
+    session.add(product)
+    session.flush()
+    session.add(Inventory(product_id=product.id, branch_id=warehouse_id, available_quantity=3, reserved_quantity=0))
+    cart = _build_cart(session, user.id, product.id, qty=1, price=Decimal("9.00"))
+    monkeypatch.setattr(PaymentService, "charge", lambda *_a, **_k: "ref-replay")
+    payload = _cart_payload(cart, fulfillment=FulfillmentType.PICKUP, branch_id=warehouse_id)
+    first, _ = CheckoutService.confirm(payload, idempotency_key="replay-key")
+    CheckoutPaymentOutbox.drain()
+
+    with count_statements() as statements:
+        replays = [CheckoutService.confirm(payload, idempotency_key="replay-key") for _ in range(3)]
+    assert len(statements) == 1
+    assert all(not is_new and r.order_id == first.order_id for r, is_new in replays)
+    assert replays[0][0].payment_reference == "ref-replay"
+
+    record = session.execute(select(IdempotencyKey).where(IdempotencyKey.key == "replay-key")).scalar_one()
+    record.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    session.add(IdempotencyKey(user_id=user.id, key="replay-live", request_hash="h"))
+    session.commit()
+    assert CheckoutIdempotencyManager.purge_expired(batch_size=1) >= 1
+    keys = session.execute(select(IdempotencyKey.key).where(IdempotencyKey.user_id == user.id)).scalars().all()
+    assert "replay-key" not in keys and "replay-live" in keys
+
+def test_checkout_queue_mode_admits_then_places_in_one_batch(client, session, users, test_app, auth_header, monkeypatch):
+    from app.models import Category, Inventory, Product
+    from app.services.checkout_queue import CheckoutQueueService
+
+    warehouse_id = int(test_app.config["DELIVERY_SOURCE_BRANCH_ID"])
+    monkeypatch.setitem(test_app.config, "CHECKOUT_QUEUE_ENABLED", True)
+    monkeypatch.setitem(test_app.config, "CHECKOUT_QUEUE_BRANCH_LIMITS", f"{warehouse_id}:2")
+    category = Category(name="Queue Mode")
+    session.add(category)
+    session.flush()
+    product = Product(name="Flash Console", sku="QUE1", price="50.00", category_id=category.id)
+    session.add(product)
+    session.flush()
+    session.add(Inventory(product_id=product.id, branch_id=warehouse_id, available_quantity=3, reserved_quantity=0))
+    session.commit()
+    carts = [_build_cart(session, user.id, product.id, qty=2, price=Decimal("50.00")) for user in users]
+    extra = _build_cart(session, users[0].id, product.id, qty=1, price=Decimal("50.00"))
+
+    def post(cart, user, key):
+        body = {"cart_id": cart.id, "payment_token_id": 1, "fulfillment_type": "PICKUP", "branch_id": warehouse_id}
+        return client.post(
+            "/api/v1/checkout/confirm", json=body, headers={**auth_header(user), "Idempotency-Key": key}
+        )
+
+    tickets = [post(cart, user, f"queue-{i}") for i, (cart, user) in enumerate(zip(carts, users))]
+    assert [r.status_code for r in tickets] == [202, 202]
+    first = tickets[0].get_json()["data"]
+    assert first["status"] == "QUEUED" and first["position"] == 1
+    busy = post(extra, users[0], "queue-busy")
+    assert busy.status_code == 503 and busy.get_json()["error"]["code"] == "CHECKOUT_BUSY"
+    assert client.get(first["status_url"], headers=auth_header(users[1])).status_code == 404
+
+    assert CheckoutQueueService.process(warehouse_id) == 2
+    done = client.get(first["status_url"], headers=auth_header(users[0])).get_json()["data"]
+    assert done["status"] == "DONE" and done["result"]["status"] == "PENDING_PAYMENT"
+    failed = client.get(tickets[1].get_json()["data"]["status_url"], headers=auth_header(users[1])).get_json()["data"]
+    assert failed["status"] == "FAILED" and failed["error"]["code"] == "INSUFFICIENT_STOCK"
+    assert session.scalar(select(Inventory.available_quantity).where(Inventory.product_id == product.id)) == 1
+
+    retry = post(carts[0], users[0], "queue-0")
+    assert retry.status_code == 200 and retry.get_json()["data"]["order_id"] == done["result"]["order_id"]
+
+    from app.models import CheckoutQueueEntry
+
+    assert CheckoutQueueService.purge_finished(batch_size=1) == 0
+    assert CheckoutQueueService.purge_finished(batch_size=1, retention_seconds=-60) == 2
+    assert session.scalar(select(func.count()).select_from(CheckoutQueueEntry)) == 0
+    again = post(carts[0], users[0], "queue-0")
+    assert again.status_code == 200 and again.get_json()["data"]["order_id"] == done["result"]["order_id"]
+
 def test_checkout_delivery_fee_under_min(session, test_app, users, product_with_inventory):
     user, product, inv, _, cart = _prep_cart(session, users, product_with_inventory)
     with test_app.app_context():
@@ -120,6 +549,7 @@ def test_checkout_idempotency_reuse(session, users, product_with_inventory, monk
     )
     first, is_new_first = CheckoutService.confirm(payload, idempotency_key="same-key")
     assert is_new_first is True
+    CheckoutPaymentOutbox.drain()
     second, is_new_second = CheckoutService.confirm(payload, idempotency_key="same-key")
     assert is_new_second is False  # Cached response
     assert second.order_id == first.order_id
@@ -1,5 +1,6 @@
 import sys
 import secrets
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import time
 
@@ -19,6 +20,12 @@ from app.config import AppConfig
 from app.extensions import db
 from app.models import Base, Branch, Category, DeliverySlot, Inventory, Product, User
 from app.models.enums import Role
+from app.services.catalog import FeaturedSnapshotService
+from app.services.checkout import CheckoutIdempotencyManager
+from app.services.checkout_service import CheckoutService
+from app.services.payment_service import PaymentService
+from app.services.settings_service import SettingsService
+from app.services.stock_cache import StockCache
 
 @pytest.fixture
 def client(test_app):
@@ -51,6 +58,17 @@ def admin_token(session, test_app):
         token = create_access_token(identity=str(admin.id), additional_claims={"role": admin.role.value})
     return token
 
+@pytest.fixture(autouse=True)
+def reset_read_caches():
+    # Each test rolls back its rows, so ids (and anything cached under them) get reused.
+    StockCache.invalidate()
+    CheckoutService._previews.clear()
+    CheckoutIdempotencyManager._replays.clear()
+    SettingsService.invalidate()
+    PaymentService._captures.clear()
+    FeaturedSnapshotService._branches = None
+
+
 @pytest.fixture(autouse=True)
 def ensure_product(session):
     if not session.query(Product).first():
@@ -158,6 +176,25 @@ def product_with_inventory(session, test_app):
     return product, inv, other_branch
 
 
+@pytest.fixture
+def count_statements(test_app):
+    """Context manager yielding the list of SQL strings executed inside the block."""
+    with test_app.app_context():
+        engine = db.engine
+
+    @contextmanager
+    def _count():
+        statements = []
+        listener = lambda *args: statements.append(args[2])  # noqa: E731
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+    return _count
+
+
 @pytest.fixture
 def auth_header(test_app):
     def _build(user):
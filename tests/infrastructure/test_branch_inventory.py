@@ -17,3 +17,18 @@ def test_inventory_update_changes_quantities(session, product_with_inventory):
     assert updated.reserved_quantity == 1
     # ensure response carries names from relationships
     assert updated.product_name and updated.branch_name
+
+
+def test_delivery_source_branch_is_cached_until_branch_update(session, test_app, count_statements):
+    source_id = test_app.config["DELIVERY_SOURCE_BRANCH_ID"]
+    BranchCoreService.ensure_delivery_source_branch_exists(source_id)
+    with count_statements() as statements:
+        branch = BranchCoreService.ensure_delivery_source_branch_exists(source_id)
+    assert statements == []
+
+    BranchCoreService.update_branch(branch.id, "Warehouse Renamed", "Nowhere 1")
+    try:
+        assert BranchCoreService.ensure_delivery_source_branch_exists(source_id).name == "Warehouse Renamed"
+    finally:
+        BranchCoreService.update_branch(branch.id, "Warehouse", "Nowhere 1")
+    assert BranchCoreService.ensure_delivery_source_branch_exists(source_id).name == "Warehouse"